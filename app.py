@@ -1,23 +1,137 @@
 import streamlit as st
 import pandas as pd
-import hashlib
+import numpy as np
+import json
+import logging
+import os
+import random
+import threading
 import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    # pyarrow llega con streamlit; sin él solo se pierde la instantánea en disco
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+# Diagnósticos de descarga, parseo y compilación (no se escriben en stdout)
+logger = logging.getLogger(__name__)
 
 # =============================================================================
 # FUNCIONES PARA EXPORTAR A EXCEL CON FORMATOS
 # =============================================================================
 import io
+import requests
 from datetime import datetime
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Border, Side, Alignment, numbers
+from openpyxl.styles import PatternFill, Font, Border, Side, Alignment, NamedStyle, numbers
 from openpyxl.utils import get_column_letter
 
+# Relleno de cada clase de fila; las filas totales llevan letra blanca en negrita
+RELLENOS_FILAS_EXCEL = {
+    "par": "F9F9F9",
+    "impar": "FFFFFF",
+    "total": "FF6B6B",
+    "total_final": "4CAF50",
+    "total_general": "2196F3",
+}
+
+# Clase de cada fila total según el tipo de tabla; el resto alterna par/impar
+FILAS_TOTALES_EXCEL = {
+    "RP": {
+        "SUELDOS": "total",
+        "PARAFISCALES": "total_final",
+        "FOMAG": "total_general",
+        "TOTAL_DOC_RP": "total",
+        "SUELDOS_ORIENTADORES": "total",
+        "PARAFISCALES_ORIENTADORES": "total_final",
+        "FOMAG_ORIENTADORES": "total_general",
+        "TOTAL_DOC_ORIENTADORES": "total",
+        "SUELDOS_PBM": "total",
+        "PARAFISCALES_PBM": "total_final",
+        "FOMAG_PBM": "total_general",
+        "TOTAL_DOC_PBM": "total",
+        "TOTAL_PRIMERA_INFANCIA": "total"
+    },
+    "SGP": {
+        "TOTAL_DOC_SGP": "total",
+        "TOTAL_SGP_P8033": "total_final",
+        "TOTAL_RP_P8033": "total_final",
+        "TOTAL_GENERAL": "total_general"
+    },
+}
+
+def registrar_estilos_excel(libro):
+    """
+    Registra en el libro (una sola vez) los estilos con nombre de las hojas:
+    "encabezado" y, por cada clase de fila, "<clase>_texto" para la primera
+    columna, "<clase>_numero" (moneda) para los números de las columnas de
+    valores y "<clase>_valor" (mismo aspecto, sin formato de moneda) para
+    los textos y celdas vacías de esas columnas.
+    """
+    if "encabezado" in libro.named_styles:
+        return
+    
+    borde = Border(
+        left=Side(style='thin', color='000000'),
+        right=Side(style='thin', color='000000'),
+        top=Side(style='thin', color='000000'),
+        bottom=Side(style='thin', color='000000')
+    )
+    alineacion_centro = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    alineacion_izquierda = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    
+    libro.add_named_style(NamedStyle(
+        name="encabezado",
+        fill=PatternFill(start_color="8B0000", end_color="8B0000", fill_type="solid"),
+        font=Font(color="FFFFFF", bold=True, size=11),
+        border=borde,
+        alignment=alineacion_centro
+    ))
+    
+    for clase, color in RELLENOS_FILAS_EXCEL.items():
+        relleno = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        es_total = clase.startswith("total")
+        color_letra = "FFFFFF" if es_total else None
+        libro.add_named_style(NamedStyle(
+            name=f"{clase}_texto",
+            fill=relleno,
+            font=Font(color=color_letra, bold=es_total, size=10),
+            border=borde,
+            alignment=alineacion_izquierda
+        ))
+        for sufijo, formato in (("numero", '"$"#,##0'), ("valor", "General")):
+            libro.add_named_style(NamedStyle(
+                name=f"{clase}_{sufijo}",
+                fill=relleno,
+                font=Font(color=color_letra, bold=True, size=10, name='Courier New'),
+                border=borde,
+                alignment=alineacion_centro,
+                number_format=formato
+            ))
+
+def celdas_numericas(columna):
+    """Máscara de las celdas de una columna que se escriben en Excel como número"""
+    if pd.api.types.is_numeric_dtype(columna):
+        return columna.notna().to_numpy()
+    return columna.map(lambda valor: isinstance(valor, (int, float, np.number)) and not pd.isna(valor)).to_numpy(dtype=bool)
+
 def aplicar_formato_excel(writer, resumen, nombre_hoja, tipo_tabla="RP"):
     """
     Aplica formatos de estilo a una hoja de Excel
     
+    La clase de cada fila (total o par/impar) se decide una vez para toda la
+    tabla; a cada celda solo se le asigna el estilo con nombre ya registrado.
+    
     Args:
         writer: ExcelWriter
         resumen: DataFrame a exportar
@@ -27,118 +141,41 @@ def aplicar_formato_excel(writer, resumen, nombre_hoja, tipo_tabla="RP"):
     # Exportar DataFrame primero
     resumen.to_excel(writer, sheet_name=nombre_hoja, index=True)
     
-    # Obtener la hoja
+    # Obtener la hoja y registrar los estilos en su libro
     worksheet = writer.sheets[nombre_hoja]
-    
-    # Definir estilos
-    estilo_encabezado = PatternFill(start_color="8B0000", end_color="8B0000", fill_type="solid")
-    estilo_encabezado_fuente = Font(color="FFFFFF", bold=True, size=11)
-    estilo_total = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")
-    estilo_total_final = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
-    estilo_total_general = PatternFill(start_color="2196F3", end_color="2196F3", fill_type="solid")
-    estilo_fila_par = PatternFill(start_color="F9F9F9", end_color="F9F9F9", fill_type="solid")
-    estilo_fila_impar = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-    estilo_borde = Border(
-        left=Side(style='thin', color='000000'),
-        right=Side(style='thin', color='000000'),
-        top=Side(style='thin', color='000000'),
-        bottom=Side(style='thin', color='000000')
-    )
-    estilo_fuente_normal = Font(size=10)
-    estilo_fuente_numero = Font(size=10, name='Courier New', bold=True)
-    estilo_alineacion_centro = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    estilo_alineacion_izquierda = Alignment(horizontal='left', vertical='center', wrap_text=True)
-    
-    # Determinar filas totales según el tipo de tabla
-    if tipo_tabla == "RP":
-        filas_totales = {
-            "SUELDOS": estilo_total,
-            "PARAFISCALES": estilo_total_final,
-            "FOMAG": estilo_total_general,
-            "TOTAL_DOC_RP": estilo_total,
-            "SUELDOS_ORIENTADORES": estilo_total,
-            "PARAFISCALES_ORIENTADORES": estilo_total_final,
-            "FOMAG_ORIENTADORES": estilo_total_general,
-            "TOTAL_DOC_ORIENTADORES": estilo_total,
-            "SUELDOS_PBM": estilo_total,
-            "PARAFISCALES_PBM": estilo_total_final,
-            "FOMAG_PBM": estilo_total_general,
-            "TOTAL_DOC_PBM": estilo_total,
-            "SUELDOS": estilo_total,
-            "PARAFISCALES": estilo_total_final,
-            "FOMAG": estilo_total_general,
-            "TOTAL_PRIMERA_INFANCIA": estilo_total
-        }
-    else:  # SGP
-        filas_totales = {
-            "TOTAL_DOC_SGP": estilo_total,
-            "TOTAL_SGP_P8033": estilo_total_final,
-            "TOTAL_RP_P8033": estilo_total_final,
-            "TOTAL_GENERAL": estilo_total_general
-        }
-    
-    # Aplicar formatos a todas las celdas
-    for row in worksheet.iter_rows(min_row=1, max_row=worksheet.max_row, 
-                                   min_col=1, max_col=worksheet.max_column):
-        for cell in row:
-            # Aplicar bordes a todas las celdas
-            cell.border = estilo_borde
-            
-            # Aplicar formato a encabezados (fila 1)
-            if cell.row == 1:
-                cell.fill = estilo_encabezado
-                cell.font = estilo_encabezado_fuente
-                cell.alignment = estilo_alineacion_centro
-            else:
-                # Formato para columnas de texto (primera columna)
-                if cell.column == 1:
-                    cell.alignment = estilo_alineacion_izquierda
-                    cell.font = estilo_fuente_normal
-                    
-                    # Verificar si es fila total
-                    fila_nombre = resumen.index[cell.row-2] if cell.row-2 < len(resumen.index) else ""
-                    if fila_nombre in filas_totales:
-                        cell.fill = filas_totales[fila_nombre]
-                        cell.font = Font(color="FFFFFF", bold=True, size=10)
-                    else:
-                        # Filas alternadas
-                        if cell.row % 2 == 0:
-                            cell.fill = estilo_fila_par
-                        else:
-                            cell.fill = estilo_fila_impar
-                
-                # Formato para columnas numéricas
-                else:
-                    cell.alignment = estilo_alineacion_centro
-                    cell.font = estilo_fuente_numero
-                    
-                    # Aplicar formato de moneda a celdas con números
-                    if isinstance(cell.value, (int, float)):
-                        cell.number_format = '"$"#,##0'
-                    
-                    # Verificar si es fila total
-                    fila_nombre = resumen.index[cell.row-2] if cell.row-2 < len(resumen.index) else ""
-                    if fila_nombre in filas_totales:
-                        cell.fill = filas_totales[fila_nombre]
-                        cell.font = Font(color="FFFFFF", bold=True, size=10, name='Courier New')
-                    else:
-                        # Filas alternadas
-                        if cell.row % 2 == 0:
-                            cell.fill = estilo_fila_par
-                        else:
-                            cell.fill = estilo_fila_impar
-    
-    # Ajustar ancho de columnas
-    for column in worksheet.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
+    registrar_estilos_excel(worksheet.parent)
+    
+    # 🔹 Clase por fila: la de su total si lo es, si no alterna según la fila de Excel
+    filas_totales = FILAS_TOTALES_EXCEL["RP" if tipo_tabla == "RP" else "SGP"]
+    n_filas = len(resumen)
+    alternas = np.where(np.arange(2, n_filas + 2) % 2 == 0, "par", "impar")
+    totales = resumen.index.map(filas_totales)
+    clases = np.where(totales.isna(), alternas, totales.to_numpy(dtype=object))
+    
+    # 🔹 Estilo de cada celda de valores: moneda solo donde se escribe un número
+    es_numero = np.zeros(resumen.shape, dtype=bool)
+    for i in range(resumen.shape[1]):
+        es_numero[:, i] = celdas_numericas(resumen.iloc[:, i])
+    estilos = np.where(es_numero, (clases + "_numero")[:, None], (clases + "_valor")[:, None])
+    
+    # Encabezados (fila 1)
+    for cell in worksheet[1]:
+        cell.style = "encabezado"
+    
+    # Cuerpo: primera columna como texto, el resto como valores
+    for row, clase, estilos_fila in zip(worksheet.iter_rows(min_row=2, max_row=n_filas + 1), clases, estilos):
+        row[0].style = f"{clase}_texto"
+        for cell, estilo in zip(row[1:], estilos_fila):
+            cell.style = estilo
+    
+    # Ajustar ancho de columnas con las longitudes del DataFrame (sin recorrer celdas)
+    columnas = [(resumen.index.name, resumen.index.astype(str))]
+    columnas += [(nombre, resumen.iloc[:, i].astype(str)) for i, nombre in enumerate(resumen.columns)]
+    for posicion, (encabezado, valores) in enumerate(columnas, start=1):
+        column_letter = get_column_letter(posicion)
+        max_length = len(str(encabezado)) if encabezado is not None else 0
+        if n_filas:
+            max_length = max(max_length, int(valores.str.len().max()))
         
         # Ajustar ancho, con límites
         adjusted_width = min(max_length + 2, 50)
@@ -179,6 +216,39 @@ def exportar_a_excel_formateado(lista_resumenes, nombres_hojas=None, tipos_tabla
     output.seek(0)
     return output
 
+# =============================================================================
+# EXPORTACIÓN EXCEL BAJO DEMANDA (CACHÉ LRU POR HOJAS Y HUELLA)
+# =============================================================================
+MAX_LIBROS_EN_CACHE = 16
+
+@st.cache_resource
+def cache_libros_excel():
+    """Libros Excel ya generados a nivel de proceso, indexados por (hojas, tipos, huellas de las tablas)"""
+    return {"bloqueo": threading.Lock(), "tablas": OrderedDict()}
+
+def libro_excel_bajo_demanda(lista_resumenes, nombres_hojas, tipos_tablas):
+    """
+    Prepara la descarga de un libro Excel sin generarlo: devuelve una función
+    sin argumentos para el parámetro data de st.download_button, que Streamlit
+    solo ejecuta cuando el usuario pulsa el botón.
+
+    Los bytes se memoizan por (hojas, tipos, huellas de las tablas), así que
+    repetir la descarga del mismo reporte con la misma instantánea no vuelve a
+    pasar por openpyxl. Las tablas sin huella (no cacheadas) se exportan cada vez.
+    """
+    huellas = tuple(resumen.attrs.get("huella") for resumen in lista_resumenes)
+    clave = (tuple(nombres_hojas), tuple(tipos_tablas), huellas)
+
+    def generar():
+        return exportar_a_excel_formateado(lista_resumenes, nombres_hojas, tipos_tablas).getvalue()
+
+    def descargar():
+        if None in huellas:
+            return generar()
+        return memoizar_lru(cache_libros_excel(), clave, generar, MAX_LIBROS_EN_CACHE)
+
+    return descargar
+
 # =============================================================================
 # CONFIGURACIÓN
 # =============================================================================
@@ -656,28 +726,84 @@ def cargar_estilos():
     """, unsafe_allow_html=True)
 
 # =============================================================================
-# FUNCIÓN PARA OBTENER SOLO LA FECHA (SIN CACHÉ - MUY RÁPIDA)
+# FUNCIÓN PARA OBTENER SOLO LA FECHA (SIN SEGUNDA DESCARGA)
 # =============================================================================
+def fecha_de_datos_cargados():
+    """
+    Devuelve la fecha calculada por la última carga completa del proceso,
+    o None si ninguna sesión ha cargado todavía la hoja.
+    """
+    datos = obtener_estado_fuente(URL_DATOS).get("datos")
+    if datos is None or datos[0] is None:
+        return None
+    return datos[2]
+
+
+def fecha_actualizacion_vigente(por_defecto="No disponible"):
+    """
+    Canal único de la fecha de actualización: primero la de los datos
+    cargados (compartida entre sesiones) y, si aún no hay, la de la sesión.
+    """
+    fecha = fecha_de_datos_cargados()
+    if fecha is not None:
+        return fecha
+    return st.session_state.get('fecha_actualizacion', por_defecto)
+
+
+def leer_primeras_lineas(url, n_lineas=2, plazo_seg=None):
+    """
+    Lee en streaming solo las primeras líneas del CSV y cierra la conexión,
+    sin descargar el resto del archivo. plazo_seg acota los reintentos como en
+    pedir_fuente.
+    """
+    leido = b""
+    with pedir_fuente(url, plazo_seg=plazo_seg) as respuesta:
+        respuesta.raise_for_status()
+        for bloque in respuesta.iter_content(8 * 1024):
+            leido += bloque
+            if leido.count(b"\n") >= n_lineas:
+                break
+    return b"".join(leido.splitlines(keepends=True)[:n_lineas])
+
+
+# Plazo del respaldo que lee solo el encabezado y la primera fila
+PLAZO_ENCABEZADO_SEG = 5
+
 def obtener_fecha_actualizacion():
     """
     Obtiene solo la fecha de actualización del archivo, sin cargar todos los datos.
-    Lee solo 1 fila para ser extremadamente rápido.
+    Si otra sesión ya cargó la hoja se reutiliza su fecha. En el arranque en
+    frío se espera la descarga del coordinador (no se abre otra conexión); solo
+    si esa descarga falló por algo distinto a la conexión se leen en streaming
+    el encabezado y la primera fila, con un plazo corto.
     """
-    try:
-        BASE_URL = "https://docs.google.com/spreadsheets/d/1MK6NNx5YEqo_19xdSwpXg_WRYd52GPTpFPeVMYeZCNo/export?format=csv&gid=0"
+    fecha = fecha_de_datos_cargados()
+    if fecha is not None:
+        return fecha
+
+    futuro = solicitar_fuente("datos")
+    esperar_fuente("datos", futuro)
+    fecha = fecha_de_datos_cargados()
+    if fecha is not None:
+        return fecha
+    if futuro is not None and not futuro.done():
+        # Sigue descargando en segundo plano: la fecha llega con los datos
+        return "No disponible"
+    error = futuro.exception() if futuro is not None else None
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        # La hoja no respondió: otra petición solo repetiría la espera
+        return "No disponible"
 
-        URL_MENSAJES_TABLERO = "https://docs.google.com/spreadsheets/d/1_ULHCXS9GSOCmv-e3pA2cekzUo7IIksH8H8JOijWZjw/export?format=csv&gid=0"     
-        
-        # Leer SOLO 1 fila (la más rápida posible)
-        df = pd.read_csv(BASE_URL, nrows=1)
+    try:
+        contenido = leer_primeras_lineas(URL_DATOS, 2, plazo_seg=PLAZO_ENCABEZADO_SEG)
+        df = pd.read_csv(io.BytesIO(contenido))
         
         if df.empty:
             return "No disponible"
         
         if "FECHA" in df.columns:
-            fecha = df["FECHA"].iloc[0]
             try:
-                fecha_dt = pd.to_datetime(fecha, format="%d/%m/%Y", errors="coerce")
+                fecha_dt = parsear_fechas(df["FECHA"].astype("string")).iloc[0]
                 if pd.notna(fecha_dt):
                     return fecha_dt.strftime("%d de %B de %Y")
                 else:
@@ -692,7 +818,7 @@ def obtener_fecha_actualizacion():
 
 def mostrar_fecha_actualizacion():
     """Muestra la fecha de actualización de los datos en un formato estilizado"""
-    fecha = st.session_state.get('fecha_actualizacion', 'No disponible')
+    fecha = fecha_actualizacion_vigente()
     st.markdown(f"""
         <div style="
             background: linear-gradient(135deg, #e8f5e9 0%, #c8e6c9 100%);
@@ -713,144 +839,832 @@ def mostrar_fecha_actualizacion():
         </div>
     """, unsafe_allow_html=True)
 # =============================================================================
-# CARGAR DATOS DESDE GOOGLE SHEETS - VERSIÓN PRODUCCIÓN
+# DESCARGA CONDICIONAL (ETag / Last-Modified)
 # =============================================================================
+# Las URL se pueden apuntar a un servidor local de pruebas por variable de entorno
+URL_DATOS = os.environ.get(
+    "URL_DATOS",
+    "https://docs.google.com/spreadsheets/d/1MK6NNx5YEqo_19xdSwpXg_WRYd52GPTpFPeVMYeZCNo/export?format=csv&gid=0",
+)
+TIMEOUT_CONEXION_SEG = 5
+TIMEOUT_DESCARGA_SEG = 30   # Lectura: máximo entre bloques recibidos
+MAX_REINTENTOS_DESCARGA = 3
+ESPERA_BASE_REINTENTO_SEG = 0.5
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+TAMANO_BLOQUE_DESCARGA = 64 * 1024   # La huella se calcula bloque a bloque mientras llega
+MAX_VERSIONES_EN_MEMORIA = 3   # Instantáneas recientes que las sesiones pueden seguir usando
+
+@st.cache_resource
+def estado_fuentes():
+    """
+    Estado de cada fuente a nivel de proceso: validadores HTTP de la última
+    respuesta, huella de los bytes crudos y los datos ya procesados, más las
+    últimas versiones publicadas de esos datos.
+    """
+    return {"bloqueo": threading.Lock(), "fuentes": {}, "versiones": {}}
+
+def obtener_estado_fuente(url):
+    """Devuelve el último estado registrado para la fuente (diccionario vacío si no hay)"""
+    estado = estado_fuentes()
+    with estado["bloqueo"]:
+        return estado["fuentes"].get(url, {})
+
+def obtener_version_fuente(url, version):
+    """Devuelve los datos de una versión publicada de la fuente, o None si ya no está en memoria"""
+    estado = estado_fuentes()
+    with estado["bloqueo"]:
+        return estado["versiones"].get(url, {}).get(version)
+
+def guardar_estado_fuente(url, validadores, datos, forzado=False, actualizado_en=None):
+    """
+    Registra validadores y datos procesados de la fuente en un solo paso.
+    La instantánea anterior se reemplaza completa (nunca se modifica en sitio).
+    Se publica una versión nueva cuando cambian los datos o la recarga fue forzada.
+    """
+    estado = estado_fuentes()
+    with estado["bloqueo"]:
+        previo = estado["fuentes"].get(url, {})
+        version = previo.get("version", 0)
+        if forzado or datos is not previo.get("datos"):
+            version += 1
+            versiones = estado["versiones"].setdefault(url, OrderedDict())
+            versiones[version] = datos
+            while len(versiones) > MAX_VERSIONES_EN_MEMORIA:
+                versiones.popitem(last=False)
+        estado["fuentes"][url] = MappingProxyType({
+            **validadores,
+            "datos": datos,
+            "version": version,
+            "actualizado_en": actualizado_en or time.time(),
+            "error": None,
+        })
+
+def registrar_error_fuente(url, error):
+    """Anota el último error de la fuente conservando los últimos datos buenos"""
+    estado = estado_fuentes()
+    with estado["bloqueo"]:
+        previo = estado["fuentes"].get(url, {})
+        estado["fuentes"][url] = MappingProxyType({**previo, "error": str(error)})
+
+@st.cache_resource
+def cliente_http():
+    """
+    Sesión HTTP única del proceso para todas las lecturas de hojas:
+    reutiliza conexiones keep-alive de un pool y acepta respuestas gzip.
+    """
+    sesion = requests.Session()
+    # Una conexión por fuente del coordinador más la del actualizador o la
+    # lectura del encabezado; los reintentos los hace pedir_fuente (con plazo)
+    adaptador = requests.adapters.HTTPAdapter(
+        pool_connections=len(TIMEOUTS_FUENTES), pool_maxsize=len(TIMEOUTS_FUENTES) + 1, max_retries=0
+    )
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    sesion.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return sesion
 
-@st.cache_data(ttl=30, show_spinner="📥 Sincronizando con Google Sheets...")
-def cargar_datos_originales(_fuerza_actualizacion=False):
+def pedir_fuente(url, cabeceras=None, plazo_seg=None):
     """
-    Carga datos desde Google Sheets con detección automática de cambios.
+    GET en streaming por el cliente compartido, con timeouts de conexión y
+    lectura. Los fallos de red, 429 y 5xx se reintentan con espera
+    exponencial con jitter (aleatoria entre 0 y base * 2^intento).
+
     Args:
-        _fuerza_actualizacion: Forzar recarga ignorando cache
+        url: URL a pedir
+        cabeceras: Cabeceras extra (p.ej. las de la petición condicional)
+        plazo_seg: Tiempo total para obtener respuesta, reintentos y esperas
+            incluidos (por defecto TIMEOUT_DESCARGA_SEG). Cada intento usa como
+            timeout lo que queda del plazo y no se reintenta si la espera no cabe.
+
     Returns:
-        DataFrame con los datos o None si hay error
+        Respuesta abierta de requests (usar con `with` para liberar la conexión)
     """
-    try:
-        # URL DE TU GOOGLE SHEETS
-        BASE_URL = "https://docs.google.com/spreadsheets/d/1MK6NNx5YEqo_19xdSwpXg_WRYd52GPTpFPeVMYeZCNo/export?format=csv&gid=0"
-
-        # Estrategia: Si es forzado, agregamos timestamp único
-        if _fuerza_actualizacion:
-            timestamp = int(time.time() * 1000)
-            url = f"{BASE_URL}&_={timestamp}"
-            st.toast("🔄 Actualización forzada solicitada", icon="📡")
+    limite = time.monotonic() + (plazo_seg or TIMEOUT_DESCARGA_SEG)
+    for intento in range(MAX_REINTENTOS_DESCARGA + 1):
+        restante = max(limite - time.monotonic(), 0.1)
+        respuesta, error = None, None
+        try:
+            respuesta = cliente_http().get(
+                url, headers=cabeceras, stream=True,
+                timeout=(min(TIMEOUT_CONEXION_SEG, restante), min(TIMEOUT_DESCARGA_SEG, restante)),
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        espera = random.uniform(0, ESPERA_BASE_REINTENTO_SEG * 2 ** intento)
+        reintentar = intento < MAX_REINTENTOS_DESCARGA and time.monotonic() + espera < limite
+        if error is None and (respuesta.status_code not in ESTADOS_REINTENTABLES or not reintentar):
+            return respuesta
+        if not reintentar:
+            raise error
+
+        if error is None:
+            liberar_respuesta(respuesta)
+            logger.warning(f"HTTP {respuesta.status_code}, reintento {intento + 1}/{MAX_REINTENTOS_DESCARGA}")
         else:
-            url = BASE_URL
-        
-        # Leer datos
-        df = pd.read_csv(url)
-        
-        # VALIDACIÓN CRÍTICA
-        if df.empty:
-            st.warning("⚠️ La hoja está vacía o no es accesible")
-            return None
-        
-        # 🔹 EXTRAER FECHA DE ACTUALIZACIÓN - CORREGIDO
-        if "FECHA" in df.columns:
-            # 🔹 PASO 1: Forzar el formato correcto de fecha
-            # Si la fecha viene como "4/07/2026" (día/mes/año)
-            # Usamos dayfirst=True para que pandas lo interprete correctamente
+            logger.warning(f"{type(error).__name__}, reintento {intento + 1}/{MAX_REINTENTOS_DESCARGA}")
+        time.sleep(espera)
+
+def liberar_respuesta(respuesta):
+    """Lee el cuerpo (vacío o corto) y cierra: así la conexión vuelve al pool en vez de cerrarse"""
+    respuesta.content
+    respuesta.close()
+
+def huella_bloques(bloques, destino):
+    """
+    Huella del contenido calculada en streaming: CRC32 acumulado más la
+    longitud total, sin una segunda pasada ni copia de los datos. No es
+    criptográfica; solo identifica la versión de la hoja para las cachés.
+
+    Args:
+        bloques: Iterable de bytes tal como llegan de la red
+        destino: Lista donde se van guardando los bloques leídos
+
+    Returns:
+        Texto "crc32-longitud" que se usa como id de versión de los datos
+    """
+    crc, longitud = 0, 0
+    for bloque in bloques:
+        crc = zlib.crc32(bloque, crc)
+        longitud += len(bloque)
+        destino.append(bloque)
+    return f"{crc:08x}-{longitud}"
+
+def descargar_fuente(url, previo=None, forzar=False, plazo_seg=None):
+    """
+    Descarga una fuente enviando una petición condicional con los validadores
+    de la respuesta anterior.
+
+    Args:
+        url: URL de exportación CSV
+        previo: Estado anterior de la fuente (ver obtener_estado_fuente)
+        forzar: Ignorar validadores y evitar cachés intermedias con un timestamp
+        plazo_seg: Plazo total de la petición con sus reintentos (ver pedir_fuente)
+
+    Returns:
+        Tupla (contenido, validadores):
+            contenido: bytes crudos, o None si el servidor respondió 304
+            validadores: dict con "etag", "last_modified" y "huella" (ver huella_bloques)
+    """
+    previo = previo or {}
+    cabeceras = {}
+
+    if forzar:
+        url = f"{url}&_={int(time.time() * 1000)}"
+    else:
+        if previo.get("etag"):
+            cabeceras["If-None-Match"] = previo["etag"]
+        if previo.get("last_modified"):
+            cabeceras["If-Modified-Since"] = previo["last_modified"]
+
+    with pedir_fuente(url, cabeceras, plazo_seg) as respuesta:
+        if respuesta.status_code == 304 and previo.get("huella"):
+            liberar_respuesta(respuesta)
+            return None, {k: previo.get(k) for k in ("etag", "last_modified", "huella")}
+        if respuesta.status_code != 200:
+            raise requests.HTTPError(f"HTTP {respuesta.status_code} al descargar la hoja", response=respuesta)
+        bloques = []
+        huella = huella_bloques(respuesta.iter_content(TAMANO_BLOQUE_DESCARGA), bloques)
+        contenido = b"".join(bloques)
+        etag = respuesta.headers.get("ETag")
+        last_modified = respuesta.headers.get("Last-Modified")
+
+    validadores = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "huella": huella,
+    }
+    return contenido, validadores
+
+# =============================================================================
+# CARGAR DATOS DESDE GOOGLE SHEETS - VERSIÓN PRODUCCIÓN
+# =============================================================================
+
+def ultimos_cuatro_digitos(codigos_o):
+    """Últimos 4 dígitos de cada Codigo_O como int16 (-1 si no son numéricos)"""
+    ultimos_cuatro = pd.to_numeric(pd.Series(codigos_o).astype(str).str[-4:], errors="coerce")
+    return ultimos_cuatro.where(ultimos_cuatro.between(0, 9999), -1).astype("int16").to_numpy()
+
+def construir_indice_claves(df, indice_previo=None):
+    """
+    Precalcula una sola vez por carga las claves que usan todos los procesadores.
+    Si se pasa el índice de la instantánea anterior, el cubo no se rehace:
+    se comparan las sumas por clave (Codigo_O, Codigo) y solo las claves que
+    cambiaron corrigen sus celdas del cubo (ver diferenciar_claves).
+
+    Returns:
+        Diccionario con:
+            codigo: Serie categórica con Codigo
+            claves: sumas de MEDIDAS_CUBO por (Codigo_O, Codigo), base del cubo y del diff
+            cubo: agregado (Codigo, ultimos_cuatro) -> sumas, ver construir_cubo
+            cambios: solo con índice previo, ver diferenciar_claves
+    """
+    codigo = df["Codigo"].astype("category")
+    medidas = [c for c in MEDIDAS_CUBO if c in df.columns]
+    claves = df[medidas].groupby(
+        [df["Codigo_O"].astype("string").rename("Codigo_O"), codigo.astype("string")]
+    ).sum()
+
+    indice = {
+        "codigo": codigo,
+        "claves": claves,
+    }
+
+    previas = (indice_previo or {}).get("claves")
+    if previas is not None and list(previas.columns) == medidas:
+        cambios = diferenciar_claves(previas, claves)
+        cambios["huella_previa"] = indice_previo.get("huella")
+        indice["cambios"] = cambios
+        indice["cubo"] = combinar_cubos(indice_previo["cubo"], cambios["cubo"])
+    else:
+        indice["cubo"] = construir_cubo(claves)
+    return indice
+
+# Columnas de valores que se agregan en el cubo (las que no existan se omiten)
+MEDIDAS_CUBO = ["INICIAL", "DISPONIBLE", "RP EMITIDOS", "GIROS ACUMULADOS", "SALDO DE APROPIACION", "RECURSOS SIN EJECUTAR"]
+
+def construir_cubo(claves):
+    """
+    Agrega las sumas por clave (Codigo_O, Codigo) en celdas (Codigo, ultimos_cuatro).
+    Todas las tablas resumen se proyectan desde este cubo, que tiene unos
+    cientos de celdas en lugar de miles de filas.
+
+    Returns:
+        Diccionario con:
+            codigos: array con el Codigo de cada celda
+            sufijos: array con los últimos 4 dígitos de cada celda
+            valores: DataFrame con las sumas de MEDIDAS_CUBO de cada celda
+    """
+    sufijos = ultimos_cuatro_digitos(claves.index.get_level_values(0))
+    validas = sufijos >= 0
+    cubo = claves[validas].groupby(
+        [claves.index.get_level_values(1)[validas], sufijos[validas]]
+    ).sum()
+
+    return {
+        "codigos": cubo.index.get_level_values(0).astype(str).to_numpy(),
+        "sufijos": cubo.index.get_level_values(1).to_numpy(),
+        "valores": cubo.reset_index(drop=True),
+    }
+
+def diferenciar_claves(previas, nuevas):
+    """
+    Compara las sumas por clave (Codigo_O, Codigo) de dos instantáneas.
+    Los valores son pesos enteros, así que la comparación es exacta.
+
+    Returns:
+        Diccionario con:
+            claves: lista de claves (Codigo_O, Codigo) que cambiaron, se agregaron o se quitaron
+            cubo: cubo con las diferencias (nuevo - previo) de esas claves, ver construir_cubo
+    """
+    union = nuevas.index.union(previas.index)
+    delta = nuevas.reindex(union, fill_value=0) - previas.reindex(union, fill_value=0)
+    delta = delta[(delta != 0).any(axis=1)]
+    return {"claves": list(delta.index), "cubo": construir_cubo(delta)}
+
+def combinar_cubos(cubo, delta):
+    """
+    Suma un cubo de diferencias a un cubo existente sin tocar el resto de celdas.
+    Las celdas que no existían se agregan al final. Devuelve un cubo nuevo
+    (el anterior lo siguen usando las sesiones fijadas en su versión).
+    """
+    if len(delta["codigos"]) == 0:
+        return cubo
+
+    posiciones = pd.MultiIndex.from_arrays([cubo["codigos"], cubo["sufijos"]]).get_indexer(
+        pd.MultiIndex.from_arrays([delta["codigos"], delta["sufijos"]])
+    )
+    existentes = posiciones >= 0
+    valores = cubo["valores"].to_numpy(copy=True)
+    diferencias = delta["valores"].to_numpy()
+    valores[posiciones[existentes]] += diferencias[existentes]
+
+    return {
+        "codigos": np.concatenate([cubo["codigos"], delta["codigos"][~existentes]]),
+        "sufijos": np.concatenate([cubo["sufijos"], delta["sufijos"][~existentes]]),
+        "valores": pd.DataFrame(
+            np.vstack([valores, diferencias[~existentes]]), columns=cubo["valores"].columns
+        ).astype(cubo["valores"].dtypes.to_dict()),
+    }
+
+
+# Columnas que usa la app y su tipo al leer (el resto del export se descarta).
+# Los valores se leen como texto y los convierte limpiar_pesos a pesos enteros.
+ESQUEMA_CSV = {
+    "Codigo": "category",
+    "Codigo_O": "category",
+    "Concepto de gasto": "category",
+    "FECHA": "string",
+    **{columna: "string" for columna in MEDIDAS_CUBO},
+}
+
+def leer_csv_tipado(contenido):
+    """
+    Lee solo las columnas de ESQUEMA_CSV con su tipo ya fijado. Usa el motor
+    multihilo de pyarrow cuando está disponible y el parser C si no.
+    """
+    encabezado = pd.read_csv(io.BytesIO(contenido), nrows=0).columns
+    columnas = [columna for columna in encabezado if columna in ESQUEMA_CSV]
+    tipos = {columna: ESQUEMA_CSV[columna] for columna in columnas}
+
+    if pa is not None:
+        try:
+            return pd.read_csv(io.BytesIO(contenido), usecols=columnas, dtype=tipos, engine="pyarrow")
+        except Exception as e:
+            logger.warning(f"Lector pyarrow falló, se usa el parser C: {str(e)[:100]}")
+
+    return pd.read_csv(io.BytesIO(contenido), usecols=columnas, dtype=tipos)
+
+# Formatos de moneda aceptados una vez quitados "$", espacios y signo.
+# La convención se decide una vez por columna (ver detectar_formato_colombiano):
+# en formato colombiano, como exporta la hoja con "$", el punto seguido de
+# grupos de tres dígitos es separador de miles y la coma es decimal; si no,
+# el punto es decimal y la coma separa miles.
+PATRON_MILES_PUNTO = r"\d{1,3}(?:\.\d{3})+(?:,\d+)?"   # 1.234.567 / 1.234.567,89
+PATRON_MILES_COMA = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?"    # 1,234,567 / 1,234,567.89
+PATRON_COMA_DECIMAL = r"\d+(?:\.\d{3})*,\d+"          # 2500,5 / 2.500,50
+PATRON_SIMPLE = r"\d+(?:[.,]\d+)?"                   # 1234567 / 1234567.0
+PATRON_NORMALIZADO = r"(\d+)(?:\.(\d+))?"             # parte entera y fracción
+
+def detectar_formato_colombiano(originales, texto):
+    """
+    Indica si la columna está en formato colombiano: algún valor trae "$" o
+    "COP", usa coma decimal ("2.500,50", "12,5") o tiene varios puntos de
+    miles ("1.234.567"). Un valor suelto como "12.345" no decide: sin más
+    evidencia en la columna el punto se lee como decimal.
+    """
+    con_moneda = originales.str.contains("[$]|COP", regex=True).fillna(False)
+    coma_decimal = texto.str.fullmatch(PATRON_COMA_DECIMAL).fillna(False) & ~texto.str.fullmatch(PATRON_MILES_COMA).fillna(False)
+    varios_puntos = texto.str.fullmatch(PATRON_MILES_PUNTO).fillna(False) & (texto.str.count("\\.") > 1).fillna(False)
+    return bool((con_moneda | coma_decimal | varios_puntos).any())
+
+def limpiar_pesos(serie):
+    """
+    Convierte una columna de valores en texto ("$1.234.567", "-$ 2.500,50",
+    "(1.000)", "1234567.0"...) a pesos enteros int64, redondeando las
+    fracciones de ,50 lejos de cero.
+    Los separadores se interpretan igual en toda la columna (ver
+    detectar_formato_colombiano), y la parte entera y la fracción se leen
+    como texto, así los valores de más de 2^53 no pasan por float64.
+    Se limpia cada valor distinto una sola vez y se expande con los códigos
+    de factorize, así el costo depende de los valores únicos y no de las filas.
+
+    Returns:
+        Tupla (Serie int64, número de celdas no vacías que no se pudieron leer).
+        Las celdas vacías o rechazadas valen 0, como antes en las sumas.
+    """
+    codigos, unicos = pd.factorize(serie)
+    originales = pd.Series(unicos, dtype="string")
+    texto = originales.str.replace("[\\s$\u00a0]|COP", "", regex=True)
+
+    # 🔹 Signo: "-" al inicio o contabilidad entre paréntesis
+    negativo = texto.str.startswith("-") | (texto.str.startswith("(") & texto.str.endswith(")"))
+    texto = texto.str.strip("-()")
+
+    # 🔹 Normalizar separadores con la convención de la columna: queda
+    #    "entero" o "entero.fracción"; lo que no encaje se rechaza
+    normalizado = pd.Series(pd.NA, index=texto.index, dtype="string")
+    if detectar_formato_colombiano(originales, texto):
+        miles = texto.str.fullmatch(PATRON_MILES_PUNTO).fillna(False)
+        normalizado[miles] = texto[miles].str.replace(".", "", regex=False)
+    else:
+        miles = texto.str.fullmatch(PATRON_MILES_COMA).fillna(False)
+        normalizado[miles] = texto[miles].str.replace(",", "", regex=False)
+    simple = texto.str.fullmatch(PATRON_SIMPLE).fillna(False) & ~miles
+    normalizado[simple] = texto[simple]
+    partes = normalizado.str.replace(",", ".", regex=False).str.extract(f"^{PATRON_NORMALIZADO}$")
+
+    # 🔹 Redondeo comercial (mitad lejos de cero: 2.500,50 -> 2.501), no el
+    # redondeo bancario de np.round, que llevaría los ,50 al par. Con el signo
+    # aparte basta subir la magnitud cuando la fracción empieza en 5 o más
+    sube = partes[1].fillna("").str[:1].isin(list("56789")).to_numpy()
+    magnitudes = [int(entero) + int(arriba) if isinstance(entero, str) else None for entero, arriba in zip(partes[0], sube)]
+    leido = np.array([m is not None and m < 2**63 for m in magnitudes], dtype=bool)
+    rechazado = ~leido & (texto.str.len() > 0).fillna(False).to_numpy()
+    pesos_unicos = np.array([m if ok else 0 for m, ok in zip(magnitudes, leido)], dtype=np.int64)
+    pesos_unicos = np.where(negativo.fillna(False).to_numpy(), -pesos_unicos, pesos_unicos)
+
+    # 🔹 Expandir a las filas (código -1 = celda vacía -> último elemento, 0)
+    pesos = np.append(pesos_unicos, 0).astype(np.int64)[codigos]
+    celdas_rechazadas = int(np.bincount(codigos[codigos >= 0], minlength=len(unicos))[rechazado].sum())
+    return pd.Series(pesos, index=serie.index, name=serie.name), celdas_rechazadas
+
+# Formatos de FECHA que se prueban sobre la muestra, en orden de preferencia
+# (día primero, como exporta la hoja: "4/07/2026", "04/07/2026 14:30"...)
+FORMATOS_FECHA = [
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+]
+TAMANO_MUESTRA_FECHA = 50
+
+def detectar_formato_fecha(muestra):
+    """
+    Devuelve el formato de FORMATOS_FECHA que lee más valores de la muestra,
+    o None si ninguno lee alguno.
+    """
+    mejor_formato, mejor_leidos = None, 0
+    for formato in FORMATOS_FECHA:
+        leidos = pd.to_datetime(muestra, format=formato, errors="coerce").notna().sum()
+        if leidos > mejor_leidos:
+            mejor_formato, mejor_leidos = formato, leidos
+    return mejor_formato
+
+def parsear_fechas(serie):
+    """
+    Convierte la columna FECHA a datetime en una sola pasada: detecta el
+    formato con una muestra de valores distintos, convierte todos los valores
+    distintos con ese formato y solo los que fallen pasan por el respaldo
+    (los demás formatos y después el lector mixto con dayfirst). La columna suele repetir pocas fechas, así que se trabaja
+    sobre los únicos y se expande con los códigos de factorize.
+    La conversión corre una vez por versión de la hoja (sincronizar_fuente
+    solo parsea con huella nueva y la instantánea en disco guarda FECHA ya
+    convertida).
+    """
+    codigos, unicos = pd.factorize(serie)
+    unicos = pd.Series(unicos, dtype="string").str.strip()
+    if unicos.empty:
+        return pd.Series(pd.NaT, index=serie.index, dtype="datetime64[us]")
+
+    formato = detectar_formato_fecha(unicos.head(TAMANO_MUESTRA_FECHA))
+    if formato is not None:
+        fechas = pd.to_datetime(unicos, format=formato, errors="coerce")
+    else:
+        fechas = pd.Series(pd.NaT, index=unicos.index, dtype="datetime64[us]")
+
+    # 🔹 Respaldo solo para los valores que el formato detectado no leyó:
+    #    primero los demás formatos conocidos y al final el lector mixto
+    fallidas = fechas.isna() & unicos.notna() & (unicos.str.len() > 0)
+    if fallidas.any():
+        logger.info(f"FECHA: formato {formato}, {int(fallidas.sum())} valores distintos van al respaldo")
+    for otro in [f for f in FORMATOS_FECHA if f != formato] + ["mixed"]:
+        if not fallidas.any():
+            break
+        fechas[fallidas] = pd.to_datetime(unicos[fallidas], format=otro, dayfirst=True, errors="coerce")
+        fallidas &= fechas.isna()
+
+    valores = np.append(fechas.to_numpy(dtype="datetime64[us]"), np.datetime64("NaT", "us"))[codigos]
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+def parsear_datos_originales(contenido, indice_previo=None):
+    """
+    Convierte los bytes CSV descargados en el DataFrame de trabajo.
+    Con el índice de la instantánea anterior, el cubo se actualiza solo en
+    las claves que cambiaron (ver construir_indice_claves).
+
+    Returns:
+        Tupla (DataFrame, índice de claves sin huella, texto de fecha de actualización).
+        El DataFrame es None si la hoja está vacía.
+    """
+    df = leer_csv_tipado(contenido)
+    
+    # VALIDACIÓN CRÍTICA
+    if df.empty:
+        return None, None, "No disponible"
+    
+    # 🔹 VALORES EN PESOS ENTEROS (sumas exactas, sin deriva de flotantes)
+    celdas_rechazadas = {}
+    for columna in MEDIDAS_CUBO:
+        if columna in df.columns:
+            df[columna], rechazadas = limpiar_pesos(df[columna])
+            if rechazadas:
+                celdas_rechazadas[columna] = rechazadas
+    if celdas_rechazadas:
+        logger.warning(f"Celdas de valores no numéricas (se toman como $0): {celdas_rechazadas}")
+    
+    # 🔹 EXTRAER FECHA DE ACTUALIZACIÓN - CORREGIDO
+    if "FECHA" in df.columns:
+        # 🔹 PASO 1: Formato detectado una vez sobre una muestra (ver parsear_fechas)
+        df["FECHA"] = parsear_fechas(df["FECHA"])
+        
+        # 🔹 PASO 2: Obtener la fecha más reciente
+        fecha_reciente = df["FECHA"].max()
+        
+        if pd.notna(fecha_reciente):
+            # 🔹 PASO 3: Formato en letras
+            # Opción 1: Solo fecha (ej: "04 de Julio de 2026")
+            fecha_actualizacion = fecha_reciente.strftime("%d de %B de %Y")
             
-            try:
-                # Intento 1: Formato día/mes/año (DD/MM/YYYY)
-                df["FECHA"] = pd.to_datetime(df["FECHA"], format="%d/%m/%Y", errors="coerce")
-            except:
-                try:
-                    # Intento 2: Formato día/mes/año con día de 2 dígitos (04/07/2026)
-                    df["FECHA"] = pd.to_datetime(df["FECHA"], format="%d/%m/%Y", errors="coerce")
-                except:
-                    try:
-                        # Intento 3: Formato día/mes/año con horas (04/07/2026 14:30)
-                        df["FECHA"] = pd.to_datetime(df["FECHA"], format="%d/%m/%Y %H:%M", errors="coerce")
-                    except:
-                        try:
-                            # Intento 4: Formato día/mes/año con horas y minutos (04/07/2026 14:30:00)
-                            df["FECHA"] = pd.to_datetime(df["FECHA"], format="%d/%m/%Y %H:%M:%S", errors="coerce")
-                        except:
-                            # Intento 5: Dejar que pandas intente adivinar automáticamente
-                            # pero especificando dayfirst=True
-                            df["FECHA"] = pd.to_datetime(df["FECHA"], dayfirst=True, errors="coerce")
+            # Opción 2: Con día de semana (ej: "Lunes 04 de Julio de 2026")
+            # fecha_actualizacion = fecha_reciente.strftime("%A %d de %B de %Y")
             
-            # 🔹 PASO 2: Obtener la fecha más reciente
-            fecha_reciente = df["FECHA"].max()
+            # Opción 3: Con hora (ej: "04 de Julio de 2026 a las 02:30 PM")
+            # fecha_actualizacion = fecha_reciente.strftime("%d de %B de %Y a las %I:%M %p")
             
-            if pd.notna(fecha_reciente):
-                # 🔹 PASO 3: Guardar en session state con formato en letras
-                # Opción 1: Solo fecha (ej: "04 de Julio de 2026")
-                st.session_state.fecha_actualizacion = fecha_reciente.strftime("%d de %B de %Y")
-                
-                # Opción 2: Con día de semana (ej: "Lunes 04 de Julio de 2026")
-                # st.session_state.fecha_actualizacion = fecha_reciente.strftime("%A %d de %B de %Y")
-                
-                # Opción 3: Con hora (ej: "04 de Julio de 2026 a las 02:30 PM")
-                # st.session_state.fecha_actualizacion = fecha_reciente.strftime("%d de %B de %Y a las %I:%M %p")
-                
-                # 🔹 Para depuración: Mostrar en consola la fecha correcta
-                print(f"✅ Fecha correcta: {st.session_state.fecha_actualizacion}")
-            else:
-                st.session_state.fecha_actualizacion = "No disponible"
+            # 🔹 Para depuración: Mostrar en consola la fecha correcta
+            logger.info(f"Fecha correcta: {fecha_actualizacion}")
         else:
-            st.session_state.fecha_actualizacion = "Columna FECHA no encontrada"
-        
-        # DETECTOR DE CAMBIOS INTELIGENTE
-        contenido_actual = df.to_csv(index=False).encode('utf-8')
-        hash_actual = hashlib.md5(contenido_actual).hexdigest()
-        
-        # Guardar en session state para comparar
-        if 'data_hash' not in st.session_state:
-            st.session_state.data_hash = hash_actual
-        elif st.session_state.data_hash != hash_actual:
-            st.session_state.data_hash = hash_actual
-            st.toast("✅ Nuevos datos detectados", icon="🆕")
-            st.sidebar.success("📊 Datos actualizados")
+            fecha_actualizacion = "No disponible"
+    else:
+        fecha_actualizacion = "Columna FECHA no encontrada"
+    
+    # PREPROCESAMIENTO ESENCIAL
+    if "Codigo" in df.columns:
+        # Crear Codigo_O si no existe
+        if "Codigo_O" not in df.columns:
+            df.insert(0, "Codigo_O", df["Codigo"].where(
+                df["Codigo"].astype(str).str.startswith("O")
+            ).ffill().astype("category"))
         
-        # PREPROCESAMIENTO ESENCIAL
-        if "Codigo" in df.columns:
-            # Crear Codigo_O si no existe
-            if "Codigo_O" not in df.columns:
-                df.insert(0, "Codigo_O", df["Codigo"].where(
-                    df["Codigo"].astype(str).str.startswith("O")
-                ).ffill())
-            
-            # Asegurar columna Concepto de gasto
-            if "Concepto de gasto" in df.columns:
-                df["Concepto de gasto"] = df["Concepto de gasto"].ffill()
+        # Asegurar columna Concepto de gasto
+        if "Concepto de gasto" in df.columns:
+            df["Concepto de gasto"] = df["Concepto de gasto"].ffill().astype("category")
+    
+    # 🔹 ÍNDICE DE CLAVES COMPARTIDO (una sola vez por carga, incremental si hay previo)
+    indice = None
+    if "Codigo" in df.columns:
+        indice = construir_indice_claves(df, indice_previo)
+        indice["celdas_rechazadas"] = celdas_rechazadas
+        df["Codigo"] = indice["codigo"]
+    
+    return df, indice, fecha_actualizacion
+
+# =============================================================================
+# INSTANTÁNEA EN DISCO (ÚLTIMA VERSIÓN BUENA, FORMATO FEATHER)
+# =============================================================================
+RUTA_INSTANTANEA_DISCO = Path(os.environ.get(
+    "RUTA_INSTANTANEA_DATOS",
+    Path(__file__).resolve().parent / ".cache" / "datos_ultima_version.feather",
+))
+
+def guardar_instantanea_disco(datos, validadores):
+    """
+    Escribe la última carga buena en un archivo Feather sin comprimir (para
+    poder mapearlo en memoria al arrancar). Se escribe en un temporal y se
+    renombra, así un lector nunca ve un archivo a medias.
+    """
+    df, indice, fecha_actualizacion = datos
+    if feather is None or df is None:
+        return
+    try:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        metadatos = dict(tabla.schema.metadata or {})
+        metadatos[b"control_presupuestal"] = json.dumps({
+            "fecha_actualizacion": fecha_actualizacion,
+            "huella": validadores.get("huella"),
+            "etag": validadores.get("etag"),
+            "last_modified": validadores.get("last_modified"),
+            "celdas_rechazadas": (indice or {}).get("celdas_rechazadas", {}),
+        }).encode("utf-8")
+        tabla = tabla.replace_schema_metadata(metadatos)
+        
+        RUTA_INSTANTANEA_DISCO.parent.mkdir(parents=True, exist_ok=True)
+        temporal = RUTA_INSTANTANEA_DISCO.with_suffix(".tmp")
+        feather.write_feather(tabla, temporal, compression="uncompressed")
+        os.replace(temporal, RUTA_INSTANTANEA_DISCO)
+    except Exception as e:
+        logger.warning(f"No se pudo guardar la instantánea en disco: {e}")
+
+def cargar_instantanea_disco():
+    """
+    Lee la última instantánea guardada mapeando el archivo en memoria.
+    Returns:
+        Tupla (datos, validadores, modificado_en) o None si no hay archivo válido
+    """
+    if feather is None or not RUTA_INSTANTANEA_DISCO.exists():
+        return None
+    try:
+        tabla = feather.read_table(RUTA_INSTANTANEA_DISCO, memory_map=True)
+        metadatos = json.loads(tabla.schema.metadata[b"control_presupuestal"])
+        df = tabla.to_pandas()
+        
+        indice = construir_indice_claves(df)
+        df["Codigo"] = indice["codigo"]
+        indice["huella"] = metadatos["huella"]
+        indice["celdas_rechazadas"] = metadatos.get("celdas_rechazadas", {})
+        
+        validadores = {
+            "etag": metadatos.get("etag"),
+            "last_modified": metadatos.get("last_modified"),
+            "huella": metadatos["huella"],
+        }
+        datos = (df, indice, metadatos["fecha_actualizacion"])
+        return datos, validadores, RUTA_INSTANTANEA_DISCO.stat().st_mtime
+    except Exception as e:
+        logger.warning(f"Instantánea en disco ilegible, se ignora: {e}")
+        return None
+
+# =============================================================================
+# ACTUALIZADOR EN SEGUNDO PLANO (INSTANTÁNEA COMPARTIDA ENTRE SESIONES)
+# =============================================================================
+INTERVALO_ACTUALIZACION_SEG = int(os.environ.get("INTERVALO_ACTUALIZACION_SEG", "30"))
+UMBRAL_DATOS_DESACTUALIZADOS_SEG = 4 * INTERVALO_ACTUALIZACION_SEG
+MAX_DESCARGAS_SIMULTANEAS = 1
+
+@st.cache_resource
+def limite_descargas():
+    """Semáforo del proceso que limita cuántas descargas corren a la vez"""
+    return threading.BoundedSemaphore(MAX_DESCARGAS_SIMULTANEAS)
+
+def sincronizar_fuente(forzar=False, esperar=True, solicitado_en=None, solo_en_frio=False):
+    """
+    Descarga (condicional) y procesa la hoja principal, y publica la nueva
+    instantánea. No usa nada de Streamlit, así que puede correr en un hilo.
+
+    Args:
+        forzar: Saltar la petición condicional y pedir la hoja completa
+        esperar: Si hay otra descarga en curso, esperarla (True) o salir (False)
+        solicitado_en: Momento de la solicitud; si otra consulta empezó después,
+            su resultado ya es igual de reciente y esta se omite (coalescencia)
+        solo_en_frio: Omitirla si, al obtener el turno, otra descarga ya publicó
+            datos (la carga en frío no repite la del actualizador)
+    Returns:
+        True si se consultó la fuente, False si se omitió
+    """
+    semaforo = limite_descargas()
+    if not semaforo.acquire(blocking=esperar):
+        return False
+    try:
+        previo = obtener_estado_fuente(URL_DATOS)
+        if solicitado_en is not None and previo.get("consultado_en", 0) >= solicitado_en:
+            return False
+        if solo_en_frio and previo.get("datos") is not None:
+            return False
+        
+        # Descarga condicional: 304 o bytes idénticos reutilizan los datos ya procesados
+        consultado_en = time.time()
+        contenido, validadores = descargar_fuente(URL_DATOS, previo, forzar=forzar, plazo_seg=TIMEOUTS_FUENTES["datos"])
+        validadores["consultado_en"] = consultado_en
+        hash_actual = validadores["huella"]
+        
+        if previo.get("datos") is not None and hash_actual == previo.get("huella"):
+            datos = previo["datos"]
+        else:
+            indice_previo = previo["datos"][1] if previo.get("datos") is not None else None
+            df, indice, fecha_actualizacion = parsear_datos_originales(contenido, indice_previo)
+            if indice is not None:
+                indice["huella"] = hash_actual
+            datos = (df, indice, fecha_actualizacion)
+            guardar_instantanea_disco(datos, validadores)
+        
+        guardar_estado_fuente(URL_DATOS, validadores, datos, forzado=forzar)
+        return True
+    except Exception as e:
+        registrar_error_fuente(URL_DATOS, e)
+        raise
+    finally:
+        semaforo.release()
+
+def _ciclo_actualizador():
+    """Bucle del hilo: refresca la instantánea cada INTERVALO_ACTUALIZACION_SEG"""
+    while True:
+        try:
+            sincronizar_fuente(esperar=False)
+        except Exception as e:
+            logger.warning(f"Actualizador en segundo plano: {e}")
+        time.sleep(INTERVALO_ACTUALIZACION_SEG)
+
+@st.cache_resource
+def iniciar_actualizador():
+    """
+    Arranca una sola vez por proceso el hilo que mantiene los datos al día.
+    Antes publica la instantánea en disco (si existe) para que el primer
+    render no espere a Google Sheets; el hilo la refresca enseguida.
+    """
+    if obtener_estado_fuente(URL_DATOS).get("datos") is None:
+        guardada = cargar_instantanea_disco()
+        if guardada is not None:
+            datos, validadores, modificado_en = guardada
+            guardar_estado_fuente(URL_DATOS, validadores, datos, actualizado_en=modificado_en)
+    
+    hilo = threading.Thread(target=_ciclo_actualizador, name="actualizador-datos", daemon=True)
+    hilo.start()
+    return hilo
+
+def fijar_version_sesion(version=None):
+    """
+    Fija la versión de datos que usará la sesión: la indicada o la vigente.
+    Así todas las tablas de un mismo rerun salen de la misma instantánea.
+    """
+    if version is None:
+        version = obtener_estado_fuente(URL_DATOS).get("version")
+    st.session_state.version_datos = version
+
+def huella_sesion():
+    """Huella de la instantánea fijada para la sesión, o None si aún no hay"""
+    datos = obtener_version_fuente(URL_DATOS, st.session_state.get("version_datos"))
+    indice = datos[1] if datos is not None else None
+    return indice.get("huella") if indice else None
+
+def cargar_datos_originales():
+    """
+    Devuelve la instantánea de Google Sheets fijada para la sesión sin esperar
+    a la red. El hilo actualizador la mantiene al día; solo se descarga aquí en
+    el arranque en frío (aún no hay instantánea). Las recargas forzadas pasan
+    por invalidar_seccion, que publica una versión nueva.
+    Returns:
+        Tupla (DataFrame, índice de claves) o (None, None) si hay error.
+        El DataFrame es compartido entre sesiones: se lee, nunca se modifica.
+    """
+    try:
+        iniciar_actualizador()
+        
+        datos = None
+        if st.session_state.get("version_datos") is not None:
+            datos = obtener_version_fuente(URL_DATOS, st.session_state.version_datos)
+        
+        if datos is None:
+            futuro = solicitar_fuente("datos")
+            if futuro is not None:
+                with st.spinner("📥 Sincronizando con Google Sheets..."):
+                    if not esperar_fuente("datos", futuro) and not futuro.done():
+                        st.warning("⏳ Google Sheets tarda en responder; los datos aparecerán al actualizar")
+                        return None, None
+                    futuro.result()
+            instantanea = obtener_estado_fuente(URL_DATOS)
+            datos = instantanea["datos"]
+            fijar_version_sesion(instantanea["version"])
+        
+        df, indice, fecha_actualizacion = datos
         
-        # Indicador sutil de éxito
-        if not _fuerza_actualizacion:
-            hora_actual = datetime.now().strftime("%H:%M:%S")
-            st.sidebar.caption(f"Última sync: {hora_actual}")
-            # 🔹 Mostrar fecha en letras en la barra lateral
-            st.sidebar.caption(f"📅 {st.session_state.get('fecha_actualizacion', 'Desconocida')}")
+        # VALIDACIÓN CRÍTICA
+        if df is None:
+            st.warning("⚠️ La hoja está vacía o no es accesible")
+            return None, None
         
-        return df
+        st.session_state.fecha_actualizacion = fecha_actualizacion
+        return df, indice
         
     except Exception as e:
         # ERROR GRACEFUL - No colapsar la app
         st.error(f"❌ Error de conexión: {str(e)[:100]}...")
         
-        # CARGAR VERSIÓN EN CACHE COMO RESCATE
-        if 'df_backup' in st.session_state:
+        # CARGAR ÚLTIMA VERSIÓN BUENA DEL PROCESO COMO RESCATE (compartida, sin copias)
+        datos = obtener_estado_fuente(URL_DATOS).get("datos")
+        if datos is not None and datos[0] is not None:
             st.warning("⚠️ Usando datos en cache (fuente no disponible)")
-            return st.session_state.df_backup
+            return datos[0], datos[1]
         
-        return None
+        return None, None
 
-URL_MENSAJES_TABLERO = "https://docs.google.com/spreadsheets/d/1_ULHCXS9GSOCmv-e3pA2cekzUo7IIksH8H8JOijWZjw/export?format=csv&gid=0"
+def mostrar_estado_sincronizacion():
+    """
+    Muestra en la barra lateral la antigüedad de la instantánea, avisa si
+    está desactualizada y notifica a la sesión cuando llegan datos nuevos.
+    """
+    instantanea = obtener_estado_fuente(URL_DATOS)
+    if instantanea.get("actualizado_en") is None:
+        return
+    
+    # DETECTOR DE CAMBIOS INTELIGENTE (huella de los bytes crudos, sin re-serializar)
+    hash_actual = instantanea.get("huella")
+    if 'data_hash' not in st.session_state:
+        st.session_state.data_hash = hash_actual
+    elif st.session_state.data_hash != hash_actual:
+        # 🔹 Nombrar los bolsillos que cambiaron (solo si la sesión venía de la versión anterior)
+        indice = instantanea["datos"][1] if instantanea.get("datos") else None
+        cambios = (indice or {}).get("cambios")
+        detalle = ""
+        if cambios and cambios.get("huella_previa") == st.session_state.data_hash:
+            tablas = bolsillos_cambiados(indice)
+            nombres = [etiqueta for etiquetas in tablas.values() for etiqueta in etiquetas]
+            nombres = list(dict.fromkeys(nombres))
+            if nombres:
+                detalle = ": " + ", ".join(nombres[:6]) + (f" y {len(nombres) - 6} más" if len(nombres) > 6 else "")
+        st.session_state.data_hash = hash_actual
+        st.toast(f"✅ Nuevos datos detectados{detalle}", icon="🆕")
+        st.sidebar.success("📊 Datos actualizados")
+    
+    # Indicador de antigüedad de los datos
+    antiguedad = time.time() - instantanea["actualizado_en"]
+    hora_sync = datetime.fromtimestamp(instantanea["actualizado_en"]).strftime("%H:%M:%S")
+    if antiguedad > UMBRAL_DATOS_DESACTUALIZADOS_SEG:
+        st.sidebar.warning(f"⚠️ Datos desactualizados (última sync {hora_sync}, hace {int(antiguedad // 60)} min)")
+    else:
+        st.sidebar.caption(f"Última sync: {hora_sync}")
+    if instantanea.get("error"):
+        st.sidebar.caption(f"❌ Último intento fallido: {instantanea['error'][:60]}")
+    
+    # 🔹 Celdas de valores que no se pudieron leer como pesos (cuentan como $0)
+    indice = instantanea["datos"][1] if instantanea.get("datos") else None
+    rechazadas = sum((indice or {}).get("celdas_rechazadas", {}).values())
+    if rechazadas:
+        st.sidebar.caption(f"⚠️ {rechazadas} celdas de valores no numéricas se tomaron como $0")
+    
+    # 🔹 Mostrar fecha en letras en la barra lateral
+    st.sidebar.caption(f"📅 {fecha_actualizacion_vigente('Desconocida')}")
+
+URL_MENSAJES_TABLERO = os.environ.get(
+    "URL_MENSAJES_TABLERO",
+    "https://docs.google.com/spreadsheets/d/1_ULHCXS9GSOCmv-e3pA2cekzUo7IIksH8H8JOijWZjw/export?format=csv&gid=0",
+)
 
 # =============================================================================
 # CARGAR MENSAJES DEL TABLERO PRINCIPAL
 # =============================================================================
 
-@st.cache_data(ttl=60)
-def cargar_mensajes_tablero():
+TTL_MENSAJES_SEG = 60
+
+def parsear_mensajes(contenido):
     """
-    Carga los mensajes de la columna 'TABLERO PRINCIPAL' desde la hoja de mensajes.
+    Extrae los mensajes de la columna 'TABLERO PRINCIPAL' de la hoja de mensajes.
     Returns:
         Lista de strings con los mensajes no vacíos.
     """
     try:
-        df_mensajes = pd.read_csv(URL_MENSAJES_TABLERO)
+        df_mensajes = pd.read_csv(io.BytesIO(contenido))
         
         if "TABLERO PRINCIPAL" not in df_mensajes.columns:
             return []
@@ -862,513 +1676,563 @@ def cargar_mensajes_tablero():
         
     except Exception as e:
         return []
-# =============================================================================
-# FUNCIÓN DE PROCESAMIENTO TABLERO PRINCIPAL
-# =============================================================================
-def procesar_datos_sgp(fuerza_actualizacion=False):
-    """Función específica para procesar datos SGP"""
-    # Cargar datos
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
-    
-    if df is None:
-        return None, None
-    
-    try:        
-        # 🔹 CALCULAR 'ultimos_cuatro' LOCALMENTE (IMPORTANTE)
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
-        )
-        
-        # 🔹 GUARDAR BACKUP EN SESSION STATE
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 1. SGP CSF (Salarios + Parafiscales) ---
-        filtro_csf = (df["Codigo"].isin(["2-100-I002", "1-204-I012"]) & 
-            (ultimos_cuatro.between(1001, 1013) |
-             ultimos_cuatro.between(2020, 2031) |
-             ultimos_cuatro.between(3033, 3051))
-        )    
-        
-        csf = {
-            "INICIAL": df.loc[filtro_csf, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_csf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_csf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_csf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_csf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_csf, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_FOMAG_Empleado = (df["Codigo"].isin(["2-100-I002", "2-100-I001"]) & (ultimos_cuatro.isin([1017, 3058, 3059])))
-         
-        FOMAG_Empleado = {
-            "INICIAL": df.loc[filtro_FOMAG_Empleado, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_FOMAG_Empleado, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_FOMAG_Empleado, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_FOMAG_Empleado, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_FOMAG_Empleado, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_FOMAG_Empleado, "RECURSOS SIN EJECUTAR"].sum()
-        } 
-        
-        filtro_FOMAG_SSF_Patron = ((df["Codigo"] == "2-100-I001") & (ultimos_cuatro.isin([1018,1019, 3060, 3061, 3062, 3063])))
-         
-        FOMAG_SSF_Patron = {
-            "INICIAL": df.loc[filtro_FOMAG_SSF_Patron, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_FOMAG_SSF_Patron, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_FOMAG_SSF_Patron, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_FOMAG_SSF_Patron, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_FOMAG_SSF_Patron, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_FOMAG_SSF_Patron, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_FOMAG_CSF = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3052, 3054])))
-         
-        FOMAG_CSF = {
-            "INICIAL": df.loc[filtro_FOMAG_CSF, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_FOMAG_CSF, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_FOMAG_CSF, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_FOMAG_CSF, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_FOMAG_CSF, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_FOMAG_CSF, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_TOTAL_DOC_SGP = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-204-I012"]) 
-            & ultimos_cuatro.between(1001, 3063))
-         
-        TOTAL_DOC_SGP = {
-            "INICIAL": df.loc[filtro_TOTAL_DOC_SGP, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_TOTAL_DOC_SGP, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_DOC_SGP, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_DOC_SGP, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_DOC_SGP, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_DOC_SGP, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_ADTIVOS_SGP = (df["Codigo"].isin(["2-100-I002", "2-100-I026"]) & (ultimos_cuatro.isin([3065, 3066, 3067, 3068, 3069, 3070, 3071, 3072, 3073, 3074, 3075, 3076, 3077, 3078, 3079, 3080, 3081, 3082, 3083, 3084, 3085, 3086])))
-         
-        ADTIVOS_SGP = {
-            "INICIAL": df.loc[filtro_ADTIVOS_SGP, "DISPONIBLE"].sum(),
-            "DISPONIBLE": df.loc[filtro_ADTIVOS_SGP, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_ADTIVOS_SGP, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_ADTIVOS_SGP, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_ADTIVOS_SGP, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_ADTIVOS_SGP, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_TOTAL_SGP_P8033 = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "2-100-I026", "1-204-I012"]) 
-            & ultimos_cuatro.between(1001, 3086))
-         
-        TOTAL_SGP_P8033 = {
-            "INICIAL": df.loc[filtro_TOTAL_SGP_P8033, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_TOTAL_SGP_P8033, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_SGP_P8033, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_SGP_P8033, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_SGP_P8033, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_SGP_P8033, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_DOC_RP = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(1001, 3063)))
-
-        DOC_RP = {
-            "INICIAL": df.loc[filtro_DOC_RP, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_DOC_RP, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_DOC_RP, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_DOC_RP, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_DOC_RP, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_DOC_RP, "RECURSOS SIN EJECUTAR"].sum() 
-        }
 
-        filtro_ADTIVOS_RP = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(3065, 3086)))
+def sincronizar_mensajes(forzar=False):
+    """Descarga (condicional) la hoja de mensajes y publica la lista en el estado de fuentes"""
+    previo = obtener_estado_fuente(URL_MENSAJES_TABLERO)
+    try:
+        consultado_en = time.time()
+        contenido, validadores = descargar_fuente(URL_MENSAJES_TABLERO, previo, forzar=forzar, plazo_seg=TIMEOUTS_FUENTES["mensajes"])
+        validadores["consultado_en"] = consultado_en
+        if previo.get("datos") is not None and validadores["huella"] == previo.get("huella"):
+            mensajes = previo["datos"]
+        else:
+            mensajes = parsear_mensajes(contenido)
+        guardar_estado_fuente(URL_MENSAJES_TABLERO, validadores, mensajes, forzado=forzar)
+    except Exception as e:
+        registrar_error_fuente(URL_MENSAJES_TABLERO, e)
+        raise
 
-        ADTIVOS_RP = {
-            "INICIAL": df.loc[filtro_ADTIVOS_RP, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_ADTIVOS_RP, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_ADTIVOS_RP, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_ADTIVOS_RP, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_ADTIVOS_RP, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_ADTIVOS_RP, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def cargar_mensajes_tablero():
+    """
+    Devuelve los mensajes del tablero sin bloquear el render: si la copia
+    tiene más de TTL_MENSAJES_SEG se piden de nuevo en paralelo (ver
+    solicitar_fuente) y se espera como mucho hasta el plazo del rerun. Si la
+    descarga llega tarde, los mensajes aparecen en el siguiente rerun.
+    Returns:
+        Lista de strings con los mensajes no vacíos.
+    """
+    futuro = solicitar_fuente("mensajes")
+    esperar_fuente("mensajes", futuro)
+    return list(obtener_estado_fuente(URL_MENSAJES_TABLERO).get("datos") or [])
 
-        filtro_SENTENCIAS = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro == 3064))
+# =============================================================================
+# COORDINADOR DE DESCARGAS (FUENTES EN PARALELO)
+# =============================================================================
+# Plazo de cada fuente: lo que el render la espera y también el máximo para
+# obtener respuesta con todos sus reintentos (pedir_fuente). Un cuerpo que ya
+# empezó a llegar tarde se completa en segundo plano y se muestra en el siguiente rerun
+TIMEOUTS_FUENTES = {"datos": TIMEOUT_DESCARGA_SEG, "mensajes": 5}
 
-        SENTENCIAS = {
-            "INICIAL": df.loc[filtro_SENTENCIAS, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_SENTENCIAS, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_SENTENCIAS, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_SENTENCIAS, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_SENTENCIAS, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_SENTENCIAS, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+@st.cache_resource
+def coordinador_descargas():
+    """
+    Pool de hilos del proceso para descargar las fuentes a la vez, con la
+    descarga en curso y la hora de la última solicitud de cada fuente.
+    """
+    return {
+        "pool": ThreadPoolExecutor(max_workers=len(TIMEOUTS_FUENTES), thread_name_prefix="descarga"),
+        "bloqueo": threading.Lock(),
+        "en_curso": {},
+        "solicitado_en": {},
+    }
 
-        filtro_TOTAL_RP_P8033 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(1001, 3086)))
+def solicitar_fuente(fuente, forzar=False):
+    """
+    Lanza en el pool la descarga de una fuente si hace falta y devuelve su
+    Future (o None si la copia vigente sirve). Una descarga en curso se
+    comparte en lugar de repetirse.
+        datos: solo en el arranque en frío (después la mantiene el actualizador;
+            las recargas forzadas van por invalidar_seccion)
+        mensajes: cuando la copia tiene más de TTL_MENSAJES_SEG, o siempre con forzar
+    """
+    coordinador = coordinador_descargas()
+    with coordinador["bloqueo"]:
+        en_curso = coordinador["en_curso"].get(fuente)
+        if en_curso is not None and not en_curso.done():
+            return en_curso
+
+        if fuente == "datos":
+            if obtener_estado_fuente(URL_DATOS).get("datos") is not None:
+                return None
+            tarea = lambda: sincronizar_fuente(solo_en_frio=True)
+        else:
+            vencida = time.time() - coordinador["solicitado_en"].get(fuente, 0) >= TTL_MENSAJES_SEG
+            if not forzar and not vencida:
+                return None
+            tarea = lambda: sincronizar_mensajes(forzar=forzar)
 
-        TOTAL_RP_P8033 = {
-            "INICIAL": df.loc[filtro_TOTAL_RP_P8033, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_TOTAL_RP_P8033, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_RP_P8033, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_RP_P8033, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_RP_P8033, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_RP_P8033, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+        coordinador["solicitado_en"][fuente] = time.time()
+        futuro = coordinador["pool"].submit(tarea)
+        coordinador["en_curso"][fuente] = futuro
+        return futuro
 
-        filtro_PENSIONADOS = ((df["Codigo"] == "2-100-I017") & (ultimos_cuatro == 3087))
+def abrir_plazo_fuentes():
+    """
+    Fija la hora límite hasta la que este rerun espera cada fuente. Todas las
+    esperas del rerun comparten ese plazo, en lugar de sumar un timeout
+    completo por llamada.
+    """
+    ahora = time.time()
+    st.session_state.plazo_fuentes = {fuente: ahora + plazo for fuente, plazo in TIMEOUTS_FUENTES.items()}
 
-        PENSIONADOS = {
-            "INICIAL": df.loc[filtro_PENSIONADOS, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_PENSIONADOS, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_PENSIONADOS, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_PENSIONADOS, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_PENSIONADOS, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_PENSIONADOS, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def esperar_fuente(fuente, futuro):
+    """
+    Espera una descarga como mucho hasta el plazo del rerun para su fuente
+    (ver abrir_plazo_fuentes); si ya pasó, solo mira si terminó. Sin plazo
+    abierto se espera el timeout completo de la fuente.
+    Returns:
+        True si terminó bien (o no había nada que esperar), False si sigue
+        en curso o falló (los datos anteriores se conservan)
+    """
+    if futuro is None:
+        return True
+    limite = st.session_state.get("plazo_fuentes", {}).get(fuente)
+    restante = TIMEOUTS_FUENTES[fuente] if limite is None else max(0.0, limite - time.time())
+    try:
+        futuro.result(timeout=restante)
+        return True
+    except TimeoutError:
+        logger.warning(f"Fuente {fuente} sin respuesta en el plazo de {TIMEOUTS_FUENTES[fuente]}s; se completará en segundo plano")
+        return False
+    except Exception as e:
+        logger.warning(f"Fuente {fuente}: {e}")
+        return False
 
-        filtro_TOTAL_GENERAL = (df["Codigo"].isin(["2-100-I002", "2-100-I001","1-100-F001", "2-100-I026", "2-100-I017", "1-204-I012"]) 
-            & ultimos_cuatro.between(1001, 3087))
-         
-        TOTAL_GENERAL = {
-            "INICIAL": df.loc[filtro_TOTAL_GENERAL, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_TOTAL_GENERAL, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_GENERAL, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_GENERAL, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_GENERAL, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_GENERAL, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-        filtro_Asignar_Apoyo = (df["Codigo"].isin(["1-100-F001"]) 
-            & ultimos_cuatro.between(3088, 3120))
-                 
-        ASIGNAR_APOYO = {
-            "INICIAL": df.loc[filtro_Asignar_Apoyo, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_Asignar_Apoyo, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_Asignar_Apoyo, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_Asignar_Apoyo, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_Asignar_Apoyo, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_Asignar_Apoyo, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def precargar_fuentes():
+    """
+    Arranca a la vez las descargas que este rerun va a necesitar (hoja
+    principal en frío y mensajes vencidos), antes de pintar nada, y abre el
+    plazo de espera del rerun.
+    """
+    abrir_plazo_fuentes()
+    return {fuente: solicitar_fuente(fuente) for fuente in TIMEOUTS_FUENTES}
 
-        filtro_Bienestar_integral = (df["Codigo"].isin(["1-100-F001", "1-100-F039"]) 
-            & ultimos_cuatro.between(4089, 4099))
-                         
-        BIENESTAR_INTEGRAL = {
-            "INICIAL": df.loc[filtro_Bienestar_integral, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_Bienestar_integral, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_Bienestar_integral, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_Bienestar_integral, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_Bienestar_integral, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_Bienestar_integral, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+# =============================================================================
+# MOTOR DE BOLSILLOS (TABLAS DECLARATIVAS PROYECTADAS DESDE EL CUBO)
+# =============================================================================
+COLUMNAS_RP = ["DISPONIBLE", "RP EMITIDOS", "GIROS ACUMULADOS", "SALDO DE APROPIACION", "RECURSOS SIN EJECUTAR"]
+COLUMNAS_TABLERO = ["INICIAL"] + COLUMNAS_RP
+
+def rango(inicio, fin):
+    """Sufijos de inicio a fin, ambos incluidos (igual que Series.between)"""
+    return list(range(inicio, fin + 1))
+
+def texto_rangos(sufijos):
+    """Resume una lista de sufijos como rangos legibles (ej: "1001-1013, 2020")"""
+    sufijos = sorted(int(s) for s in sufijos)
+    partes, inicio = [], None
+    for i, sufijo in enumerate(sufijos):
+        if inicio is None:
+            inicio = sufijo
+        if i + 1 == len(sufijos) or sufijos[i + 1] != sufijo + 1:
+            partes.append(str(inicio) if inicio == sufijo else f"{inicio}-{sufijo}")
+            inicio = None
+    return ", ".join(partes)
+
+@st.cache_resource(show_spinner=False)
+def compilar_bolsillos(id_tabla, _definicion):
+    """
+    Compila los filtros de una tabla en una tabla de búsqueda densa:
+    para cada Codigo de la tabla, un arreglo indexado por sufijo (0..máximo)
+    con el id de su "átomo". Un átomo agrupa las claves que pertenecen
+    exactamente a las mismas filas de la tabla, así cada fila con filtro
+    es la suma de sus átomos aunque los totales se solapen con las hojas.
 
-        filtro_TOTAL_8033 = (df["Codigo"].isin(["2-100-I002", "2-100-I001","1-100-F001", "2-100-I026", "2-100-I017", "1-204-I012", "1-100-F039"]) 
-            & ultimos_cuatro.between(1001, 4099))
-                 
-        TOTAL_8033 = {
-            "INICIAL": df.loc[filtro_TOTAL_8033, "INICIAL"].sum(),
-            "DISPONIBLE": df.loc[filtro_TOTAL_8033, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_8033, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_8033, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_8033, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_8033, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    Al compilar se registran las claves que caen en dos hojas a la vez y los
+    sufijos que solo cuentan en un total (sin fila propia). Con cada
+    instantánea, sumar_filas_desde_cubo avisa además de las celdas con
+    valores que ninguna hoja muestra, para que un rubro nuevo no desaparezca
+    de la tabla sin que nadie lo note.
 
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-                csf,                                    
-                FOMAG_Empleado, FOMAG_SSF_Patron, FOMAG_CSF, TOTAL_DOC_SGP,
-                ADTIVOS_SGP, TOTAL_SGP_P8033, DOC_RP, ADTIVOS_RP, SENTENCIAS,
-                TOTAL_RP_P8033, PENSIONADOS, TOTAL_GENERAL, ASIGNAR_APOYO, BIENESTAR_INTEGRAL, TOTAL_8033                     
-            ],
-            index=[
-                "SGP CSF (Salarios + Parafiscales)", "FOMAG_Empleado", "FOMAG_SSF_Patron", 
-                "FOMAG_CSF", "TOTAL_DOC_SGP", "ADTIVOS_SGP", "TOTAL_SGP_P8033", "DOC_RP", "ADTIVOS_RP", "SENTENCIAS",
-                "TOTAL_RP_P8033", "PENSIONADOS", "TOTAL_GENERAL", "ASIGNAR_APOYO", "BIENESTAR_INTEGRAL", "TOTAL_8033"
-            ]
-        )
+    Se compila una vez por proceso y tabla (la definición no entra en la
+    clave de caché: hashearla costaría más que la propia proyección).
 
-        resumen = resumen_principal.copy()
-        
-        return df, resumen
-         
-    except Exception as e:
-        st.error(f"❌ Error en procesar_datos_sgp: {str(e)}")
-        import traceback
-        st.error(f"Detalle: {traceback.format_exc()}")
-        return None, None
+    Returns:
+        Diccionario con codigos, busqueda (codigos x sufijos -> átomo, -1 = fuera),
+        n_atomos, membresia (matriz filas de la tabla x átomos: cuántas veces
+        entra cada átomo en cada fila, incluidos los subtotales "suma") y
+        solo_total (átomos que ninguna hoja muestra)
+    """
+    filas_filtro = [fila for fila in _definicion["filas"] if "suma" not in fila]
+    codigos = sorted({codigo for fila in filas_filtro for codigo in fila["codigos"]})
+    posicion_codigo = {codigo: i for i, codigo in enumerate(codigos)}
+    ancho = max(max(fila["sufijos"]) for fila in filas_filtro) + 1
+
+    # 🔹 Pertenencia de cada clave (codigo, sufijo) a cada fila con filtro
+    pertenencia = np.zeros((len(codigos), ancho, len(filas_filtro)), dtype=bool)
+    for j, fila in enumerate(filas_filtro):
+        filas_codigo = [posicion_codigo[codigo] for codigo in fila["codigos"]]
+        pertenencia[np.ix_(filas_codigo, fila["sufijos"], [j])] = True
+
+    # 🔹 Reporte de cobertura: solapes entre hojas y sufijos sin hoja dentro de totales
+    es_hoja = np.array([not fila.get("total", False) for fila in filas_filtro])
+    hojas_por_clave = pertenencia[:, :, es_hoja].sum(axis=2)
+    for i, codigo in enumerate(codigos):
+        solapados = np.flatnonzero(hojas_por_clave[i] > 1)
+        if len(solapados):
+            logger.warning(f"[{id_tabla}] {codigo}: sufijos en más de una hoja: {texto_rangos(solapados)}")
+        for j, fila in enumerate(filas_filtro):
+            if not es_hoja[j]:
+                sin_hoja = np.flatnonzero(pertenencia[i, :, j] & (hojas_por_clave[i] == 0))
+                if len(sin_hoja):
+                    logger.info(f"[{id_tabla}] {fila['etiqueta']} incluye sin fila propia {codigo}: {texto_rangos(sin_hoja)}")
+
+    # 🔹 Átomos: combinaciones distintas de pertenencia (la vacía queda fuera)
+    planos = pertenencia.reshape(-1, len(filas_filtro))
+    firmas, atomo_de_clave = np.unique(planos, axis=0, return_inverse=True)
+    atomo_de_clave = atomo_de_clave.reshape(-1)
+    vacia = np.flatnonzero(~firmas.any(axis=1))
+    if len(vacia):
+        firmas = np.delete(firmas, vacia[0], axis=0)
+        atomo_de_clave = np.where(atomo_de_clave == vacia[0], -1,
+                                  atomo_de_clave - (atomo_de_clave > vacia[0]))
+
+    # 🔹 Matriz de membresía: las filas con filtro toman sus átomos y los
+    #    subtotales "suma" acumulan la membresía de sus filas hijas
+    filas_por_etiqueta = {}
+    columna_filtro = {fila["etiqueta"]: j for j, fila in enumerate(filas_filtro)}
+    for fila in _definicion["filas"]:
+        if "suma" in fila:
+            filas_por_etiqueta[fila["etiqueta"]] = sum(filas_por_etiqueta[hija] for hija in fila["suma"])
+        else:
+            filas_por_etiqueta[fila["etiqueta"]] = firmas[:, columna_filtro[fila["etiqueta"]]].astype(np.int64)
+
+    return {
+        "id_tabla": id_tabla,
+        "codigos": pd.Index(codigos),
+        "busqueda": atomo_de_clave.reshape(len(codigos), ancho).astype(np.int32),
+        "n_atomos": len(firmas),
+        "membresia": np.vstack([filas_por_etiqueta[fila["etiqueta"]] for fila in _definicion["filas"]]),
+        "solo_total": ~firmas[:, es_hoja].any(axis=1),
+    }
 
+@st.cache_resource
+def cache_avisos_cobertura():
+    """(tabla, huella) ya revisadas, para avisar una sola vez por instantánea"""
+    return {"bloqueo": threading.Lock(), "tablas": OrderedDict()}
 
-# =============================================================================
-# FUNCIÓN DE PROCESAMIENTO DOCENTES RP PRINCIPAL 
-# =============================================================================
-def procesar_datos_RP_principal(fuerza_actualizacion=False):
-    """Función específica para procesar datos de RECURSOS PROPIOS"""
-    # Cargar datos
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
-    
-    if df is None:
-        return None, None
-    
-    try:        
-        # 🔹 CALCULAR 'ultimos_cuatro' LOCALMENTE (IMPORTANTE)
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
+def avisar_celdas_sin_hoja(compilado, cubo, fila_codigo, atomos, valores):
+    """
+    Registra como WARNING las celdas con valores de los códigos de la tabla
+    que no llegan a ninguna hoja: sufijos fuera de todos los filtros o que
+    solo cuentan en totales. Es el caso de un rubro nuevo en la hoja.
+    """
+    clasificadas = atomos >= 0
+    solo_total = np.zeros(len(atomos), dtype=bool)
+    solo_total[clasificadas] = compilado["solo_total"][atomos[clasificadas]]
+    con_valor = (valores.to_numpy() != 0).any(axis=1)
+    sin_hoja = (fila_codigo >= 0) & (~clasificadas | solo_total) & con_valor
+
+    sufijos = pd.Series(cubo["sufijos"][sin_hoja]).groupby(np.asarray(cubo["codigos"])[sin_hoja])
+    for codigo, sufijos_codigo in sufijos:
+        logger.warning(
+            f"[{compilado['id_tabla']}] {codigo}: sufijos con valores que ninguna fila muestra: "
+            f"{texto_rangos(sorted(sufijos_codigo))}"
         )
-        
-        # 🔹 GUARDAR BACKUP EN SESSION STATE
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 1. DEFINIR FILTROS (CORREGIDO el error de sintaxis) ---
-        filtro_SUELDO_BASICO = (
-            (df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.isin([3033, 3034, 3035, 2020, 1001, 1002]))  # ¡CORREGIDO: isin() con paréntesis!
-        )    
-        
-        SUELDO_BASICO = {
-            "DISPONIBLE": df.loc[filtro_SUELDO_BASICO, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_SUELDO_BASICO, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_SUELDO_BASICO, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_SUELDO_BASICO, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_SUELDO_BASICO, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_horas_extras = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3036, 2021, 1003])))
-         
-        HORAS_EXTRAS = {
-            "DISPONIBLE": df.loc[filtro_horas_extras, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_horas_extras, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_horas_extras, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_horas_extras, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_horas_extras, "RECURSOS SIN EJECUTAR"].sum()
-        } 
-        
-        filtro_prima_servicios = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3037, 2022, 1004])))
-         
-        PRIMA_SERVICIOS = {
-            "DISPONIBLE": df.loc[filtro_prima_servicios, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_prima_servicios, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_prima_servicios, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_prima_servicios, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_prima_servicios, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_prima_vacaciones = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3038, 2023, 1005])))
-         
-        PRIMA_VACACIONES = {
-            "DISPONIBLE": df.loc[filtro_prima_vacaciones, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_prima_vacaciones, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_prima_vacaciones, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_prima_vacaciones, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_prima_vacaciones, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_prima_navidad = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3039, 2024, 1006])))
-         
-        PRIMA_NAVIDAD = {
-            "DISPONIBLE": df.loc[filtro_prima_navidad, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_prima_navidad, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_prima_navidad, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_prima_navidad, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_prima_navidad, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_sub_alimentacion = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3040, 1007])))
-         
-        SUB_ALIMENTACION = {
-            "DISPONIBLE": df.loc[filtro_sub_alimentacion, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sub_alimentacion, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sub_alimentacion, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sub_alimentacion, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sub_alimentacion, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_aux_transporte = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3041, 1008])))
-         
-        AUX_TRANSPORTE = {
-            "DISPONIBLE": df.loc[filtro_aux_transporte, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_aux_transporte, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_aux_transporte, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_aux_transporte, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_aux_transporte, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    return True
 
-        filtro_SUELDOS = (
-        (df["Codigo"] == "1-100-F001") &
-        (
-        ultimos_cuatro.between(1001, 1008) |
-        ultimos_cuatro.between(2020, 2024) |
-        ultimos_cuatro.between(3033, 3041)
+def sumar_filas_desde_cubo(compilado, cubo, columnas, huella=None):
+    """
+    Clasifica cada celda del cubo con una sola indexación en la tabla de
+    búsqueda compilada y devuelve todas las filas de la tabla (hojas y
+    subtotales) de un único producto membresía @ sumas por átomo.
+    Con huella, revisa además (una vez por tabla e instantánea) que ninguna
+    celda con valores quede fuera de las hojas (ver avisar_celdas_sin_hoja).
+
+    Returns:
+        ndarray filas de la tabla x columnas, con el tipo de los valores del cubo
+    """
+    valores = cubo["valores"][columnas]
+
+    # 🔹 Clasificar todas las celdas del cubo de una vez (-1 = fuera de la tabla)
+    busqueda = compilado["busqueda"]
+    fila_codigo = compilado["codigos"].get_indexer(cubo["codigos"])
+    sufijos = cubo["sufijos"].astype(np.int64)
+    dentro = (fila_codigo >= 0) & (sufijos < busqueda.shape[1])
+    atomos = np.full(len(sufijos), -1, dtype=np.int32)
+    atomos[dentro] = busqueda[fila_codigo[dentro], sufijos[dentro]]
+
+    if huella is not None:
+        memoizar_lru(
+            cache_avisos_cobertura(), (compilado["id_tabla"], huella),
+            lambda: avisar_celdas_sin_hoja(compilado, cubo, fila_codigo, atomos, valores),
+            MAX_TABLAS_EN_CACHE,
         )
-         )
-
-        SUELDOS = {
-            "DISPONIBLE": df.loc[filtro_SUELDOS, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_SUELDOS, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_SUELDOS, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_SUELDOS, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_SUELDOS, "RECURSOS SIN EJECUTAR"].sum() 
-        }
 
-        filtro_compensar = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3042, 3043, 2025, 1009])))
+    clasificadas = atomos >= 0
+    sumas_atomos = (
+        valores[clasificadas]
+        .groupby(atomos[clasificadas])
+        .sum()
+        .reindex(range(compilado["n_atomos"]), fill_value=0)
+    )
+    return compilado["membresia"] @ sumas_atomos.to_numpy()
 
-        COMPENSAR = {
-            "DISPONIBLE": df.loc[filtro_compensar, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_compensar, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_compensar, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_compensar, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_compensar, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def calcular_bolsillos(cubo, id_tabla, definicion, huella=None):
+    """
+    Proyecta una tabla de bolsillos desde el cubo de la carga actual
+    (ver sumar_filas_desde_cubo). Las filas marcadas "total": True son
+    totales con filtro propio: cubren rangos completos de sufijos y por eso
+    no equivalen a la suma de las filas que muestran.
 
-        filtro_icbf = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3044, 3045, 2026, 1010])))
+    Args:
+        cubo: Cubo construido por construir_cubo
+        id_tabla: Identificador de la tabla (para la compilación y los reportes)
+        definicion: Diccionario con "columnas", "filas" y opcionalmente "textos"
+            (columnas descriptivas; las filas que no las traen muestran "---")
+        huella: Huella de la instantánea, para revisar su cobertura una sola vez
 
-        ICBF = {
-            "DISPONIBLE": df.loc[filtro_icbf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_icbf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_icbf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_icbf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_icbf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    Returns:
+        DataFrame resumen con una fila por etiqueta, en el orden de la definición
+    """
+    compilado = compilar_bolsillos(id_tabla, definicion)
+    columnas = definicion["columnas"]
 
-        filtro_escuelas_tecnicas = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3046, 3047, 2027, 1011])))
+    etiquetas_tabla = [fila["etiqueta"] for fila in definicion["filas"]]
+    resumen = pd.DataFrame(
+        sumar_filas_desde_cubo(compilado, cubo, columnas, huella),
+        index=etiquetas_tabla,
+        columns=columnas,
+    ).astype(cubo["valores"][columnas].dtypes.to_dict())
 
-        ESCUELAS_TECNICAS = {
-            "DISPONIBLE": df.loc[filtro_escuelas_tecnicas, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_escuelas_tecnicas, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_escuelas_tecnicas, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_escuelas_tecnicas, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_escuelas_tecnicas, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    # 🔹 Columnas descriptivas (NOMBRE, CONCEPTO...) al inicio, como en pantalla
+    for posicion, columna in enumerate(definicion.get("textos", [])):
+        resumen.insert(posicion, columna, [fila.get(columna, "---") for fila in definicion["filas"]])
 
-        filtro_sena = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3048, 3049, 2028, 1012])))
+    return resumen
 
-        SENA = {
-            "DISPONIBLE": df.loc[filtro_sena, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sena, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sena, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sena, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sena, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def filas_cambiadas(cambios, id_tabla, definicion, huella=None):
+    """
+    Diferencias de una tabla entre la instantánea anterior y la actual,
+    calculadas solo con las celdas del cubo que cambiaron. Se guardan en
+    cambios para que el aviso de la barra lateral y la actualización
+    incremental de la tabla las reutilicen.
 
-        filtro_esap = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3050, 3051, 2029, 1013])))
+    Con huella se revisa la cobertura de las celdas que cambiaron: un rubro
+    nuevo llega siempre como celda cambiada.
 
-        ESAP = {
-            "DISPONIBLE": df.loc[filtro_esap, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_esap, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_esap, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_esap, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_esap, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    Returns:
+        ndarray filas de la tabla x columnas con nuevo - previo
+    """
+    por_tabla = cambios.setdefault("tablas", {})
+    if id_tabla not in por_tabla:
+        compilado = compilar_bolsillos(id_tabla, definicion)
+        por_tabla[id_tabla] = sumar_filas_desde_cubo(compilado, cambios["cubo"], definicion["columnas"], huella)
+    return por_tabla[id_tabla]
 
-        filtro_parafiscales = ((df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.between(3042, 3051) |
-             ultimos_cuatro.between(2025, 2029) |
-             ultimos_cuatro.between(1009, 1013)))
-
-        PARAFISCALES = {
-            "DISPONIBLE": df.loc[filtro_parafiscales, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_parafiscales, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_parafiscales, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_parafiscales, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_parafiscales, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def proyectar_bolsillos(indice, id_tabla, definicion):
+    """
+    Tabla de bolsillos de la carga actual. Si la instantánea llegó con
+    diferencias respecto a la anterior y esa tabla ya estaba calculada,
+    solo se le suman las diferencias de las celdas que cambiaron (las filas
+    y totales que no contienen esas celdas quedan igual); si no, se
+    proyecta completa desde el cubo.
+    """
+    cambios = indice.get("cambios")
+    previo = consultar_resumen_cacheado(id_tabla, cambios["huella_previa"]) if cambios else None
+    if previo is None:
+        return calcular_bolsillos(indice["cubo"], id_tabla, definicion, indice.get("huella"))
 
-        filtro_salud = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3052, 3053, 2030, 1014])))
+    columnas = definicion["columnas"]
+    resumen = previo.copy()
+    resumen[columnas] = previo[columnas] + filas_cambiadas(cambios, id_tabla, definicion, indice.get("huella"))
+    return resumen
 
-        SALUD = {
-            "DISPONIBLE": df.loc[filtro_salud, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_salud, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_salud, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_salud, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_salud, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+# =============================================================================
+# CACHÉ DE TABLAS RESUMEN (COMPARTIDA ENTRE SESIONES)
+# =============================================================================
+MAX_TABLAS_EN_CACHE = 64
 
-        filtro_pension = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3054, 3055, 2031, 1015])))
+@st.cache_resource
+def cache_resultados():
+    """
+    Caché de tablas resumen a nivel de proceso, indexada por (huella de los datos, tabla).
+    Se crea una sola vez y la comparten todas las sesiones.
+    """
+    return {"bloqueo": threading.Lock(), "tablas": OrderedDict()}
 
-        PENSION = {
-            "DISPONIBLE": df.loc[filtro_pension, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_pension, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_pension, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_pension, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_pension, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def memoizar_lru(cache, clave, calcular, maximo):
+    """
+    Devuelve cache["tablas"][clave] o lo calcula fuera del bloqueo, lo guarda
+    y descarta los más antiguos por encima de maximo entradas.
+    """
+    with cache["bloqueo"]:
+        if clave in cache["tablas"]:
+            cache["tablas"].move_to_end(clave)
+            return cache["tablas"][clave]
 
-        filtro_cesantias = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3056, 3057, 2032, 1016])))
+    valor = calcular()
 
-        CESANTIAS = {
-            "DISPONIBLE": df.loc[filtro_cesantias, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_cesantias, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_cesantias, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_cesantias, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_cesantias, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    with cache["bloqueo"]:
+        cache["tablas"][clave] = valor
+        while len(cache["tablas"]) > maximo:
+            cache["tablas"].popitem(last=False)
+    return valor
 
-        filtro_fomag = ((df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.between(3052, 3057) |
-             ultimos_cuatro.between(2030, 2032) |
-             ultimos_cuatro.between(1014, 1016)))
-
-        FOMAG = {
-            "DISPONIBLE": df.loc[filtro_fomag, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+def obtener_resumen_cacheado(id_tabla, huella, calcular):
+    """
+    Devuelve la tabla resumen ya calculada para esta huella de datos o la calcula.
+    La tabla guardada lleva la huella en attrs["huella"] para que las vistas
+    (ver renderizar_tabla_html) puedan cachear por instantánea.
 
-        filtro_total_doc_rp = ((df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.between(1001, 3057)))
+    Args:
+        id_tabla: Identificador de la tabla (ej: "RP_principal")
+        huella: Hash del contenido de los datos cargados (None = no cachear)
+        calcular: Función sin argumentos que construye el resumen
 
-        TOTAL_DOC_RP = {
-            "DISPONIBLE": df.loc[filtro_total_doc_rp, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_total_doc_rp, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_total_doc_rp, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_total_doc_rp, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_total_doc_rp, "RECURSOS SIN EJECUTAR"].sum() 
-        }
+    Returns:
+        DataFrame resumen (compartido, no debe modificarse en sitio)
+    """
+    if huella is None:
+        return calcular()
+
+    def calcular_con_huella():
+        resumen = calcular()
+        resumen.attrs["huella"] = huella
+        return resumen
+
+    return memoizar_lru(cache_resultados(), (huella, id_tabla), calcular_con_huella, MAX_TABLAS_EN_CACHE)
+
+def consultar_resumen_cacheado(id_tabla, huella):
+    """Devuelve la tabla resumen cacheada para esa huella, o None si no está (no calcula)"""
+    cache = cache_resultados()
+    with cache["bloqueo"]:
+        return cache["tablas"].get((huella, id_tabla))
+
+def invalidar_resumenes(ids_tabla):
+    """Descarta las tablas resumen cacheadas de los identificadores indicados (todas las huellas)"""
+    cache = cache_resultados()
+    with cache["bloqueo"]:
+        for clave in [c for c in cache["tablas"] if c[1] in ids_tabla]:
+            del cache["tablas"][clave]
+
+# =============================================================================
+# INVALIDACIÓN DIRIGIDA POR SECCIÓN
+# =============================================================================
+# Qué depende de cada botón "Actualizar": tablas resumen y fuentes auxiliares
+DEPENDENCIAS_SECCIONES = {
+    "tablero": {"tablas": ["sgp"], "mensajes": True},
+    "rp_todos": {"tablas": ["RP_principal", "RP_primera_infancia", "RP_orientadores", "RP_primaria_basica_media"]},
+    "rp_total": {"tablas": ["RP_principal"]},
+    "rp_primera_infancia": {"tablas": ["RP_primera_infancia"]},
+    "rp_orientadores": {"tablas": ["RP_orientadores"]},
+    "rp_pbm": {"tablas": ["RP_primaria_basica_media"]},
+    "sgp_todos": {"tablas": ["SGP_principal", "SGP_primera_infancia_detallada", "SGP_primaria_basica_media_detallada"]},
+    "sgp_total": {"tablas": ["SGP_principal"]},
+    "sgp_primera_infancia": {"tablas": ["SGP_primera_infancia_detallada"]},
+    "sgp_pbm": {"tablas": ["SGP_primaria_basica_media_detallada"]},
+}
+
+def invalidar_seccion(seccion):
+    """
+    Refresca solo lo que necesita una sección: vuelve a pedir la hoja principal
+    (las solicitudes simultáneas comparten una sola descarga) y descarta las
+    tablas resumen de la sección. El resto de cachés del proceso no se toca.
+
+    Args:
+        seccion: Clave de DEPENDENCIAS_SECCIONES
+    Returns:
+        True si la actualización terminó sin errores
+    """
+    dependencias = DEPENDENCIAS_SECCIONES[seccion]
+    try:
+        # 🔹 Mensajes forzados en paralelo mientras se sincroniza la hoja principal
+        futuro_mensajes = solicitar_fuente("mensajes", forzar=True) if dependencias.get("mensajes") else None
+        abrir_plazo_fuentes()
+        with st.spinner("📥 Sincronizando con Google Sheets..."):
+            sincronizar_fuente(forzar=True, solicitado_en=time.time())
+            esperar_fuente("mensajes", futuro_mensajes)
+        invalidar_resumenes(dependencias["tablas"])
+        fijar_version_sesion()
+        st.toast("🔄 Actualización forzada solicitada", icon="📡")
+        return True
+    except Exception as e:
+        st.error(f"❌ Error de conexión: {str(e)[:100]}...")
+        return False
 
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-                SUELDO_BASICO, 
-                HORAS_EXTRAS, 
-                PRIMA_SERVICIOS, 
-                PRIMA_VACACIONES, 
-                PRIMA_NAVIDAD, 
-                SUB_ALIMENTACION, 
-                AUX_TRANSPORTE,
-                SUELDOS,
-                COMPENSAR,
-                ICBF,
-                ESCUELAS_TECNICAS,
-                SENA,
-                ESAP,
-                PARAFISCALES,
-                SALUD,
-                PENSION, 
-                CESANTIAS, 
-                FOMAG, TOTAL_DOC_RP
-            ],
-            index=[
-                "SUELDO BÁSICO", 
-                "HORAS EXTRAS", 
-                "PRIMA DE SERVICIOS", 
-                "PRIMA DE VACACIONES", 
-                "PRIMA DE NAVIDAD",
-                "SUBSIDIO DE ALIMENTACIÓN", 
-                "AUXILIO DE TRANSPORTE",
-                "SUELDOS",
-                "COMPENSAR",
-                "ICBF",
-                "ESCUELAS_TECNICAS",
-                "SENA",
-                "ESAP",
-                "PARAFISCALES",
-                "SALUD", 
-                "PENSION", 
-                "CESANTIAS", 
-                "FOMAG", "TOTAL_DOC_RP"
-            ]
+# =============================================================================
+# FUNCIÓN DE PROCESAMIENTO TABLERO PRINCIPAL
+# =============================================================================
+BOLSILLOS_TABLERO = {
+    "columnas": COLUMNAS_TABLERO,
+    "filas": [
+        {"etiqueta": "SGP CSF (Salarios + Parafiscales)", "codigos": ["1-204-I012", "2-100-I002"], "sufijos": rango(1001, 1013) + rango(2020, 2031) + rango(3033, 3051)},
+        {"etiqueta": "FOMAG_Empleado", "codigos": ["2-100-I001", "2-100-I002"], "sufijos": [1017, 3058, 3059]},
+        {"etiqueta": "FOMAG_SSF_Patron", "codigos": ["2-100-I001"], "sufijos": [1018, 1019] + rango(3060, 3063)},
+        {"etiqueta": "FOMAG_CSF", "codigos": ["2-100-I002"], "sufijos": [3052, 3054]},
+        {"etiqueta": "TOTAL_DOC_SGP", "codigos": ["1-204-I012", "2-100-I001", "2-100-I002"], "sufijos": rango(1001, 3063), "total": True},
+        {"etiqueta": "ADTIVOS_SGP", "codigos": ["2-100-I002", "2-100-I026"], "sufijos": rango(3065, 3086)},
+        {"etiqueta": "TOTAL_SGP_P8033", "codigos": ["1-204-I012", "2-100-I001", "2-100-I002", "2-100-I026"], "sufijos": rango(1001, 3086), "total": True},
+        {"etiqueta": "DOC_RP", "codigos": ["1-100-F001"], "sufijos": rango(1001, 3063)},
+        {"etiqueta": "ADTIVOS_RP", "codigos": ["1-100-F001"], "sufijos": rango(3065, 3086)},
+        {"etiqueta": "SENTENCIAS", "codigos": ["1-100-F001"], "sufijos": [3064]},
+        {"etiqueta": "TOTAL_RP_P8033", "suma": ["DOC_RP", "ADTIVOS_RP", "SENTENCIAS"]},
+        {"etiqueta": "PENSIONADOS", "codigos": ["2-100-I017"], "sufijos": [3087]},
+        {"etiqueta": "TOTAL_GENERAL", "codigos": ["1-100-F001", "1-204-I012", "2-100-I001", "2-100-I002", "2-100-I017", "2-100-I026"], "sufijos": rango(1001, 3087), "total": True},
+        {"etiqueta": "ASIGNAR_APOYO", "codigos": ["1-100-F001"], "sufijos": rango(3088, 3120)},
+        {"etiqueta": "BIENESTAR_INTEGRAL", "codigos": ["1-100-F001", "1-100-F039"], "sufijos": rango(4089, 4099)},
+        {"etiqueta": "TOTAL_8033", "codigos": ["1-100-F001", "1-100-F039", "1-204-I012", "2-100-I001", "2-100-I002", "2-100-I017", "2-100-I026"], "sufijos": rango(1001, 4099), "total": True},
+    ],
+}
+
+def procesar_datos_sgp():
+    """Función específica para procesar datos SGP"""
+    # Cargar datos
+    df, indice = cargar_datos_originales()
+    
+    if df is None:
+        return None, None
+    
+    try:        
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "sgp", indice["huella"], lambda: proyectar_bolsillos(indice, "sgp", BOLSILLOS_TABLERO)
         )
+        
+        return df, resumen
+         
+    except Exception as e:
+        st.error(f"❌ Error en procesar_datos_sgp: {str(e)}")
+        import traceback
+        st.error(f"Detalle: {traceback.format_exc()}")
+        return None, None
+
 
-        resumen = resumen_principal.copy()
+# =============================================================================
+# FUNCIÓN DE PROCESAMIENTO DOCENTES RP PRINCIPAL 
+# =============================================================================
+BOLSILLOS_RP_PRINCIPAL = {
+    "columnas": COLUMNAS_RP,
+    "filas": [
+        {"etiqueta": "SUELDO BÁSICO", "codigos": ["1-100-F001"], "sufijos": [3033, 3034, 3035, 2020, 1001, 1002]},
+        {"etiqueta": "HORAS EXTRAS", "codigos": ["1-100-F001"], "sufijos": [3036, 2021, 1003]},
+        {"etiqueta": "PRIMA DE SERVICIOS", "codigos": ["1-100-F001"], "sufijos": [3037, 2022, 1004]},
+        {"etiqueta": "PRIMA DE VACACIONES", "codigos": ["1-100-F001"], "sufijos": [3038, 2023, 1005]},
+        {"etiqueta": "PRIMA DE NAVIDAD", "codigos": ["1-100-F001"], "sufijos": [3039, 2024, 1006]},
+        {"etiqueta": "SUBSIDIO DE ALIMENTACIÓN", "codigos": ["1-100-F001"], "sufijos": [3040, 1007]},
+        {"etiqueta": "AUXILIO DE TRANSPORTE", "codigos": ["1-100-F001"], "sufijos": [3041, 1008]},
+        {"etiqueta": "SUELDOS", "suma": [
+            "SUELDO BÁSICO", "HORAS EXTRAS", "PRIMA DE SERVICIOS", "PRIMA DE VACACIONES",
+            "PRIMA DE NAVIDAD", "SUBSIDIO DE ALIMENTACIÓN", "AUXILIO DE TRANSPORTE"
+        ]},
+        {"etiqueta": "COMPENSAR", "codigos": ["1-100-F001"], "sufijos": [3042, 3043, 2025, 1009]},
+        {"etiqueta": "ICBF", "codigos": ["1-100-F001"], "sufijos": [3044, 3045, 2026, 1010]},
+        {"etiqueta": "ESCUELAS_TECNICAS", "codigos": ["1-100-F001"], "sufijos": [3046, 3047, 2027, 1011]},
+        {"etiqueta": "SENA", "codigos": ["1-100-F001"], "sufijos": [3048, 3049, 2028, 1012]},
+        {"etiqueta": "ESAP", "codigos": ["1-100-F001"], "sufijos": [3050, 3051, 2029, 1013]},
+        {"etiqueta": "PARAFISCALES", "suma": ["COMPENSAR", "ICBF", "ESCUELAS_TECNICAS", "SENA", "ESAP"]},
+        {"etiqueta": "SALUD", "codigos": ["1-100-F001"], "sufijos": [3052, 3053, 2030, 1014]},
+        {"etiqueta": "PENSION", "codigos": ["1-100-F001"], "sufijos": [3054, 3055, 2031, 1015]},
+        {"etiqueta": "CESANTIAS", "codigos": ["1-100-F001"], "sufijos": [3056, 3057, 2032, 1016]},
+        {"etiqueta": "FOMAG", "suma": ["SALUD", "PENSION", "CESANTIAS"]},
+        {"etiqueta": "TOTAL_DOC_RP", "suma": ["SUELDOS", "PARAFISCALES", "FOMAG"]},
+    ],
+}
+
+def procesar_datos_RP_principal():
+    """Función específica para procesar datos de RECURSOS PROPIOS"""
+    # Cargar datos
+    df, indice = cargar_datos_originales()
+    
+    if df is None:
+        return None, None
+    
+    try:        
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "RP_principal", indice["huella"], lambda: proyectar_bolsillos(indice, "RP_principal", BOLSILLOS_RP_PRINCIPAL)
+        )
         
         return df, resumen
          
@@ -1382,290 +2246,137 @@ def procesar_datos_RP_principal(fuerza_actualizacion=False):
 # FUNCIÓN DE PROCESAMIENTO DOCENTES RP PRIMERA INFANCIA
 # =============================================================================
 
-def procesar_datos_RP_primera_infancia(fuerza_actualizacion=False):
+BOLSILLOS_RP_PRIMERA_INFANCIA = {
+    "columnas": COLUMNAS_RP,
+    "textos": ["NOMBRE", "CONCEPTO"],
+    "filas": [
+        {"etiqueta": "O2301172201202401690307101001", "codigos": ["1-100-F001"], "sufijos": [1001],
+         "NOMBRE": "Pago de Personal Docente primera infancia", "CONCEPTO": "O231010100101 Sueldo básico"},
+        {"etiqueta": "O2301172201202401690307101002", "codigos": ["1-100-F001"], "sufijos": [1002],
+         "NOMBRE": "Pago de Ascensos en escalafon del Personal", "CONCEPTO": "O231010100101 Sueldo básico"},
+        {"etiqueta": "O2301172201202401690307101003", "codigos": ["1-100-F001"], "sufijos": [1003],
+         "NOMBRE": "Pago de horas extras del personal docente", "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos"},
+        {"etiqueta": "O2301172201202401690307101004", "codigos": ["1-100-F001"], "sufijos": [1004],
+         "NOMBRE": "Pago de Personal Docente prima de servicio", "CONCEPTO": "O231010100106 Prima de servicio"},
+        {"etiqueta": "O2301172201202401690307101005", "codigos": ["1-100-F001"], "sufijos": [1005],
+         "NOMBRE": "Pago de Personal Docente prima de vacaciones", "CONCEPTO": "O23101010010802 Prima de vacaciones"},
+        {"etiqueta": "O2301172201202401690307101006", "codigos": ["1-100-F001"], "sufijos": [1006],
+         "NOMBRE": "Pago de Personal Docente prima de navidad", "CONCEPTO": "O23101010010801 Prima de navidad"},
+        {"etiqueta": "O2301172201202401690307101007", "codigos": ["1-100-F001"], "sufijos": [1007],
+         "NOMBRE": "Pago de Personal Docente subsidio de alimentacion", "CONCEPTO": "O231010100104 Subsidio de alimentación"},
+        {"etiqueta": "O2301172201202401690307101008", "codigos": ["1-100-F001"], "sufijos": [1008],
+         "NOMBRE": "Pago Auxili de transporte personal docente", "CONCEPTO": "O231010100105 Auxilio de Transporte"},
+        {"etiqueta": "SUELDOS", "suma": ["O2301172201202401690307101001", "O2301172201202401690307101002",
+            "O2301172201202401690307101003", "O2301172201202401690307101004", "O2301172201202401690307101005",
+            "O2301172201202401690307101006", "O2301172201202401690307101007", "O2301172201202401690307101008"]},
+        {"etiqueta": "O2301172201202401690307101009", "codigos": ["1-100-F001"], "sufijos": [1009],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compen", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307101010", "codigos": ["1-100-F001"], "sufijos": [1010],
+         "NOMBRE": "Pago de Aportes para el ICBF personal docente", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307101011", "codigos": ["1-100-F001"], "sufijos": [1011],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos"},
+        {"etiqueta": "O2301172201202401690307101012", "codigos": ["1-100-F001"], "sufijos": [1012],
+         "NOMBRE": "Pago de Aportes para el SENA personal docentes", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307101013", "codigos": ["1-100-F001"], "sufijos": [1013],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "PARAFISCALES", "suma": ["O2301172201202401690307101009",
+            "O2301172201202401690307101010", "O2301172201202401690307101011", "O2301172201202401690307101012",
+            "O2301172201202401690307101013"]},
+        {"etiqueta": "O2301172201202401690307101014", "codigos": ["1-100-F001"], "sufijos": [1014],
+         "NOMBRE": "Pago de Aportes para Salud del personal", "CONCEPTO": "O231010200201 Pago de Aportes para Salud del personal"},
+        {"etiqueta": "O2301172201202401690307101015", "codigos": ["1-100-F001"], "sufijos": [1015],
+         "NOMBRE": "Pago de Aportes para Pension del persona", "CONCEPTO": "O231010200101 Pago de Aportes para Pension del persona"},
+        {"etiqueta": "O2301172201202401690307101016", "codigos": ["1-100-F001"], "sufijos": [1016],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos"},
+        {"etiqueta": "FOMAG", "suma": ["O2301172201202401690307101014", "O2301172201202401690307101015",
+            "O2301172201202401690307101016"]},
+        {"etiqueta": "TOTAL_PRIMERA_INFANCIA", "suma": ["SUELDOS", "PARAFISCALES", "FOMAG"]},
+    ],
+}
+
+def procesar_datos_RP_primera_infancia():
     """Función específica para procesar datos de RECURSOS PROPIOS"""
     # Cargar datos
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
+    df, indice = cargar_datos_originales()
     
     if df is None:
         return None, None
     
     try:        
-        # 🔹 CALCULAR 'ultimos_dos' LOCALMENTE (IMPORTANTE)
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "RP_primera_infancia", indice["huella"], lambda: proyectar_bolsillos(indice, "RP_primera_infancia", BOLSILLOS_RP_PRIMERA_INFANCIA)
         )
         
-        # 🔹 GUARDAR BACKUP EN SESSION STATE
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 1. DEFINIR FILTROS 
-        filtro_O2301172201202401690307101001 = (
-            (df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.isin([1001])) 
-        )    
-        
-        O2301172201202401690307101001 = {
-            "NOMBRE": "Pago de Personal Docente primera infancia",
-            "CONCEPTO": "O231010100101 Sueldo básico",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101001, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101001, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101001, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101001, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101001, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_O2301172201202401690307101002 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1002])))
-         
-        O2301172201202401690307101002 = {
-            "NOMBRE": "Pago de Ascensos en escalafon del Personal",
-            "CONCEPTO": "O231010100101 Sueldo básico",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101002, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101002, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101002, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101002, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101002, "RECURSOS SIN EJECUTAR"].sum()
-        } 
-        
-        filtro_O2301172201202401690307101003 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1003])))
-         
-        O2301172201202401690307101003 = {
-            "NOMBRE": "Pago de horas extras del personal docente",
-            "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101003, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101003, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101003, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101003, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101003, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_O2301172201202401690307101004 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1004])))
-         
-        O2301172201202401690307101004 = {
-            "NOMBRE": "Pago de Personal Docente prima de servicio",
-            "CONCEPTO": "O231010100106 Prima de servicio",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101004, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101004, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101004, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101004, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101004, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101005 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1005])))
-         
-        O2301172201202401690307101005 = {
-            "NOMBRE": "Pago de Personal Docente prima de vacaciones",
-            "CONCEPTO": "O23101010010802 Prima de vacaciones",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101005, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101005, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101005, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101005, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101005, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101006 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1006])))
-         
-        O2301172201202401690307101006 = {
-            "NOMBRE": "Pago de Personal Docente prima de navidad",
-            "CONCEPTO": "O23101010010801 Prima de navidad",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101006, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101006, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101006, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101006, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101006, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101007 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1007])))
-         
-        O2301172201202401690307101007 = {
-            "NOMBRE": "Pago de Personal Docente subsidio de alimentacion",
-            "CONCEPTO": "O231010100104 Subsidio de alimentación",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101007, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101007, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101007, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101007, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101007, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101008 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1008])))
-         
-        O2301172201202401690307101008 = {
-            "NOMBRE": "Pago Auxili de transporte personal docente",
-            "CONCEPTO": "O231010100105 Auxilio de Transporte",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101008, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101008, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101008, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101008, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101008, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_sueldos = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1001, 1002, 1003, 1004, 1005, 1006, 1007, 1008])))
-         
-        SUELDOS = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_sueldos, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sueldos, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sueldos, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sueldos, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sueldos, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101009 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1009])))
-         
-        O2301172201202401690307101009 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compen",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101009, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101009, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101009, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101009, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101009, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101010 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1010])))
-         
-        O2301172201202401690307101010 = {
-            "NOMBRE": "Pago de Aportes para el ICBF personal docente",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101010, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101010, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101010, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101010, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101010, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101011 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1011])))
-         
-        O2301172201202401690307101011 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101011, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101011, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101011, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101011, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101011, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101012 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1012])))
-         
-        O2301172201202401690307101012 = {
-            "NOMBRE": "Pago de Aportes para el SENA personal docentes",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101012, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101012, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101012, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101012, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101012, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101013 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1013])))
-         
-        O2301172201202401690307101013 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101013, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101013, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101013, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101013, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101013, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_parafiscales = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1009, 1010, 1011, 1012, 1013])))
-         
-        PARAFISCALES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_parafiscales, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_parafiscales, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_parafiscales, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_parafiscales, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_parafiscales, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101014 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1014])))
-         
-        O2301172201202401690307101014 = {
-            "NOMBRE": "Pago de Aportes para Salud del personal",
-            "CONCEPTO": "O231010200201 Pago de Aportes para Salud del personal",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101014, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101014, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101014, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101014, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101014, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307101015 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1015])))
+        return df, resumen
          
-        O2301172201202401690307101015 = {
-            "NOMBRE": "Pago de Aportes para Pension del persona",
-            "CONCEPTO": "O231010200101 Pago de Aportes para Pension del persona",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101015, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101015, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101015, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101015, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101015, "RECURSOS SIN EJECUTAR"].sum()
-        }
+    except Exception as e:
+        st.error(f"❌ Error en procesar_datos_RP_principal: {str(e)}")
+        import traceback
+        st.error(f"Detalle: {traceback.format_exc()}")
+        return None, None
 
-        filtro_O2301172201202401690307101016 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1016])))
-         
-        O2301172201202401690307101016 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307101016, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307101016, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307101016, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307101016, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307101016, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_fomag = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([1014, 1015, 1016])))
-         
-        FOMAG = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_fomag, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag, "RECURSOS SIN EJECUTAR"].sum()
-        }
 
-        filtro_total_primera_infancia = ((df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.between(1001, 1016)))
-         
-        TOTAL_PRIMERA_INFANCIA = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_total_primera_infancia, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_total_primera_infancia, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_total_primera_infancia, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_total_primera_infancia, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_total_primera_infancia, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
+# =============================================================================
+# FUNCIÓN DE PROCESAMIENTO DOCENTES RP ORIENTADORES
+# =============================================================================
 
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-            O2301172201202401690307101001, O2301172201202401690307101002, O2301172201202401690307101003,
-            O2301172201202401690307101004, O2301172201202401690307101005, O2301172201202401690307101006,
-            O2301172201202401690307101007, O2301172201202401690307101008, SUELDOS, O2301172201202401690307101009,
-            O2301172201202401690307101010, O2301172201202401690307101011, O2301172201202401690307101012,
-            O2301172201202401690307101013, PARAFISCALES, O2301172201202401690307101014, O2301172201202401690307101015,
-            O2301172201202401690307101016, FOMAG, TOTAL_PRIMERA_INFANCIA      
-            ],
-            index=[
-                "O2301172201202401690307101001", "O2301172201202401690307101002", "O2301172201202401690307101003",
-                "O2301172201202401690307101004", "O2301172201202401690307101005", "O2301172201202401690307101006",
-                "O2301172201202401690307101007", "O2301172201202401690307101008", "SUELDOS", "O2301172201202401690307101009",
-                "O2301172201202401690307101010", "O2301172201202401690307101011", "O2301172201202401690307101012",
-                "O2301172201202401690307101013", "PARAFISCALES", "O2301172201202401690307101014", "O2301172201202401690307101015",
-                "O2301172201202401690307101016", "FOMAG", "TOTAL_PRIMERA_INFANCIA"
-            ]
+BOLSILLOS_RP_ORIENTADORES = {
+    "columnas": COLUMNAS_RP,
+    "textos": ["NOMBRE", "CONCEPTO"],
+    "filas": [
+        {"etiqueta": "O2301172201202401690307102020", "codigos": ["1-100-F001"], "sufijos": [2020],
+         "NOMBRE": "Pago de Personal Docente orientadores", "CONCEPTO": "O231010100101 Sueldo básico"},
+        {"etiqueta": "O2301172201202401690307102021", "codigos": ["1-100-F001"], "sufijos": [2021],
+         "NOMBRE": "Pago de horas extras del personal docent", "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos"},
+        {"etiqueta": "O2301172201202401690307102022", "codigos": ["1-100-F001"], "sufijos": [2022],
+         "NOMBRE": "Pago de Personal Docente prima de servicio", "CONCEPTO": "O231010100106 Prima de servicio"},
+        {"etiqueta": "O2301172201202401690307102023", "codigos": ["1-100-F001"], "sufijos": [2023],
+         "NOMBRE": "Pago de Personal Docente prima de vacaciones", "CONCEPTO": "O23101010010802 Prima de vacaciones"},
+        {"etiqueta": "O2301172201202401690307102024", "codigos": ["1-100-F001"], "sufijos": [2024],
+         "NOMBRE": "Pago de Personal Docente prima de navidad", "CONCEPTO": "O23101010010801 Prima de navidad"},
+        {"etiqueta": "SUELDOS_ORIENTADORES", "suma": ["O2301172201202401690307102020",
+            "O2301172201202401690307102021", "O2301172201202401690307102022", "O2301172201202401690307102023",
+            "O2301172201202401690307102024"]},
+        {"etiqueta": "O2301172201202401690307102025", "codigos": ["1-100-F001"], "sufijos": [2025],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compensacion", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307102026", "codigos": ["1-100-F001"], "sufijos": [2026],
+         "NOMBRE": "Pago de Aportes para el ICBF personal docente", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307102027", "codigos": ["1-100-F001"], "sufijos": [2027],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos"},
+        {"etiqueta": "O2301172201202401690307102028", "codigos": ["1-100-F001"], "sufijos": [2028],
+         "NOMBRE": "Pago de Aportes para el SENA personal docente", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307102029", "codigos": ["1-100-F001"], "sufijos": [2029],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "PARAFISCALES_ORIENTADORES", "suma": ["O2301172201202401690307102025",
+            "O2301172201202401690307102026", "O2301172201202401690307102027", "O2301172201202401690307102028",
+            "O2301172201202401690307102029"]},
+        {"etiqueta": "O2301172201202401690307102030", "codigos": ["1-100-F001"], "sufijos": [2030],
+         "NOMBRE": "Pago de Aportes para Salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud pública"},
+        {"etiqueta": "O2301172201202401690307102031", "codigos": ["1-100-F001"], "sufijos": [2031],
+         "NOMBRE": "Pago de Aportes para Pension del personal", "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones públicas"},
+        {"etiqueta": "O2301172201202401690307102032", "codigos": ["1-100-F001"], "sufijos": [2032],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos"},
+        {"etiqueta": "FOMAG_ORIENTADORES", "suma": ["O2301172201202401690307102030",
+            "O2301172201202401690307102031", "O2301172201202401690307102032"]},
+        {"etiqueta": "TOTAL_DOC_ORIENTADORES", "suma": ["SUELDOS_ORIENTADORES", "PARAFISCALES_ORIENTADORES",
+            "FOMAG_ORIENTADORES"]},
+    ],
+}
+
+def procesar_datos_RP_orientadores():
+    """Función específica para procesar datos de RECURSOS PROPIOS"""
+    # Cargar datos
+    df, indice = cargar_datos_originales()
+    
+    if df is None:
+        return None, None
+    
+    try:        
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "RP_orientadores", indice["huella"], lambda: proyectar_bolsillos(indice, "RP_orientadores", BOLSILLOS_RP_ORIENTADORES)
         )
-
-        resumen = resumen_principal.copy()
         
         return df, resumen
          
@@ -1675,1023 +2386,150 @@ def procesar_datos_RP_primera_infancia(fuerza_actualizacion=False):
         st.error(f"Detalle: {traceback.format_exc()}")
         return None, None
 
-
 # =============================================================================
-# FUNCIÓN DE PROCESAMIENTO DOCENTES RP ORIENTADORES
+# FUNCIÓN DE PROCESAMIENTO DOCENTES RP primaria,basica,media
 # =============================================================================
 
-def procesar_datos_RP_orientadores(fuerza_actualizacion=False):
+BOLSILLOS_RP_PRIMARIA_BASICA_MEDIA = {
+    "columnas": COLUMNAS_RP,
+    "textos": ["NOMBRE", "CONCEPTO"],
+    "filas": [
+        {"etiqueta": "O2301172201202401690307103033", "codigos": ["1-100-F001"], "sufijos": [3033],
+         "NOMBRE": "Pago de Personal Docente", "CONCEPTO": "O231010100101 Sueldo básico"},
+        {"etiqueta": "O2301172201202401690307103034", "codigos": ["1-100-F001"], "sufijos": [3034],
+         "NOMBRE": "Pago de Personal Directivo Docente", "CONCEPTO": "O231010100101 Sueldo básico"},
+        {"etiqueta": "O2301172201202401690307103035", "codigos": ["1-100-F001"], "sufijos": [3035],
+         "NOMBRE": "Pago de Ascensos en escalafon del Personal", "CONCEPTO": "O231010100101 Sueldo básico"},
+        {"etiqueta": "O2301172201202401690307103036", "codigos": ["1-100-F001"], "sufijos": [3036],
+         "NOMBRE": "Pago de horas extras del personal docent", "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos"},
+        {"etiqueta": "O2301172201202401690307103037", "codigos": ["1-100-F001"], "sufijos": [3037],
+         "NOMBRE": "Pago de Personal Docente- prima de servicio", "CONCEPTO": "O231010100106 Prima de servicio"},
+        {"etiqueta": "O2301172201202401690307103038", "codigos": ["1-100-F001"], "sufijos": [3038],
+         "NOMBRE": "Pago de Personal Docente - prima de vacaciones", "CONCEPTO": "O23101010010802 Prima de vacaciones"},
+        {"etiqueta": "O2301172201202401690307103039", "codigos": ["1-100-F001"], "sufijos": [3039],
+         "NOMBRE": "Pago de Personal Docente - prima de navidad", "CONCEPTO": "O23101010010801 Prima de navidad"},
+        {"etiqueta": "O2301172201202401690307103040", "codigos": ["1-100-F001"], "sufijos": [3040],
+         "NOMBRE": "Pago de Personal Docente- subsidio de alimentación", "CONCEPTO": "O231010100104 Subsidio de alimentación"},
+        {"etiqueta": "O2301172201202401690307103041", "codigos": ["1-100-F001"], "sufijos": [3041],
+         "NOMBRE": "Pago Auxili de transporte personal docente", "CONCEPTO": "O231010100105 Auxilio de Transporte"},
+        {"etiqueta": "SUELDOS_PBM", "suma": ["O2301172201202401690307103033", "O2301172201202401690307103034",
+            "O2301172201202401690307103035", "O2301172201202401690307103036", "O2301172201202401690307103037",
+            "O2301172201202401690307103038", "O2301172201202401690307103039", "O2301172201202401690307103040",
+            "O2301172201202401690307103041"]},
+        {"etiqueta": "O2301172201202401690307103042", "codigos": ["1-100-F001"], "sufijos": [3042],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compension", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307103043", "codigos": ["1-100-F001"], "sufijos": [3043],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compensacion", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307103044", "codigos": ["1-100-F001"], "sufijos": [3044],
+         "NOMBRE": "Pago de Aportes para el ICBF personal do", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307103045", "codigos": ["1-100-F001"], "sufijos": [3045],
+         "NOMBRE": "Pago de Aportes para el ICBF del Personal", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307103046", "codigos": ["1-100-F001"], "sufijos": [3046],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos"},
+        {"etiqueta": "O2301172201202401690307103047", "codigos": ["1-100-F001"], "sufijos": [3047],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos"},
+        {"etiqueta": "O2301172201202401690307103048", "codigos": ["1-100-F001"], "sufijos": [3048],
+         "NOMBRE": "Pago de Aportes para el SENA del Personal", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307103049", "codigos": ["1-100-F001"], "sufijos": [3049],
+         "NOMBRE": "Pago de Aportes para el SENA del Personal", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307103050", "codigos": ["1-100-F001"], "sufijos": [3050],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "O2301172201202401690307103051", "codigos": ["1-100-F001"], "sufijos": [3051],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "PARAFISCALES_PBM", "suma": ["O2301172201202401690307103042",
+            "O2301172201202401690307103043", "O2301172201202401690307103044", "O2301172201202401690307103045",
+            "O2301172201202401690307103046", "O2301172201202401690307103047", "O2301172201202401690307103048",
+            "O2301172201202401690307103049", "O2301172201202401690307103050", "O2301172201202401690307103051"]},
+        {"etiqueta": "O2301172201202401690307103052", "codigos": ["1-100-F001"], "sufijos": [3052],
+         "NOMBRE": "Pago de Aportes para Salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud pública"},
+        {"etiqueta": "O2301172201202401690307103053", "codigos": ["1-100-F001"], "sufijos": [3053],
+         "NOMBRE": "Pago de Aportes para salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud pública"},
+        {"etiqueta": "O2301172201202401690307103054", "codigos": ["1-100-F001"], "sufijos": [3054],
+         "NOMBRE": "Pago de Aportes para Pension del personal", "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones públicas"},
+        {"etiqueta": "O2301172201202401690307103055", "codigos": ["1-100-F001"], "sufijos": [3055],
+         "NOMBRE": "Pago de Aportes para Pension del personal", "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones públicas"},
+        {"etiqueta": "O2301172201202401690307103056", "codigos": ["1-100-F001"], "sufijos": [3056],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos"},
+        {"etiqueta": "O2301172201202401690307103057", "codigos": ["1-100-F001"], "sufijos": [3057],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos"},
+        {"etiqueta": "FOMAG_PBM", "suma": ["O2301172201202401690307103052", "O2301172201202401690307103053",
+            "O2301172201202401690307103054", "O2301172201202401690307103055", "O2301172201202401690307103056",
+            "O2301172201202401690307103057"]},
+        {"etiqueta": "TOTAL_DOC_PBM", "suma": ["SUELDOS_PBM", "PARAFISCALES_PBM", "FOMAG_PBM"]},
+    ],
+}
+
+def procesar_datos_RP_primaria_basica_media():
     """Función específica para procesar datos de RECURSOS PROPIOS"""
     # Cargar datos
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
+    df, indice = cargar_datos_originales()
     
     if df is None:
         return None, None
     
     try:        
-        # 🔹 CALCULAR 'ultimos_dos' LOCALMENTE (IMPORTANTE)
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "RP_primaria_basica_media", indice["huella"], lambda: proyectar_bolsillos(indice, "RP_primaria_basica_media", BOLSILLOS_RP_PRIMARIA_BASICA_MEDIA)
         )
         
-        # 🔹 GUARDAR BACKUP EN SESSION STATE
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 1. DEFINIR FILTROS 
-        filtro_O2301172201202401690307102020 = (
-            (df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.isin([2020])) 
-        )    
-        
-        O2301172201202401690307102020 = {
-            "NOMBRE": "Pago de Personal Docente orientadores",
-            "CONCEPTO": "O231010100101 Sueldo básico",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102020, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102020, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102020, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102020, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102020, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_O2301172201202401690307102021 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2021])))
-         
-        O2301172201202401690307102021 = {
-            "NOMBRE": "Pago de horas extras del personal docent",
-            "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102021, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102021, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102021, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102021, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102021, "RECURSOS SIN EJECUTAR"].sum()
-        } 
-        
-        filtro_O2301172201202401690307102022 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2022])))
-         
-        O2301172201202401690307102022 = {
-            "NOMBRE": "Pago de Personal Docente prima de servicio",
-            "CONCEPTO": "O231010100106 Prima de servicio",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102022, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102022, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102022, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102022, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102022, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_O2301172201202401690307102023 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2023])))
+        return df, resumen
          
-        O2301172201202401690307102023 = {
-            "NOMBRE": "Pago de Personal Docente prima de vacaciones",
-            "CONCEPTO": "O23101010010802 Prima de vacaciones",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102023, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102023, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102023, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102023, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102023, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102024 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2024])))
-         
-        O2301172201202401690307102024 = {
-            "NOMBRE": "Pago de Personal Docente prima de navidad",
-            "CONCEPTO": "O23101010010801 Prima de navidad",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102024, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102024, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102024, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102024, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102024, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_sueldos_or = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2020, 2021, 2022, 2023, 2024])))
-         
-        SUELDOS_ORIENTADORES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_sueldos_or, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sueldos_or, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sueldos_or, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sueldos_or, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sueldos_or, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102025 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2025])))
-         
-        O2301172201202401690307102025 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compensacion",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102025, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102025, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102025, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102025, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102025, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102026 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2026])))
-         
-        O2301172201202401690307102026 = {
-            "NOMBRE": "Pago de Aportes para el ICBF personal docente",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102026, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102026, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102026, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102026, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102026, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102027 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2027])))
-         
-        O2301172201202401690307102027 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102027, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102027, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102027, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102027, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102027, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102028 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2028])))
-         
-        O2301172201202401690307102028 = {
-            "NOMBRE": "Pago de Aportes para el SENA personal docente",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102028, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102028, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102028, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102028, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102028, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102029 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2029])))
-         
-        O2301172201202401690307102029 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102029, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102029, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102029, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102029, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102029, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_parafiscales_or = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2025, 2026, 2027, 2028, 2029])))
-         
-        PARAFISCALES_ORIENTADORES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_parafiscales_or, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_parafiscales_or, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_parafiscales_or, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_parafiscales_or, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_parafiscales_or, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102030 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2030])))
-         
-        O2301172201202401690307102030 = {
-            "NOMBRE": "Pago de Aportes para Salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud pública",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102030, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102030, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102030, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102030, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102030, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102031 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2031])))
-         
-        O2301172201202401690307102031 = {
-            "NOMBRE": "Pago de Aportes para Pension del personal",
-            "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones públicas",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102031, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102031, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102031, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102031, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102031, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307102032 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2032])))
-         
-        O2301172201202401690307102032 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307102032, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307102032, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307102032, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307102032, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307102032, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_fomag_or = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([2030, 2031, 2032])))
-         
-        FOMAG_ORIENTADORES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_fomag_or, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_or, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_or, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_or, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_or, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_TOTAL_DOC_ORIENTADORES = ((df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.between(2020, 2032)))
-         
-        TOTAL_DOC_ORIENTADORES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_TOTAL_DOC_ORIENTADORES, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_DOC_ORIENTADORES, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_DOC_ORIENTADORES, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_DOC_ORIENTADORES, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_DOC_ORIENTADORES, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-            O2301172201202401690307102020, O2301172201202401690307102021, O2301172201202401690307102022,
-            O2301172201202401690307102023, O2301172201202401690307102024, SUELDOS_ORIENTADORES, 
-            O2301172201202401690307102025, 
-            O2301172201202401690307102026, O2301172201202401690307102027, O2301172201202401690307102028,
-            O2301172201202401690307102029, PARAFISCALES_ORIENTADORES, 
-            O2301172201202401690307102030, O2301172201202401690307102031, 
-            O2301172201202401690307102032, FOMAG_ORIENTADORES, TOTAL_DOC_ORIENTADORES    
-            ],
-            index=[
-                "O2301172201202401690307102020", "O2301172201202401690307102021", "O2301172201202401690307102022",
-            "O2301172201202401690307102023", "O2301172201202401690307102024", "SUELDOS_ORIENTADORES", 
-            "O2301172201202401690307102025", 
-            "O2301172201202401690307102026", "O2301172201202401690307102027", "O2301172201202401690307102028",
-            "O2301172201202401690307102029", "PARAFISCALES_ORIENTADORES", 
-            "O2301172201202401690307102030", "O2301172201202401690307102031", 
-            "O2301172201202401690307102032", "FOMAG_ORIENTADORES", "TOTAL_DOC_ORIENTADORES"
-            ]
-        )
-
-        resumen = resumen_principal.copy()
-        
-        return df, resumen
-         
-    except Exception as e:
-        st.error(f"❌ Error en procesar_datos_RP_principal: {str(e)}")
-        import traceback
-        st.error(f"Detalle: {traceback.format_exc()}")
-        return None, None
-
-# =============================================================================
-# FUNCIÓN DE PROCESAMIENTO DOCENTES RP primaria,basica,media
-# =============================================================================
-
-def procesar_datos_RP_primaria_basica_media(fuerza_actualizacion=False):
-    """Función específica para procesar datos de RECURSOS PROPIOS"""
-    # Cargar datos
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
-    
-    if df is None:
-        return None, None
-    
-    try:        
-        # 🔹 CALCULAR 'ultimos_dos' LOCALMENTE (IMPORTANTE)
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
-        )
-        
-        # 🔹 GUARDAR BACKUP EN SESSION STATE
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 1. DEFINIR FILTROS 
-        filtro_O2301172201202401690307103033 = (
-            (df["Codigo"] == "1-100-F001") & 
-            (ultimos_cuatro.isin([3033])) 
-        )    
-        
-        O2301172201202401690307103033 = {
-            "NOMBRE": "Pago de Personal Docente",
-            "CONCEPTO": "O231010100101 Sueldo básico",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103033, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103033, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103033, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103033, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103033, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_O2301172201202401690307103034 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3034])))
-         
-        O2301172201202401690307103034 = {
-            "NOMBRE": "Pago de Personal Directivo Docente",
-            "CONCEPTO": "O231010100101 Sueldo básico",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103034, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103034, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103034, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103034, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103034, "RECURSOS SIN EJECUTAR"].sum()
-        } 
-        
-        filtro_O2301172201202401690307103035 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3035])))
-         
-        O2301172201202401690307103035 = {
-            "NOMBRE": "Pago de Ascensos en escalafon del Personal",
-            "CONCEPTO": "O231010100101 Sueldo básico",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103035, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103035, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103035, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103035, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103035, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_O2301172201202401690307103036 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3036])))
-         
-        O2301172201202401690307103036 = {
-            "NOMBRE": "Pago de horas extras del personal docent",
-            "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103036, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103036, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103036, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103036, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103036, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103037 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3037])))
-         
-        O2301172201202401690307103037 = {
-            "NOMBRE": "Pago de Personal Docente- prima de servicio",
-            "CONCEPTO": "O231010100106 Prima de servicio",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103037, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103037, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103037, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103037, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103037, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103038 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3038])))
-         
-        O2301172201202401690307103038 = {
-            "NOMBRE": "Pago de Personal Docente - prima de vacaciones",
-            "CONCEPTO": "O23101010010802 Prima de vacaciones",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103038, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103038, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103038, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103038, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103038, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103039 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3039])))
-         
-        O2301172201202401690307103039 = {
-            "NOMBRE": "Pago de Personal Docente - prima de navidad",
-            "CONCEPTO": "O23101010010801 Prima de navidad",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103039, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103039, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103039, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103039, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103039, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103040 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3040])))
-         
-        O2301172201202401690307103040 = {
-            "NOMBRE": "Pago de Personal Docente- subsidio de alimentación",
-            "CONCEPTO": "O231010100104 Subsidio de alimentación",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103040, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103040, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103040, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103040, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103040, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103041 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3041])))
-         
-        O2301172201202401690307103041 = {
-            "NOMBRE": "Pago Auxili de transporte personal docente",
-            "CONCEPTO": "O231010100105 Auxilio de Transporte",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103041, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103041, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103041, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103041, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103041, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_sueldos_gl = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(3033, 3041)))
-         
-        SUELDOS_PBM = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_sueldos_gl, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sueldos_gl, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sueldos_gl, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sueldos_gl, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sueldos_gl, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103042 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3042])))
-         
-        O2301172201202401690307103042 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compension",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103042, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103042, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103042, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103042, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103042, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103043 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3043])))
-         
-        O2301172201202401690307103043 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compensacion",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103043, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103043, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103043, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103043, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103043, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103044 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3044])))
-         
-        O2301172201202401690307103044 = {
-            "NOMBRE": "Pago de Aportes para el ICBF personal do",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103044, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103044, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103044, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103044, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103044, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103045 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3045])))
-         
-        O2301172201202401690307103045 = {
-            "NOMBRE": "Pago de Aportes para el ICBF del Personal",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103045, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103045, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103045, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103045, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103045, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103046 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3046])))
-         
-        O2301172201202401690307103046 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103046, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103046, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103046, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103046, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103046, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103047 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3047])))
-         
-        O2301172201202401690307103047 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos técnicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103047, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103047, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103047, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103047, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103047, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103048 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3048])))
-         
-        O2301172201202401690307103048 = {
-            "NOMBRE": "Pago de Aportes para el SENA del Personal",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103048, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103048, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103048, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103048, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103048, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103049 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3049])))
-         
-        O2301172201202401690307103049 = {
-            "NOMBRE": "Pago de Aportes para el SENA del Personal",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103049, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103049, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103049, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103049, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103049, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103050 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3050])))
-         
-        O2301172201202401690307103050 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103050, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103050, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103050, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103050, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103050, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103051 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3051])))
-         
-        O2301172201202401690307103051 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103051, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103051, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103051, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103051, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103051, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_PARAFISCALES_PBM = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(3042, 3051)))
-         
-        PARAFISCALES_PBM = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_PARAFISCALES_PBM, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_PARAFISCALES_PBM, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_PARAFISCALES_PBM, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_PARAFISCALES_PBM, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_PARAFISCALES_PBM, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_O2301172201202401690307103052 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3052])))
-         
-        O2301172201202401690307103052 = {
-            "NOMBRE": "Pago de Aportes para Salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud pública",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103052, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103052, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103052, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103052, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103052, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103053 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3053])))
-         
-        O2301172201202401690307103053 = {
-            "NOMBRE": "Pago de Aportes para salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud pública",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103053, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103053, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103053, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103053, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103053, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103054 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3054])))
-         
-        O2301172201202401690307103054 = {
-            "NOMBRE": "Pago de Aportes para Pension del personal",
-            "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones públicas",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103054, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103054, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103054, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103054, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103054, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103055 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3055])))
-         
-        O2301172201202401690307103055 = {
-            "NOMBRE": "Pago de Aportes para Pension del personal",
-            "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones públicas",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103055, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103055, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103055, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103055, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103055, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103056 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3056])))
-         
-        O2301172201202401690307103056 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103056, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103056, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103056, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103056, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103056, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_O2301172201202401690307103057 = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.isin([3057])))
-         
-        O2301172201202401690307103057 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantías a fondos públicos",
-            "DISPONIBLE": df.loc[filtro_O2301172201202401690307103057, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_O2301172201202401690307103057, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_O2301172201202401690307103057, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_O2301172201202401690307103057, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_O2301172201202401690307103057, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        filtro_FOMAG_PBM = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(3052, 3057)))
-         
-        FOMAG_PBM = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_FOMAG_PBM, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_FOMAG_PBM, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_FOMAG_PBM, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_FOMAG_PBM, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_FOMAG_PBM, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        filtro_TOTAL_DOC_PBM = ((df["Codigo"] == "1-100-F001") & (ultimos_cuatro.between(3033, 3057)))
-         
-        TOTAL_DOC_PBM = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_TOTAL_DOC_PBM, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_TOTAL_DOC_PBM, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_TOTAL_DOC_PBM, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_TOTAL_DOC_PBM, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_TOTAL_DOC_PBM, "RECURSOS SIN EJECUTAR"].sum()
-        }
-
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-            O2301172201202401690307103033, O2301172201202401690307103034, O2301172201202401690307103035,
-            O2301172201202401690307103036, O2301172201202401690307103037, O2301172201202401690307103038,
-            O2301172201202401690307103039, O2301172201202401690307103040, O2301172201202401690307103041,
-            SUELDOS_PBM,
-            O2301172201202401690307103042, O2301172201202401690307103043, O2301172201202401690307103044, 
-            O2301172201202401690307103045, O2301172201202401690307103046, O2301172201202401690307103047,
-            O2301172201202401690307103048, O2301172201202401690307103049, O2301172201202401690307103050,
-            O2301172201202401690307103051, PARAFISCALES_PBM, 
-            O2301172201202401690307103052, O2301172201202401690307103053, 
-            O2301172201202401690307103054, O2301172201202401690307103055, O2301172201202401690307103056,
-            O2301172201202401690307103057, FOMAG_PBM, TOTAL_DOC_PBM   
-            ],
-            index=[
-            "O2301172201202401690307103033", "O2301172201202401690307103034", "O2301172201202401690307103035",
-            "O2301172201202401690307103036", "O2301172201202401690307103037", "O2301172201202401690307103038",
-            "O2301172201202401690307103039", "O2301172201202401690307103040", "O2301172201202401690307103041",
-            "SUELDOS_PBM",
-            "O2301172201202401690307103042", "O2301172201202401690307103043", "O2301172201202401690307103044", 
-            "O2301172201202401690307103045", "O2301172201202401690307103046", "O2301172201202401690307103047",
-            "O2301172201202401690307103048", "O2301172201202401690307103049", "O2301172201202401690307103050",
-            "O2301172201202401690307103051", "PARAFISCALES_PBM", 
-            "O2301172201202401690307103052", "O2301172201202401690307103053", 
-            "O2301172201202401690307103054", "O2301172201202401690307103055", "O2301172201202401690307103056",
-            "O2301172201202401690307103057", "FOMAG_PBM", "TOTAL_DOC_PBM"
-            ]
-        )
-
-        resumen = resumen_principal.copy()
-        
-        return df, resumen
-         
-    except Exception as e:
-        st.error(f"❌ Error en procesar_datos_RP_principal: {str(e)}")
-        import traceback
-        st.error(f"Detalle: {traceback.format_exc()}")
-        return None, None
+    except Exception as e:
+        st.error(f"❌ Error en procesar_datos_RP_principal: {str(e)}")
+        import traceback
+        st.error(f"Detalle: {traceback.format_exc()}")
+        return None, None
 
 # =============================================================================
 # FUNCIÓN DE PROCESAMIENTO DOCENTES SGP PRINCIPAL 
 # =============================================================================
-def procesar_datos_SGP_principal(fuerza_actualizacion=False):
+BOLSILLOS_SGP_PRINCIPAL = {
+    "columnas": COLUMNAS_RP,
+    "filas": [
+        {"etiqueta": "SUELDO_BASICO", "codigos": ["2-100-I002"], "sufijos": [1001, 1002, 3033, 3034, 3035]},
+        {"etiqueta": "HORAS_EXTRAS", "codigos": ["2-100-I002"], "sufijos": [1003, 3036]},
+        {"etiqueta": "PRIMA_SERVICIOS", "codigos": ["2-100-I002"], "sufijos": [1004, 3037]},
+        {"etiqueta": "PRIMA_VACACIONES", "codigos": ["2-100-I002"], "sufijos": [1005, 3038]},
+        {"etiqueta": "PRIMA_NAVIDAD", "codigos": ["2-100-I002"], "sufijos": [1006, 3039]},
+        {"etiqueta": "SUB_ALIMENTACION", "codigos": ["2-100-I002"], "sufijos": [1007, 3040]},
+        {"etiqueta": "AUX_TRANSPORTE", "codigos": ["2-100-I002"], "sufijos": [1008, 3041]},
+        {"etiqueta": "SUELDOS", "suma": ["SUELDO_BASICO", "HORAS_EXTRAS", "PRIMA_SERVICIOS",
+            "PRIMA_VACACIONES", "PRIMA_NAVIDAD", "SUB_ALIMENTACION", "AUX_TRANSPORTE"]},
+        {"etiqueta": "COMPENSAR", "codigos": ["2-100-I002"], "sufijos": [1009, 3042, 3043]},
+        {"etiqueta": "ICBF", "codigos": ["2-100-I002"], "sufijos": [1010, 3044, 3045]},
+        {"etiqueta": "ESCUELAS_TECNICAS", "codigos": ["2-100-I002"], "sufijos": [1011, 3046, 3047]},
+        {"etiqueta": "SENA", "codigos": ["2-100-I002"], "sufijos": [1012, 3048, 3049]},
+        {"etiqueta": "ESAP", "codigos": ["2-100-I002"], "sufijos": [1013, 3050, 3051]},
+        {"etiqueta": "PARAFISCALES", "suma": ["COMPENSAR", "ICBF", "ESCUELAS_TECNICAS", "SENA", "ESAP"]},
+        {"etiqueta": "FOMAG_SSF_EMPLEADO", "codigos": ["2-100-I001"], "sufijos": [1017, 3058, 3059]},
+        {"etiqueta": "SALUD_SSF", "codigos": ["2-100-I001"], "sufijos": [1014, 1018, 3052, 3053, 3060, 3061]},
+        {"etiqueta": "PENSION_SSF", "codigos": ["2-100-I001"], "sufijos": [1015, 3054, 3055]},
+        {"etiqueta": "CESANTIAS_SSF", "codigos": ["2-100-I001"], "sufijos": [1016, 1019, 3056, 3057, 3062, 3063]},
+        {"etiqueta": "FOMAG_ssf", "suma": ["FOMAG_SSF_EMPLEADO", "SALUD_SSF", "PENSION_SSF", "CESANTIAS_SSF"]},
+        {"etiqueta": "FOMAG_CSF_EMPLEADO", "codigos": ["2-100-I002"], "sufijos": [1017, 3058, 3059]},
+        {"etiqueta": "SALUD_CSF", "codigos": ["1-200-I038", "2-100-I002"], "sufijos": [1014, 1018, 3052, 3053, 3060, 3061]},
+        {"etiqueta": "PENSION_CSF", "codigos": ["1-200-I038", "2-100-I002"], "sufijos": [1015, 3054, 3055]},
+        {"etiqueta": "CESANTIAS_CSF", "codigos": ["1-200-I038", "2-100-I002"], "sufijos": [1016, 1019, 3056, 3057, 3062, 3063]},
+        {"etiqueta": "FOMAG_csf", "codigos": ["1-200-I038", "2-100-I002"], "sufijos": rango(1014, 1019) + rango(3052, 3063), "total": True},
+        {"etiqueta": "TOTAL_DOC_SGP", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": rango(1001, 3063), "total": True},
+    ],
+}
+
+def procesar_datos_SGP_principal():
     """Función específica para procesar datos de SGP"""
     # Cargar datos
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
+    df, indice = cargar_datos_originales()
     
     if df is None:
         return None, None
     
     try:        
-        # 🔹 CALCULAR 'ultimos_cuatro' LOCALMENTE (IMPORTANTE)
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "SGP_principal", indice["huella"], lambda: proyectar_bolsillos(indice, "SGP_principal", BOLSILLOS_SGP_PRINCIPAL)
         )
         
-        # 🔹 GUARDAR BACKUP EN SESSION STATE
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 1. DEFINIR FILTROS (CORREGIDO el error de sintaxis) ---
-        filtro_SUELDO_BASICO = (
-            (df["Codigo"] == "2-100-I002") & 
-            (ultimos_cuatro.isin([3033, 3034, 3035, 1001, 1002]))  # ¡CORREGIDO: isin() con paréntesis!
-        )    
-        
-        SUELDO_BASICO = {
-            "DISPONIBLE": df.loc[filtro_SUELDO_BASICO, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_SUELDO_BASICO, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_SUELDO_BASICO, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_SUELDO_BASICO, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_SUELDO_BASICO, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_horas_extras = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3036, 1003])))
-         
-        HORAS_EXTRAS = {
-            "DISPONIBLE": df.loc[filtro_horas_extras, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_horas_extras, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_horas_extras, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_horas_extras, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_horas_extras, "RECURSOS SIN EJECUTAR"].sum()
-        } 
-        
-        filtro_prima_servicios = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3037, 1004])))
-         
-        PRIMA_SERVICIOS = {
-            "DISPONIBLE": df.loc[filtro_prima_servicios, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_prima_servicios, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_prima_servicios, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_prima_servicios, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_prima_servicios, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_prima_vacaciones = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3038, 1005])))
-         
-        PRIMA_VACACIONES = {
-            "DISPONIBLE": df.loc[filtro_prima_vacaciones, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_prima_vacaciones, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_prima_vacaciones, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_prima_vacaciones, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_prima_vacaciones, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_prima_navidad = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3039, 1006])))
-         
-        PRIMA_NAVIDAD = {
-            "DISPONIBLE": df.loc[filtro_prima_navidad, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_prima_navidad, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_prima_navidad, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_prima_navidad, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_prima_navidad, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_sub_alimentacion = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3040, 1007])))
-         
-        SUB_ALIMENTACION = {
-            "DISPONIBLE": df.loc[filtro_sub_alimentacion, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sub_alimentacion, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sub_alimentacion, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sub_alimentacion, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sub_alimentacion, "RECURSOS SIN EJECUTAR"].sum()
-        }
-         
-        filtro_aux_transporte = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3041, 1008])))
-         
-        AUX_TRANSPORTE = {
-            "DISPONIBLE": df.loc[filtro_aux_transporte, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_aux_transporte, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_aux_transporte, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_aux_transporte, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_aux_transporte, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_SUELDOS = (
-        (df["Codigo"] == "2-100-I002") &
-        (
-        ultimos_cuatro.between(1001, 1008) |
-        ultimos_cuatro.between(3033, 3041)
-        )
-         )
-
-        SUELDOS = {
-            "DISPONIBLE": df.loc[filtro_SUELDOS, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_SUELDOS, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_SUELDOS, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_SUELDOS, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_SUELDOS, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_compensar = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3042, 3043, 1009])))
-
-        COMPENSAR = {
-            "DISPONIBLE": df.loc[filtro_compensar, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_compensar, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_compensar, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_compensar, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_compensar, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_icbf = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3044, 3045, 1010])))
-
-        ICBF = {
-            "DISPONIBLE": df.loc[filtro_icbf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_icbf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_icbf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_icbf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_icbf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_escuelas_tecnicas = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3046, 3047, 1011])))
-
-        ESCUELAS_TECNICAS = {
-            "DISPONIBLE": df.loc[filtro_escuelas_tecnicas, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_escuelas_tecnicas, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_escuelas_tecnicas, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_escuelas_tecnicas, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_escuelas_tecnicas, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_sena = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3048, 3049, 1012])))
-
-        SENA = {
-            "DISPONIBLE": df.loc[filtro_sena, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sena, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sena, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sena, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sena, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_esap = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([3050, 3051, 1013])))
-
-        ESAP = {
-            "DISPONIBLE": df.loc[filtro_esap, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_esap, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_esap, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_esap, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_esap, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_parafiscales = ((df["Codigo"] == "2-100-I002") & 
-            (ultimos_cuatro.between(3042, 3051) 
-              |
-             ultimos_cuatro.between(1009, 1013)))
-
-        PARAFISCALES = {
-            "DISPONIBLE": df.loc[filtro_parafiscales, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_parafiscales, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_parafiscales, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_parafiscales, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_parafiscales, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_fomag_SSF_empleado = ((df["Codigo"] == "2-100-I001") & (ultimos_cuatro.isin([1017, 3058, 3059 ])))
-
-        FOMAG_SSF_EMPLEADO = {
-            "DISPONIBLE": df.loc[filtro_fomag_SSF_empleado, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_SSF_empleado, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_SSF_empleado, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_SSF_empleado, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_SSF_empleado, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_salud_SSF = ((df["Codigo"] == "2-100-I001") & (ultimos_cuatro.isin([1018, 1014, 3052, 3053, 3060, 3061])))
-
-        SALUD_SSF = {
-            "DISPONIBLE": df.loc[filtro_salud_SSF, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_salud_SSF, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_salud_SSF, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_salud_SSF, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_salud_SSF, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_pension_ssf = ((df["Codigo"] == "2-100-I001") & (ultimos_cuatro.isin([1015, 3054, 3055])))
-
-        PENSION_SSF = {
-            "DISPONIBLE": df.loc[filtro_pension_ssf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_pension_ssf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_pension_ssf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_pension_ssf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_pension_ssf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_cesantias_ssf = ((df["Codigo"] == "2-100-I001") & (ultimos_cuatro.isin([1019, 1016, 3056, 3057, 3062, 3063])))
-
-        CESANTIAS_SSF = {
-            "DISPONIBLE": df.loc[filtro_cesantias_ssf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_cesantias_ssf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_cesantias_ssf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_cesantias_ssf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_cesantias_ssf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_fomag_ssf = ((df["Codigo"] == "2-100-I001") & 
-            (ultimos_cuatro.between(3052, 3063)  |
-             ultimos_cuatro.between(1014, 1019)))
-
-        FOMAG_ssf = {
-            "DISPONIBLE": df.loc[filtro_fomag_ssf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_ssf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_ssf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_ssf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_ssf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_fomag_CSF_empleado = ((df["Codigo"] == "2-100-I002") & (ultimos_cuatro.isin([1017, 3058, 3059 ])))
-
-        FOMAG_CSF_EMPLEADO = {
-            "DISPONIBLE": df.loc[filtro_fomag_CSF_empleado, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_CSF_empleado, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_CSF_empleado, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_CSF_empleado, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_CSF_empleado, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_salud_CSF = ((df["Codigo"].isin(["2-100-I002", "1-200-I038"])) & (ultimos_cuatro.isin([1018, 1014, 3052, 3053, 3060, 3061])))
-
-        SALUD_CSF = {
-            "DISPONIBLE": df.loc[filtro_salud_CSF, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_salud_CSF, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_salud_CSF, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_salud_CSF, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_salud_CSF, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_pension_csf = ((df["Codigo"].isin(["2-100-I002", "1-200-I038"])) & (ultimos_cuatro.isin([1015, 3054, 3055])))
-
-        PENSION_CSF = {
-            "DISPONIBLE": df.loc[filtro_pension_csf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_pension_csf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_pension_csf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_pension_csf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_pension_csf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_cesantias_csf = ((df["Codigo"].isin(["2-100-I002", "1-200-I038"])) & (ultimos_cuatro.isin([1016, 1019, 3056, 3057, 3062, 3063])))
-
-        CESANTIAS_CSF = {
-            "DISPONIBLE": df.loc[filtro_cesantias_csf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_cesantias_csf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_cesantias_csf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_cesantias_csf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_cesantias_csf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_fomag_csf = ((df["Codigo"].isin(["2-100-I002", "1-200-I038"])) & 
-            (ultimos_cuatro.between(3052, 3063)  |
-             ultimos_cuatro.between(1014, 1019)))
-
-        FOMAG_csf = {
-            "DISPONIBLE": df.loc[filtro_fomag_csf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_csf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_csf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_csf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_csf, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        filtro_total_doc_sgp = ((df["Codigo"].isin(["2-100-I002", "1-200-I038", "2-100-I001"])) & (ultimos_cuatro.between(1001, 3063)))
-
-        TOTAL_DOC_SGP = {
-            "DISPONIBLE": df.loc[filtro_total_doc_sgp, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_total_doc_sgp, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_total_doc_sgp, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_total_doc_sgp, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_total_doc_sgp, "RECURSOS SIN EJECUTAR"].sum() 
-        }
-
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-                SUELDO_BASICO, 
-                HORAS_EXTRAS, 
-                PRIMA_SERVICIOS, 
-                PRIMA_VACACIONES, 
-                PRIMA_NAVIDAD, 
-                SUB_ALIMENTACION, 
-                AUX_TRANSPORTE,
-                SUELDOS,
-                COMPENSAR,
-                ICBF,
-                ESCUELAS_TECNICAS,
-                SENA,
-                ESAP,
-                PARAFISCALES,
-                FOMAG_SSF_EMPLEADO,
-                SALUD_SSF,
-                PENSION_SSF,
-                CESANTIAS_SSF,
-                FOMAG_ssf,
-                FOMAG_CSF_EMPLEADO,
-                SALUD_CSF,
-                PENSION_CSF,
-                CESANTIAS_CSF,
-                FOMAG_csf, 
-                TOTAL_DOC_SGP
-            ],
-            index=[
-                "SUELDO_BASICO", 
-                "HORAS_EXTRAS", 
-                "PRIMA_SERVICIOS", 
-                "PRIMA_VACACIONES", 
-                "PRIMA_NAVIDAD", 
-                "SUB_ALIMENTACION", 
-                "AUX_TRANSPORTE",
-                "SUELDOS",
-                "COMPENSAR",
-                "ICBF",
-                "ESCUELAS_TECNICAS",
-                "SENA",
-                "ESAP",
-                "PARAFISCALES",
-                "FOMAG_SSF_EMPLEADO",
-                "SALUD_SSF",
-                "PENSION_SSF",
-                "CESANTIAS_SSF",
-                "FOMAG_ssf",
-                "FOMAG_CSF_EMPLEADO",
-                "SALUD_CSF",
-                "PENSION_CSF",
-                "CESANTIAS_CSF",
-                "FOMAG_csf", 
-                "TOTAL_DOC_SGP"
-            ]
-        )
-
-        resumen = resumen_principal.copy()
-        
         return df, resumen
          
     except Exception as e:
@@ -2704,330 +2542,74 @@ def procesar_datos_SGP_principal(fuerza_actualizacion=False):
 # FUNCIÓN DE PROCESAMIENTO SGP PRIMERA INFANCIA - DETALLADA (con NOMBRE y CONCEPTO)
 # =============================================================================
 
-def procesar_datos_SGP_primera_infancia_detallada(fuerza_actualizacion=False):
+BOLSILLOS_SGP_PRIMERA_INFANCIA_DETALLADA = {
+    "columnas": COLUMNAS_RP,
+    "textos": ["NOMBRE", "CONCEPTO"],
+    "filas": [
+        {"etiqueta": "O2301172201202401690307101001", "codigos": ["2-100-I002"], "sufijos": [1001],
+         "NOMBRE": "Pago de Personal Docente primera infancia", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307101002", "codigos": ["2-100-I002"], "sufijos": [1002],
+         "NOMBRE": "Pago de Ascensos en escalafon del Personal", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307101003", "codigos": ["2-100-I002"], "sufijos": [1003],
+         "NOMBRE": "Pago de horas extras del personal docente", "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos"},
+        {"etiqueta": "O2301172201202401690307101004", "codigos": ["2-100-I002"], "sufijos": [1004],
+         "NOMBRE": "Pago de Personal Docente prima de servicio", "CONCEPTO": "O231010100106 Prima de servicio"},
+        {"etiqueta": "O2301172201202401690307101005", "codigos": ["2-100-I002"], "sufijos": [1005],
+         "NOMBRE": "Pago de Personal Docente prima de vacaciones", "CONCEPTO": "O23101010010802 Prima de vacaciones"},
+        {"etiqueta": "O2301172201202401690307101006", "codigos": ["2-100-I002"], "sufijos": [1006],
+         "NOMBRE": "Pago de Personal Docente prima de navidad", "CONCEPTO": "O23101010010801 Prima de navidad"},
+        {"etiqueta": "O2301172201202401690307101007", "codigos": ["2-100-I002"], "sufijos": [1007],
+         "NOMBRE": "Pago de Personal Docente subsidio de alimentacion", "CONCEPTO": "O231010100104 Subsidio de alimentacion"},
+        {"etiqueta": "O2301172201202401690307101008", "codigos": ["2-100-I002"], "sufijos": [1008],
+         "NOMBRE": "Pago Auxili de transporte personal docente", "CONCEPTO": "O231010100105 Auxilio de Transporte"},
+        {"etiqueta": "SUELDOS", "suma": ["O2301172201202401690307101001", "O2301172201202401690307101002",
+            "O2301172201202401690307101003", "O2301172201202401690307101004", "O2301172201202401690307101005",
+            "O2301172201202401690307101006", "O2301172201202401690307101007", "O2301172201202401690307101008"]},
+        {"etiqueta": "O2301172201202401690307101009", "codigos": ["2-100-I002"], "sufijos": [1009],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compensacion", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307101010", "codigos": ["2-100-I002"], "sufijos": [1010],
+         "NOMBRE": "Pago de Aportes para el ICBF personal docente", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307101011", "codigos": ["2-100-I002"], "sufijos": [1011],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos tecnicos"},
+        {"etiqueta": "O2301172201202401690307101012", "codigos": ["2-100-I002"], "sufijos": [1012],
+         "NOMBRE": "Pago de Aportes para el SENA personal docente", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307101013", "codigos": ["2-100-I002"], "sufijos": [1013],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "PARAFISCALES", "suma": ["O2301172201202401690307101009",
+            "O2301172201202401690307101010", "O2301172201202401690307101011", "O2301172201202401690307101012",
+            "O2301172201202401690307101013"]},
+        {"etiqueta": "O2301172201202401690307101014", "codigos": ["2-100-I002"], "sufijos": [1014],
+         "NOMBRE": "Pago de Aportes para Salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica"},
+        {"etiqueta": "O2301172201202401690307101015", "codigos": ["2-100-I002"], "sufijos": [1015],
+         "NOMBRE": "Pago de Aportes para Pension del personal", "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones publicas"},
+        {"etiqueta": "O2301172201202401690307101016", "codigos": ["2-100-I002"], "sufijos": [1016],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos"},
+        {"etiqueta": "FOMAG_CSF", "suma": ["O2301172201202401690307101014", "O2301172201202401690307101015",
+            "O2301172201202401690307101016"]},
+        {"etiqueta": "O2301172201202401690307101017", "codigos": ["2-100-I001", "2-100-I002"], "sufijos": [1017],
+         "NOMBRE": "Pago de Personal Docente SSF primera inf", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307101018", "codigos": ["2-100-I001"], "sufijos": [1018],
+         "NOMBRE": "Pago de Aportes para salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica"},
+        {"etiqueta": "O2301172201202401690307101019", "codigos": ["2-100-I001"], "sufijos": [1019],
+         "NOMBRE": "Pago de Aportes para Cesantias del perso", "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos"},
+        {"etiqueta": "FOMAG_SSF", "codigos": ["2-100-I001", "2-100-I002"], "sufijos": [1017, 1018, 1019], "total": True},
+        {"etiqueta": "TOTAL_DOC_SGP", "codigos": ["1-204-I012", "2-100-I001", "2-100-I002"], "sufijos": rango(1001, 1019), "total": True},
+    ],
+}
+
+def procesar_datos_SGP_primera_infancia_detallada():
     """Función específica para procesar datos de SGP - Primera Infancia (códigos 1001-1019) con detalle"""
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
+    df, indice = cargar_datos_originales()
     
     if df is None:
         return None, None
     
     try:        
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "SGP_primera_infancia_detallada", indice["huella"], lambda: proyectar_bolsillos(indice, "SGP_primera_infancia_detallada", BOLSILLOS_SGP_PRIMERA_INFANCIA_DETALLADA)
         )
         
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 DEFINIR FILTROS INDIVIDUALES PARA PRIMERA INFANCIA ---
-        
-        # SUELDOS (1001-1008)
-        filtro_1001 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1001)
-        O2301172201202401690307101001 = {
-            "NOMBRE": "Pago de Personal Docente primera infancia",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_1001, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1001, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1001, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1001, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1001, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1002 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1002)
-        O2301172201202401690307101002 = {
-            "NOMBRE": "Pago de Ascensos en escalafon del Personal",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_1002, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1002, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1002, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1002, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1002, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1003 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1003)
-        O2301172201202401690307101003 = {
-            "NOMBRE": "Pago de horas extras del personal docente",
-            "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos",
-            "DISPONIBLE": df.loc[filtro_1003, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1003, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1003, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1003, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1003, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1004 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1004)
-        O2301172201202401690307101004 = {
-            "NOMBRE": "Pago de Personal Docente prima de servicio",
-            "CONCEPTO": "O231010100106 Prima de servicio",
-            "DISPONIBLE": df.loc[filtro_1004, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1004, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1004, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1004, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1004, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1005 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1005)
-        O2301172201202401690307101005 = {
-            "NOMBRE": "Pago de Personal Docente prima de vacaciones",
-            "CONCEPTO": "O23101010010802 Prima de vacaciones",
-            "DISPONIBLE": df.loc[filtro_1005, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1005, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1005, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1005, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1005, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1006 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1006)
-        O2301172201202401690307101006 = {
-            "NOMBRE": "Pago de Personal Docente prima de navidad",
-            "CONCEPTO": "O23101010010801 Prima de navidad",
-            "DISPONIBLE": df.loc[filtro_1006, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1006, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1006, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1006, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1006, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1007 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1007)
-        O2301172201202401690307101007 = {
-            "NOMBRE": "Pago de Personal Docente subsidio de alimentacion",
-            "CONCEPTO": "O231010100104 Subsidio de alimentacion",
-            "DISPONIBLE": df.loc[filtro_1007, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1007, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1007, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1007, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1007, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1008 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1008)
-        O2301172201202401690307101008 = {
-            "NOMBRE": "Pago Auxili de transporte personal docente",
-            "CONCEPTO": "O231010100105 Auxilio de Transporte",
-            "DISPONIBLE": df.loc[filtro_1008, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1008, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1008, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1008, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1008, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # Total SUELDOS (1001-1008)
-        filtro_sueldos = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro.between(1001, 1008))
-        SUELDOS = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_sueldos, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sueldos, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sueldos, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sueldos, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sueldos, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # PARAFISCALES (1009-1013)
-        filtro_1009 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1009)
-        O2301172201202401690307101009 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compensacion",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_1009, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1009, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1009, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1009, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1009, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1010 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1010)
-        O2301172201202401690307101010 = {
-            "NOMBRE": "Pago de Aportes para el ICBF personal docente",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_1010, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1010, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1010, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1010, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1010, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1011 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1011)
-        O2301172201202401690307101011 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos tecnicos",
-            "DISPONIBLE": df.loc[filtro_1011, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1011, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1011, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1011, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1011, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1012 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1012)
-        O2301172201202401690307101012 = {
-            "NOMBRE": "Pago de Aportes para el SENA personal docente",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_1012, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1012, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1012, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1012, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1012, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1013 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1013)
-        O2301172201202401690307101013 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_1013, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1013, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1013, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1013, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1013, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # Total PARAFISCALES (1009-1013)
-        filtro_parafiscales = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro.between(1009, 1013))
-        PARAFISCALES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_parafiscales, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_parafiscales, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_parafiscales, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_parafiscales, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_parafiscales, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # FOMAG (1014-1019)
-        filtro_1014 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1014)
-        O2301172201202401690307101014 = {
-            "NOMBRE": "Pago de Aportes para Salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica",
-            "DISPONIBLE": df.loc[filtro_1014, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1014, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1014, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1014, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1014, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1015 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1015)
-        O2301172201202401690307101015 = {
-            "NOMBRE": "Pago de Aportes para Pension del personal",
-            "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones publicas",
-            "DISPONIBLE": df.loc[filtro_1015, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1015, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1015, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1015, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1015, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_1016 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 1016)
-        O2301172201202401690307101016 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos",
-            "DISPONIBLE": df.loc[filtro_1016, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1016, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1016, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1016, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1016, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        # Total FOMAG CSF (1014-1016)
-        filtro_fomag_csf = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro.between(1014, 1016))
-        FOMAG_CSF = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_fomag_csf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_csf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_csf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_csf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_csf, "RECURSOS SIN EJECUTAR"].sum()
-            }
-        # FOMAG_Empleado_ssf (1017)
-        filtro_1017 = (df["Codigo"].isin(["2-100-I002", "2-100-I001"])) & (ultimos_cuatro == 1017)
-        O2301172201202401690307101017 = {
-            "NOMBRE": "Pago de Personal Docente SSF primera inf",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_1017, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1017, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1017, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1017, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1017, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # FOMAG_SSF_Patron (1018)
-        filtro_1018 = (df["Codigo"] == "2-100-I001") & (ultimos_cuatro == 1018)
-        O2301172201202401690307101018 = {
-            "NOMBRE": "Pago de Aportes para salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica",
-            "DISPONIBLE": df.loc[filtro_1018, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1018, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1018, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1018, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1018, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # FOMAG_CSF (1019)
-        filtro_1019 = (df["Codigo"] == "2-100-I001") & (ultimos_cuatro == 1019)
-        O2301172201202401690307101019 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del perso",
-            "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos",
-            "DISPONIBLE": df.loc[filtro_1019, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_1019, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_1019, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_1019, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_1019, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # Total FOMAG SSF (1017-1019)
-        filtro_fomag_ssf = (df["Codigo"].isin(["2-100-I002", "2-100-I001"])) & (ultimos_cuatro.between(1017, 1019))
-        FOMAG_SSF = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_fomag_ssf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_ssf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_ssf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_ssf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_ssf, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # TOTAL_DOC_SGP (1001-1019)
-        filtro_total = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-204-I012"])) & (ultimos_cuatro.between(1001, 1019))
-        TOTAL_DOC_SGP = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_total, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_total, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_total, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_total, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_total, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-                O2301172201202401690307101001, O2301172201202401690307101002, O2301172201202401690307101003,
-                O2301172201202401690307101004, O2301172201202401690307101005, O2301172201202401690307101006,
-                O2301172201202401690307101007, O2301172201202401690307101008,  
-                SUELDOS,
-                O2301172201202401690307101009, O2301172201202401690307101010, O2301172201202401690307101011,
-                O2301172201202401690307101012, O2301172201202401690307101013,
-                PARAFISCALES,
-                O2301172201202401690307101014,O2301172201202401690307101015, O2301172201202401690307101016,
-                FOMAG_CSF,
-                O2301172201202401690307101017, O2301172201202401690307101018, O2301172201202401690307101019,
-                FOMAG_SSF,
-                TOTAL_DOC_SGP
-            ],
-            index=[
-                "O2301172201202401690307101001", "O2301172201202401690307101002", "O2301172201202401690307101003",
-                "O2301172201202401690307101004", "O2301172201202401690307101005", "O2301172201202401690307101006",
-                "O2301172201202401690307101007", "O2301172201202401690307101008",  
-                "SUELDOS",
-                "O2301172201202401690307101009", "O2301172201202401690307101010", "O2301172201202401690307101011",
-                "O2301172201202401690307101012", "O2301172201202401690307101013",
-                "PARAFISCALES",
-                "O2301172201202401690307101014","O2301172201202401690307101015", "O2301172201202401690307101016",
-                "FOMAG_CSF",
-                "O2301172201202401690307101017", "O2301172201202401690307101018", "O2301172201202401690307101019",
-                "FOMAG_SSF",
-                "TOTAL_DOC_SGP"
-            ]
-        )
-        
-        resumen = resumen_principal.copy()
-        
         return df, resumen
          
     except Exception as e:
@@ -3040,471 +2622,101 @@ def procesar_datos_SGP_primera_infancia_detallada(fuerza_actualizacion=False):
 # FUNCIÓN DE PROCESAMIENTO SGP PRIMARIA BÁSICA Y MEDIA - DETALLADA (con NOMBRE y CONCEPTO)
 # =============================================================================
 
-def procesar_datos_SGP_primaria_basica_media_detallada(fuerza_actualizacion=False):
+BOLSILLOS_SGP_PRIMARIA_BASICA_MEDIA_DETALLADA = {
+    "columnas": COLUMNAS_RP,
+    "textos": ["NOMBRE", "CONCEPTO"],
+    "filas": [
+        {"etiqueta": "O2301172201202401690307103033", "codigos": ["2-100-I002"], "sufijos": [3033],
+         "NOMBRE": "Pago de Personal Docente", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307103034", "codigos": ["2-100-I002"], "sufijos": [3034],
+         "NOMBRE": "Pago de Personal Directivo Docente", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307103035", "codigos": ["2-100-I002"], "sufijos": [3035],
+         "NOMBRE": "Pago de Ascensos en escalafon del Personal", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307103036", "codigos": ["2-100-I002"], "sufijos": [3036],
+         "NOMBRE": "Pago de horas extras del personal docent", "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos"},
+        {"etiqueta": "O2301172201202401690307103037", "codigos": ["2-100-I002"], "sufijos": [3037],
+         "NOMBRE": "Pago de Personal Docente- prima de servicio", "CONCEPTO": "O231010100106 Prima de servicio"},
+        {"etiqueta": "O2301172201202401690307103038", "codigos": ["2-100-I002"], "sufijos": [3038],
+         "NOMBRE": "Pago de Personal Docente - prima de vacaciones", "CONCEPTO": "O23101010010802 Prima de vacaciones"},
+        {"etiqueta": "O2301172201202401690307103039", "codigos": ["2-100-I002"], "sufijos": [3039],
+         "NOMBRE": "Pago de Personal Docente - prima de navidad", "CONCEPTO": "O23101010010801 Prima de navidad"},
+        {"etiqueta": "O2301172201202401690307103040", "codigos": ["2-100-I002"], "sufijos": [3040],
+         "NOMBRE": "Pago de Personal Docente- subsidio de alimentación", "CONCEPTO": "O231010100104 Subsidio de alimentacion"},
+        {"etiqueta": "O2301172201202401690307103041", "codigos": ["2-100-I002"], "sufijos": [3041],
+         "NOMBRE": "Pago Auxili de transporte personal docente", "CONCEPTO": "O231010100105 Auxilio de Transporte"},
+        {"etiqueta": "SUELDOS", "suma": ["O2301172201202401690307103033", "O2301172201202401690307103034",
+            "O2301172201202401690307103035", "O2301172201202401690307103036", "O2301172201202401690307103037",
+            "O2301172201202401690307103038", "O2301172201202401690307103039", "O2301172201202401690307103040",
+            "O2301172201202401690307103041"]},
+        {"etiqueta": "O2301172201202401690307103042", "codigos": ["2-100-I002"], "sufijos": [3042],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compension", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307103043", "codigos": ["2-100-I002"], "sufijos": [3043],
+         "NOMBRE": "Pago de Aportes para las Cajas de Compensacion", "CONCEPTO": "O231010200401 Compensar"},
+        {"etiqueta": "O2301172201202401690307103044", "codigos": ["2-100-I002"], "sufijos": [3044],
+         "NOMBRE": "Pago de Aportes para el ICBF personal docente", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307103045", "codigos": ["2-100-I002"], "sufijos": [3045],
+         "NOMBRE": "Pago de Aportes para el ICBF del Personal", "CONCEPTO": "O2310102006 Aportes al ICBF"},
+        {"etiqueta": "O2301172201202401690307103046", "codigos": ["2-100-I002"], "sufijos": [3046],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos tecnicos"},
+        {"etiqueta": "O2301172201202401690307103047", "codigos": ["2-100-I002"], "sufijos": [3047],
+         "NOMBRE": "Pago de Aportes para Institutos Tecnicos", "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos tecnicos"},
+        {"etiqueta": "O2301172201202401690307103048", "codigos": ["2-100-I002"], "sufijos": [3048],
+         "NOMBRE": "Pago de Aportes para el SENA del Personal", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307103049", "codigos": ["2-100-I002"], "sufijos": [3049],
+         "NOMBRE": "Pago de Aportes para el SENA del Personal", "CONCEPTO": "O2310102007 Aportes al SENA"},
+        {"etiqueta": "O2301172201202401690307103050", "codigos": ["2-100-I002"], "sufijos": [3050],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "O2301172201202401690307103051", "codigos": ["2-100-I002"], "sufijos": [3051],
+         "NOMBRE": "Pago de Aportes para la ESAP personal docente", "CONCEPTO": "O2310102008 Aportes a la ESAP"},
+        {"etiqueta": "PARAFISCALES", "suma": ["O2301172201202401690307103042",
+            "O2301172201202401690307103043", "O2301172201202401690307103044", "O2301172201202401690307103045",
+            "O2301172201202401690307103046", "O2301172201202401690307103047", "O2301172201202401690307103048",
+            "O2301172201202401690307103049", "O2301172201202401690307103050", "O2301172201202401690307103051"]},
+        {"etiqueta": "O2301172201202401690307103052", "codigos": ["2-100-I002"], "sufijos": [3052],
+         "NOMBRE": "Pago de Aportes para Salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica"},
+        {"etiqueta": "O2301172201202401690307103053", "codigos": ["2-100-I002"], "sufijos": [3053],
+         "NOMBRE": "Pago de Aportes para salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica"},
+        {"etiqueta": "O2301172201202401690307103054", "codigos": ["2-100-I002"], "sufijos": [3054],
+         "NOMBRE": "Pago de Aportes para Pension del personal", "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones publicas"},
+        {"etiqueta": "O2301172201202401690307103055", "codigos": ["2-100-I002"], "sufijos": [3055],
+         "NOMBRE": "Pago de Aportes para Pension del personal", "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones publicas"},
+        {"etiqueta": "O2301172201202401690307103056", "codigos": ["2-100-I002"], "sufijos": [3056],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos"},
+        {"etiqueta": "O2301172201202401690307103057", "codigos": ["2-100-I002"], "sufijos": [3057],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos"},
+        {"etiqueta": "FOMAG_CSF", "suma": ["O2301172201202401690307103052", "O2301172201202401690307103053",
+            "O2301172201202401690307103054", "O2301172201202401690307103055", "O2301172201202401690307103056",
+            "O2301172201202401690307103057"]},
+        {"etiqueta": "O2301172201202401690307103058", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": [3058],
+         "NOMBRE": "Pago de Personal Docente SSF", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307103059", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": [3059],
+         "NOMBRE": "Pago de Personal Directivo  Docente SSF", "CONCEPTO": "O231010100101 Sueldo basico"},
+        {"etiqueta": "O2301172201202401690307103060", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": [3060],
+         "NOMBRE": "Pago de Aportes para salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica"},
+        {"etiqueta": "O2301172201202401690307103061", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": [3061],
+         "NOMBRE": "Pago de Aportes para salud del personal", "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica"},
+        {"etiqueta": "O2301172201202401690307103062", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": [3062],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos"},
+        {"etiqueta": "O2301172201202401690307103063", "codigos": ["2-100-I001"], "sufijos": [3063],
+         "NOMBRE": "Pago de Aportes para Cesantias del personal", "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos"},
+        {"etiqueta": "FOMAG_SSF", "codigos": ["1-200-I038", "2-100-I001", "2-100-I002"], "sufijos": rango(3058, 3063), "total": True},
+        {"etiqueta": "TOTAL_SGP_P8033", "codigos": ["1-200-I038", "1-204-I012", "2-100-I001", "2-100-I002", "2-100-I026"], "sufijos": rango(3033, 3063), "total": True},
+    ],
+}
+
+def procesar_datos_SGP_primaria_basica_media_detallada():
     """Función específica para procesar datos de SGP - Primaria Básica y Media (códigos 3033-3086) con detalle"""
-    df = cargar_datos_originales(_fuerza_actualizacion=fuerza_actualizacion)
+    df, indice = cargar_datos_originales()
     
     if df is None:
         return None, None
     
     try:        
-        ultimos_cuatro = pd.to_numeric(
-            df["Codigo_O"].astype(str).str[-4:], 
-            errors="coerce"
+        # 🔹 TABLA RESUMEN (cacheada por contenido de los datos y tabla)
+        resumen = obtener_resumen_cacheado(
+            "SGP_primaria_basica_media_detallada", indice["huella"], lambda: proyectar_bolsillos(indice, "SGP_primaria_basica_media_detallada", BOLSILLOS_SGP_PRIMARIA_BASICA_MEDIA_DETALLADA)
         )
         
-        st.session_state.df_backup = df.copy()
-        
-        # --- 🔹 DEFINIR FILTROS INDIVIDUALES PARA PRIMARIA BÁSICA Y MEDIA ---
-        
-        # SUELDOS (3033-3041)
-        filtro_3033 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3033)
-        O2301172201202401690307103033 = {
-            "NOMBRE": "Pago de Personal Docente",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_3033, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3033, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3033, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3033, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3033, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3034 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3034)
-        O2301172201202401690307103034 = {
-            "NOMBRE": "Pago de Personal Directivo Docente",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_3034, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3034, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3034, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3034, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3034, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3035 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3035)
-        O2301172201202401690307103035 = {
-            "NOMBRE": "Pago de Ascensos en escalafon del Personal",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_3035, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3035, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3035, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3035, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3035, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3036 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3036)
-        O2301172201202401690307103036 = {
-            "NOMBRE": "Pago de horas extras del personal docent",
-            "CONCEPTO": "O231010100102 Horas extras, dominicales, festivos y recargos",
-            "DISPONIBLE": df.loc[filtro_3036, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3036, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3036, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3036, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3036, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3037 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3037)
-        O2301172201202401690307103037 = {
-            "NOMBRE": "Pago de Personal Docente- prima de servicio",
-            "CONCEPTO": "O231010100106 Prima de servicio",
-            "DISPONIBLE": df.loc[filtro_3037, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3037, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3037, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3037, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3037, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3038 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3038)
-        O2301172201202401690307103038 = {
-            "NOMBRE": "Pago de Personal Docente - prima de vacaciones",
-            "CONCEPTO": "O23101010010802 Prima de vacaciones",
-            "DISPONIBLE": df.loc[filtro_3038, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3038, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3038, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3038, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3038, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3039 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3039)
-        O2301172201202401690307103039 = {
-            "NOMBRE": "Pago de Personal Docente - prima de navidad",
-            "CONCEPTO": "O23101010010801 Prima de navidad",
-            "DISPONIBLE": df.loc[filtro_3039, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3039, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3039, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3039, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3039, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3040 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3040)
-        O2301172201202401690307103040 = {
-            "NOMBRE": "Pago de Personal Docente- subsidio de alimentación",
-            "CONCEPTO": "O231010100104 Subsidio de alimentacion",
-            "DISPONIBLE": df.loc[filtro_3040, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3040, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3040, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3040, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3040, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3041 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3041)
-        O2301172201202401690307103041 = {
-            "NOMBRE": "Pago Auxili de transporte personal docente",
-            "CONCEPTO": "O231010100105 Auxilio de Transporte",
-            "DISPONIBLE": df.loc[filtro_3041, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3041, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3041, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3041, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3041, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # Total SUELDOS (3033-3041)
-        filtro_sueldos = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro.between(3033, 3041))
-        SUELDOS = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_sueldos, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_sueldos, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_sueldos, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_sueldos, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_sueldos, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # PARAFISCALES (3042-3051)
-        filtro_3042 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3042)
-        O2301172201202401690307103042 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compension",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_3042, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3042, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3042, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3042, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3042, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3043 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3043)
-        O2301172201202401690307103043 = {
-            "NOMBRE": "Pago de Aportes para las Cajas de Compensacion",
-            "CONCEPTO": "O231010200401 Compensar",
-            "DISPONIBLE": df.loc[filtro_3043, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3043, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3043, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3043, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3043, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3044 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3044)
-        O2301172201202401690307103044 = {
-            "NOMBRE": "Pago de Aportes para el ICBF personal docente",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_3044, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3044, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3044, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3044, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3044, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3045 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3045)
-        O2301172201202401690307103045 = {
-            "NOMBRE": "Pago de Aportes para el ICBF del Personal",
-            "CONCEPTO": "O2310102006 Aportes al ICBF",
-            "DISPONIBLE": df.loc[filtro_3045, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3045, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3045, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3045, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3045, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3046 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3046)
-        O2301172201202401690307103046 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos tecnicos",
-            "DISPONIBLE": df.loc[filtro_3046, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3046, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3046, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3046, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3046, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3047 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3047)
-        O2301172201202401690307103047 = {
-            "NOMBRE": "Pago de Aportes para Institutos Tecnicos",
-            "CONCEPTO": "O2310102009 Aportes a escuelas industriales e institutos tecnicos",
-            "DISPONIBLE": df.loc[filtro_3047, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3047, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3047, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3047, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3047, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3048 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3048)
-        O2301172201202401690307103048 = {
-            "NOMBRE": "Pago de Aportes para el SENA del Personal",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_3048, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3048, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3048, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3048, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3048, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3049 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3049)
-        O2301172201202401690307103049 = {
-            "NOMBRE": "Pago de Aportes para el SENA del Personal",
-            "CONCEPTO": "O2310102007 Aportes al SENA",
-            "DISPONIBLE": df.loc[filtro_3049, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3049, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3049, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3049, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3049, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3050 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3050)
-        O2301172201202401690307103050 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_3050, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3050, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3050, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3050, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3050, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3051 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3051)
-        O2301172201202401690307103051 = {
-            "NOMBRE": "Pago de Aportes para la ESAP personal docente",
-            "CONCEPTO": "O2310102008 Aportes a la ESAP",
-            "DISPONIBLE": df.loc[filtro_3051, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3051, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3051, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3051, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3051, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # Total PARAFISCALES (3042-3051)
-        filtro_parafiscales = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro.between(3042, 3051))
-        PARAFISCALES = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_parafiscales, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_parafiscales, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_parafiscales, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_parafiscales, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_parafiscales, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # FOMAG (3052-3063)
-        filtro_3052 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3052)
-        O2301172201202401690307103052 = {
-            "NOMBRE": "Pago de Aportes para Salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica",
-            "DISPONIBLE": df.loc[filtro_3052, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3052, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3052, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3052, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3052, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3053 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3053)
-        O2301172201202401690307103053 = {
-            "NOMBRE": "Pago de Aportes para salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica",
-            "DISPONIBLE": df.loc[filtro_3053, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3053, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3053, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3053, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3053, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3054 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3054)
-        O2301172201202401690307103054 = {
-            "NOMBRE": "Pago de Aportes para Pension del personal",
-            "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones publicas",
-            "DISPONIBLE": df.loc[filtro_3054, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3054, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3054, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3054, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3054, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3055 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3055)
-        O2301172201202401690307103055 = {
-            "NOMBRE": "Pago de Aportes para Pension del personal",
-            "CONCEPTO": "O231010200101 Aportes a la seguridad social en pensiones publicas",
-            "DISPONIBLE": df.loc[filtro_3055, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3055, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3055, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3055, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3055, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3056 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3056)
-        O2301172201202401690307103056 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos",
-            "DISPONIBLE": df.loc[filtro_3056, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3056, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3056, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3056, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3056, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3057 = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro == 3057)
-        O2301172201202401690307103057 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos",
-            "DISPONIBLE": df.loc[filtro_3057, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3057, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3057, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3057, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3057, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        # Total FOMAG CSF (3052-3057)
-        filtro_fomag_csf = (df["Codigo"] == "2-100-I002") & (ultimos_cuatro.between(3052, 3057))
-        FOMAG_CSF = {
-        "NOMBRE": "---",
-        "CONCEPTO": "---",
-        "DISPONIBLE": df.loc[filtro_fomag_csf, "DISPONIBLE"].sum(),
-        "RP EMITIDOS": df.loc[filtro_fomag_csf, "RP EMITIDOS"].sum(),
-        "GIROS ACUMULADOS": df.loc[filtro_fomag_csf, "GIROS ACUMULADOS"].sum(),
-        "SALDO DE APROPIACION": df.loc[filtro_fomag_csf, "SALDO DE APROPIACION"].sum(),
-        "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_csf, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # FOMAG_Empleado (3058-3059) - Codigo 2-100-I002 y 2-100-I001
-        filtro_3058 = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-200-I038"])) & (ultimos_cuatro == 3058)
-        O2301172201202401690307103058 = {
-            "NOMBRE": "Pago de Personal Docente SSF",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_3058, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3058, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3058, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3058, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3058, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3059 = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-200-I038"])) & (ultimos_cuatro == 3059)
-        O2301172201202401690307103059 = {
-            "NOMBRE": "Pago de Personal Directivo  Docente SSF",
-            "CONCEPTO": "O231010100101 Sueldo basico",
-            "DISPONIBLE": df.loc[filtro_3059, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3059, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3059, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3059, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3059, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # FOMAG_SSF_Patron (3060-3063) - Codigo 2-100-I001
-        filtro_3060 = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-200-I038"])) & (ultimos_cuatro == 3060)
-        O2301172201202401690307103060 = {
-            "NOMBRE": "Pago de Aportes para salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica",
-            "DISPONIBLE": df.loc[filtro_3060, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3060, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3060, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3060, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3060, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3061 = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-200-I038"])) & (ultimos_cuatro == 3061)
-        O2301172201202401690307103061 = {
-            "NOMBRE": "Pago de Aportes para salud del personal",
-            "CONCEPTO": "O231010200201 Aportes a la seguridad social en salud publica",
-            "DISPONIBLE": df.loc[filtro_3061, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3061, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3061, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3061, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3061, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3062 = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-200-I038"])) & (ultimos_cuatro == 3062)
-        O2301172201202401690307103062 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos",
-            "DISPONIBLE": df.loc[filtro_3062, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3062, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3062, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3062, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3062, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        filtro_3063 = (df["Codigo"] == "2-100-I001") & (ultimos_cuatro == 3063)
-        O2301172201202401690307103063 = {
-            "NOMBRE": "Pago de Aportes para Cesantias del personal",
-            "CONCEPTO": "O231010200301 Aportes de cesantias a fondos publicos",
-            "DISPONIBLE": df.loc[filtro_3063, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_3063, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_3063, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_3063, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_3063, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # Total FOMAG SSF
-        filtro_fomag_ssf = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "1-200-I038"])) & (ultimos_cuatro.between(3058, 3063))
-        FOMAG_SSF = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_fomag_ssf, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_fomag_ssf, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_fomag_ssf, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_fomag_ssf, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_fomag_ssf, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        
-        # TOTAL_SGP_P8033 (3033-3063)
-        filtro_total = (df["Codigo"].isin(["2-100-I002", "2-100-I001", "2-100-I026", "1-204-I012", "1-200-I038"])) & (ultimos_cuatro.between(3033, 3063))
-        TOTAL_SGP_P8033 = {
-            "NOMBRE": "---",
-            "CONCEPTO": "---",
-            "DISPONIBLE": df.loc[filtro_total, "DISPONIBLE"].sum(),
-            "RP EMITIDOS": df.loc[filtro_total, "RP EMITIDOS"].sum(),
-            "GIROS ACUMULADOS": df.loc[filtro_total, "GIROS ACUMULADOS"].sum(),
-            "SALDO DE APROPIACION": df.loc[filtro_total, "SALDO DE APROPIACION"].sum(),
-            "RECURSOS SIN EJECUTAR": df.loc[filtro_total, "RECURSOS SIN EJECUTAR"].sum()
-        }
-        
-        # --- 🔹 Crear tabla resumen ---
-        resumen_principal = pd.DataFrame(
-            [
-                O2301172201202401690307103033, O2301172201202401690307103034, O2301172201202401690307103035,
-                O2301172201202401690307103036, O2301172201202401690307103037, O2301172201202401690307103038,
-                O2301172201202401690307103039, O2301172201202401690307103040, O2301172201202401690307103041,  
-                SUELDOS,
-                O2301172201202401690307103042, O2301172201202401690307103043, O2301172201202401690307103044,
-                O2301172201202401690307103045, O2301172201202401690307103046, O2301172201202401690307103047,
-                O2301172201202401690307103048, O2301172201202401690307103049, O2301172201202401690307103050,
-                O2301172201202401690307103051,
-                PARAFISCALES,
-                O2301172201202401690307103052, O2301172201202401690307103053, O2301172201202401690307103054,
-                O2301172201202401690307103055, O2301172201202401690307103056, O2301172201202401690307103057,
-                FOMAG_CSF,
-                O2301172201202401690307103058, O2301172201202401690307103059, O2301172201202401690307103060,
-                O2301172201202401690307103061, O2301172201202401690307103062, O2301172201202401690307103063,
-                FOMAG_SSF,
-                TOTAL_SGP_P8033
-            ],
-            index=[
-                "O2301172201202401690307103033", "O2301172201202401690307103034", "O2301172201202401690307103035",
-                "O2301172201202401690307103036", "O2301172201202401690307103037", "O2301172201202401690307103038",
-                "O2301172201202401690307103039", "O2301172201202401690307103040", "O2301172201202401690307103041",  
-                "SUELDOS",
-                "O2301172201202401690307103042", "O2301172201202401690307103043", "O2301172201202401690307103044",
-                "O2301172201202401690307103045", "O2301172201202401690307103046", "O2301172201202401690307103047",
-                "O2301172201202401690307103048", "O2301172201202401690307103049", "O2301172201202401690307103050",
-                "O2301172201202401690307103051",
-                "PARAFISCALES",
-                "O2301172201202401690307103052", "O2301172201202401690307103053", "O2301172201202401690307103054",
-                "O2301172201202401690307103055", "O2301172201202401690307103056", "O2301172201202401690307103057",
-                "FOMAG_CSF",
-                "O2301172201202401690307103058", "O2301172201202401690307103059", "O2301172201202401690307103060",
-                "O2301172201202401690307103061", "O2301172201202401690307103062", "O2301172201202401690307103063",
-                "FOMAG_SSF",
-                "TOTAL_SGP_P8033"
-            ]
-        )
-        
-        resumen = resumen_principal.copy()
-        
         return df, resumen
          
     except Exception as e:
@@ -3515,613 +2727,580 @@ def procesar_datos_SGP_primaria_basica_media_detallada(fuerza_actualizacion=Fals
 
 
 # =============================================================================
-# FUNCIONES DE VISUALIZACIÓN
+# REGISTRO DE TABLAS (AVISO DE BOLSILLOS CAMBIADOS)
 # =============================================================================
-def mostrar_tabla_sgp(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
-        return
-
-    resumen_formateado = resumen.copy()
-    for col in resumen_formateado.columns:
-        resumen_formateado[col] = resumen_formateado[col].apply(
-            lambda x: f"${x:,.0f}".replace(",", ".")
-            if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
-        )
-
-    st.markdown(
-        "<div class='titulo-tabla'>📊 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL</div>",
-        unsafe_allow_html=True
-    )
-
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th>BOLSILLOS</th>
-<th>INICIAL</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "TOTAL_DOC_SGP": "fila-total",
-        "TOTAL_SGP_P8033": "fila-total-final",
-        "TOTAL_RP_P8033": "fila-total-final",
-        "TOTAL_GENERAL": "fila-total-general",
-        "TOTAL_8033": "fila-total-general"
-    }
-
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="numero">{row['INICIAL']}</td>
-<td class="numero">{row['DISPONIBLE']}</td>
-<td class="numero">{row['RP EMITIDOS']}</td>
-<td class="numero">{row['GIROS ACUMULADOS']}</td>
-<td class="numero">{row['SALDO DE APROPIACION']}</td>
-<td class="numero">{row['RECURSOS SIN EJECUTAR']}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
-    
-    # =========================================================================
-    # 🔹 MOSTRAR MENSAJES DIRECTAMENTE DEBAJO DE LA TABLA
-    # =========================================================================
-    mensajes = cargar_mensajes_tablero()
-    
-    if mensajes:
-        # Crear un contenedor simple y compacto para los mensajes
-        st.markdown("""
-        <div style="
-            background: #FFFDE7;
-            border: 1px solid #FFD54F;
-            border-radius: 6px;
-            padding: 10px 15px;
-            margin-top: 15px;
-            margin-bottom: 10px;
-        ">
-        """, unsafe_allow_html=True)
-        
-        # Mostrar cada mensaje en una línea separada, sin numeración
-        for mensaje in mensajes:
-            st.markdown(f"""
-            <div style="
-                padding: 4px 0;
-                font-size: 13px;
-                color: #4E342E;
-                border-bottom: 1px solid #FFF8E1;
-            ">
-                {mensaje}
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+TABLAS_BOLSILLOS = {
+    "sgp": BOLSILLOS_TABLERO,
+    "RP_principal": BOLSILLOS_RP_PRINCIPAL,
+    "RP_primera_infancia": BOLSILLOS_RP_PRIMERA_INFANCIA,
+    "RP_orientadores": BOLSILLOS_RP_ORIENTADORES,
+    "RP_primaria_basica_media": BOLSILLOS_RP_PRIMARIA_BASICA_MEDIA,
+    "SGP_principal": BOLSILLOS_SGP_PRINCIPAL,
+    "SGP_primera_infancia_detallada": BOLSILLOS_SGP_PRIMERA_INFANCIA_DETALLADA,
+    "SGP_primaria_basica_media_detallada": BOLSILLOS_SGP_PRIMARIA_BASICA_MEDIA_DETALLADA,
+}
+
+def bolsillos_cambiados(indice):
+    """
+    Filas de cada tabla cuyo valor cambió respecto a la instantánea anterior.
 
+    Returns:
+        Diccionario id_tabla -> lista de etiquetas (vacío si la carga no trae diff)
+    """
+    cambios = (indice or {}).get("cambios")
+    if not cambios:
+        return {}
+    resultado = {}
+    for id_tabla, definicion in TABLAS_BOLSILLOS.items():
+        diferencias = filas_cambiadas(cambios, id_tabla, definicion, indice.get("huella"))
+        etiquetas = [fila["etiqueta"] for fila, cambio in zip(definicion["filas"], diferencias) if cambio.any()]
+        if etiquetas:
+            resultado[id_tabla] = etiquetas
+    return resultado
 
 # =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN DOCENTES RP PRINCIPAL 
+# FORMATO DE PESOS (VECTORIZADO)
 # =============================================================================
+# Columna de cada uno de los 19 dígitos de un int64 dejando sitio a los puntos de miles
+DIGITOS_PESOS = 19
+POSICION_DIGITO = np.arange(DIGITOS_PESOS) + (np.arange(DIGITOS_PESOS) + 2) // 3
+ANCHO_PESOS = DIGITOS_PESOS + 6
 
-def mostrar_tabla_RP_principal(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
-        return
-
-    resumen_formateado = resumen.copy()
-    for col in resumen_formateado.columns:
-        resumen_formateado[col] = resumen_formateado[col].apply(
-            lambda x: f"${x:,.0f}".replace(",", ".")
-            if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
-        )
-
-    st.markdown(
-        "<div class='titulo-tabla'>📊 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL DOCENTES RP</div>",
-        unsafe_allow_html=True
-    )
-
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th>OBJETO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS": "fila-total", 
-        "PARAFISCALES": "fila-total-final",
-        "FOMAG": "fila-total-general","TOTAL_DOC_RP":"fila-total" 
-    }
-
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="numero">{row['DISPONIBLE']}</td>
-<td class="numero">{row['RP EMITIDOS']}</td>
-<td class="numero">{row['GIROS ACUMULADOS']}</td>
-<td class="numero">{row['SALDO DE APROPIACION']}</td>
-<td class="numero">{row['RECURSOS SIN EJECUTAR']}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
+def formatear_pesos(bloque):
+    """
+    Convierte un bloque numérico completo en texto de pesos colombianos
+    ("$1.234.567", "$-2.500") en una sola pasada de numpy: todos los valores
+    se escriben a la vez en una matriz de caracteres con los puntos de miles
+    ya en su columna y se recortan los ceros a la izquierda.
+    Los vacíos y no numéricos quedan en "$0", como el formato anterior.
+    """
+    enteros = bloque.apply(pd.to_numeric, errors="coerce").fillna(0).round().astype("int64").to_numpy()
+    planos = np.abs(enteros.ravel()).astype(np.uint64)
 
-    st.markdown(html_tabla, unsafe_allow_html=True)
+    # 🔹 Matriz de caracteres: dígitos en su columna, puntos de miles entre grupos
+    potencias = np.uint64(10) ** np.arange(DIGITOS_PESOS - 1, -1, -1, dtype=np.uint64)
+    digitos = (planos[:, None] // potencias % np.uint64(10)).astype(np.uint8) + ord("0")
+    caracteres = np.full((len(planos), ANCHO_PESOS), ord("."), dtype=np.uint8)
+    caracteres[:, POSICION_DIGITO] = digitos
 
+    # 🔹 Blanquear ceros y puntos a la izquierda del primer dígito significativo
+    primero = np.where(planos == 0, DIGITOS_PESOS - 1, (digitos != ord("0")).argmax(axis=1))
+    caracteres[np.arange(ANCHO_PESOS) < POSICION_DIGITO[primero][:, None]] = ord(" ")
 
+    texto = np.char.lstrip(caracteres.view(f"S{ANCHO_PESOS}").ravel().astype(f"U{ANCHO_PESOS}"))
+    texto = np.char.add(np.where(enteros.ravel() < 0, "$-", "$"), texto)
+    return pd.DataFrame(texto.reshape(enteros.shape).astype(object), index=bloque.index, columns=bloque.columns)
 
-# =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN DOCENTES RP PRIMERA INFANCIA - CORREGIDA
-# =============================================================================
+def formatear_resumen(resumen, columnas=None):
+    """
+    Copia de la tabla resumen con las columnas de valores como texto en pesos.
+    No se guarda: el HTML que la usa ya se cachea por (vista, huella), ver cache_html.
 
-def mostrar_tabla_RP_primera_infancia(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
-        return
+    Args:
+        resumen: Tabla resumen (compartida, no se modifica)
+        columnas: Columnas a formatear (None = todas); las que no existan se omiten
 
-    # Crear una copia para formatear
+    Returns:
+        DataFrame formateado
+    """
+    columnas = [c for c in (columnas if columnas is not None else resumen.columns) if c in resumen.columns]
     resumen_formateado = resumen.copy()
-    
-    # Formatear SOLO las columnas numéricas (no las de texto)
-    columnas_numericas = ['DISPONIBLE', 'RP EMITIDOS', 'GIROS ACUMULADOS', 
-                         'SALDO DE APROPIACION', 'RECURSOS SIN EJECUTAR']
-    
-    for col in columnas_numericas:
-        if col in resumen_formateado.columns:
-            resumen_formateado[col] = resumen_formateado[col].apply(
-                lambda x: f"${x:,.0f}".replace(",", ".")
-                if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
-            )
-
-    st.markdown(
-        "<div class='titulo-tabla'>📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMERA INFANCIA RP</div>",
-        unsafe_allow_html=True
-    )
-
-    # HTML CON CLASES ESPECÍFICAS PARA COLUMNAS DE TEXTO
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th class="encabezado-fila">CÓDIGO</th>
-<th class="encabezado-texto">NOMBRE</th>
-<th class="encabezado-texto">CONCEPTO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS": "fila-total", 
-        "PARAFISCALES": "fila-total-final",
-        "FOMAG": "fila-total-general", "TOTAL_PRIMERA_INFANCIA": "fila-total"
-    }
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr>
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="texto-reducido">{row.get('NOMBRE', '-')}</td>
-<td class="texto-reducido">{row.get('CONCEPTO', '-')}</td>
-<td class="numero">{row.get('DISPONIBLE', '$0')}</td>
-<td class="numero">{row.get('RP EMITIDOS', '$0')}</td>
-<td class="numero">{row.get('GIROS ACUMULADOS', '$0')}</td>
-<td class="numero">{row.get('SALDO DE APROPIACION', '$0')}</td>
-<td class="numero">{row.get('RECURSOS SIN EJECUTAR', '$0')}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
-
+    resumen_formateado[columnas] = formatear_pesos(resumen[columnas])
+    return resumen_formateado
 
 # =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN DOCENTES RP ORIENTADORES
+# FUNCIONES DE VISUALIZACIÓN
 # =============================================================================
+# Cómo se pinta cada tabla: título, encabezado de la primera columna,
+# columnas descriptivas y de valores, y estilo de las filas de totales
+VISTAS_TABLAS = {
+    "sgp": {
+        "titulo": "📊 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL",
+        "encabezado": "BOLSILLOS",
+        "textos": [],
+        "columnas": COLUMNAS_TABLERO,
+        "filas_totales": {
+            "TOTAL_DOC_SGP": "fila-total",
+            "TOTAL_SGP_P8033": "fila-total-final",
+            "TOTAL_RP_P8033": "fila-total-final",
+            "TOTAL_GENERAL": "fila-total-general",
+            "TOTAL_8033": "fila-total-general",
+        },
+    },
+    "RP_principal": {
+        "titulo": "📊 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL DOCENTES RP",
+        "encabezado": "OBJETO",
+        "textos": [],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS": "fila-total",
+            "PARAFISCALES": "fila-total-final",
+            "FOMAG": "fila-total-general",
+            "TOTAL_DOC_RP": "fila-total",
+        },
+    },
+    "RP_primera_infancia": {
+        "titulo": "📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMERA INFANCIA RP",
+        "encabezado": "CÓDIGO",
+        "textos": ["NOMBRE", "CONCEPTO"],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS": "fila-total",
+            "PARAFISCALES": "fila-total-final",
+            "FOMAG": "fila-total-general",
+            "TOTAL_PRIMERA_INFANCIA": "fila-total",
+        },
+    },
+    "RP_orientadores": {
+        "titulo": "📊 EJECUCIÓN PRESUPUESTAL DOCENTES ORIENTADORES RP",
+        "encabezado": "CÓDIGO",
+        "textos": ["NOMBRE", "CONCEPTO"],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS_ORIENTADORES": "fila-total",
+            "PARAFISCALES_ORIENTADORES": "fila-total-final",
+            "FOMAG_ORIENTADORES": "fila-total-general",
+            "TOTAL_DOC_ORIENTADORES": "fila-total",
+        },
+    },
+    "RP_primaria_basica_media": {
+        "titulo": "📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMARIA BASICA MEDIA RP",
+        "encabezado": "CÓDIGO",
+        "textos": ["NOMBRE", "CONCEPTO"],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS_PBM": "fila-total",
+            "PARAFISCALES_PBM": "fila-total-final",
+            "FOMAG_PBM": "fila-total-general",
+            "TOTAL_DOC_PBM": "fila-total",
+        },
+    },
+    "SGP_principal": {
+        "titulo": "📊 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL DOCENTES SGP",
+        "encabezado": "OBJETO",
+        "textos": [],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS": "fila-total",
+            "PARAFISCALES": "fila-total-final",
+            "FOMAG_ssf": "fila-total-general",
+            "FOMAG_csf": "fila-total",
+            "TOTAL_DOC_SGP": "fila-total",
+        },
+    },
+    "SGP_primera_infancia_detallada": {
+        "titulo": "📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMERA INFANCIA SGP",
+        "encabezado": "CÓDIGO",
+        "textos": ["NOMBRE", "CONCEPTO"],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS": "fila-total",
+            "PARAFISCALES": "fila-total-final",
+            "FOMAG_CSF": "fila-total-general",
+            "FOMAG_SSF": "fila-total-general",
+            "TOTAL_DOC_SGP": "fila-total",
+        },
+    },
+    "SGP_primaria_basica_media_detallada": {
+        "titulo": "📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMARIA BÁSICA MEDIA SGP",
+        "encabezado": "CÓDIGO",
+        "textos": ["NOMBRE", "CONCEPTO"],
+        "columnas": COLUMNAS_RP,
+        "filas_totales": {
+            "SUELDOS": "fila-total",
+            "PARAFISCALES": "fila-total-final",
+            "FOMAG_CSF": "fila-total-general",
+            "FOMAG_SSF": "fila-total-general",
+            "TOTAL_SGP_P8033": "fila-total",
+        },
+    },
+}
+
+@st.cache_resource
+def cache_html():
+    """HTML ya armado de cada tabla a nivel de proceso, indexado por (vista, huella de los datos)"""
+    return {"bloqueo": threading.Lock(), "tablas": OrderedDict()}
+
+def armar_tabla_html(vista, resumen):
+    """
+    Arma el HTML de una tabla resumen según su vista: todas las filas se
+    construyen a la vez concatenando columnas completas (arreglos numpy)
+    y se unen con un solo join.
+    """
+    resumen_formateado = formatear_resumen(resumen, vista["columnas"])
+    n_filas = len(resumen_formateado)
+
+    def columna(nombre, por_defecto):
+        if nombre in resumen_formateado.columns:
+            return resumen_formateado[nombre].to_numpy(dtype=str)
+        return np.full(n_filas, por_defecto)
+
+    # 🔹 Encabezado: con columnas de texto la primera y las descriptivas llevan clase propia
+    if vista["textos"]:
+        encabezados = [f'<th class="encabezado-fila">{vista["encabezado"]}</th>']
+        encabezados += [f'<th class="encabezado-texto">{texto}</th>' for texto in vista["textos"]]
+    else:
+        encabezados = [f'<th>{vista["encabezado"]}</th>']
+    encabezados += [f"<th>{nombre}</th>" for nombre in vista["columnas"]]
+
+    # 🔹 Cuerpo: cada pieza es una columna entera o un literal que se repite
+    etiquetas = resumen_formateado.index.to_numpy(dtype=str)
+    clases = resumen_formateado.index.map(vista["filas_totales"]).fillna("").to_numpy(dtype=str)
+    piezas = [np.full(n_filas, '<tr class="'), clases, '">\n<td class="encabezado-fila">', etiquetas, "</td>\n"]
+    for texto in vista["textos"]:
+        piezas += ['<td class="texto-reducido">', columna(texto, "-"), "</td>\n"]
+    for nombre in vista["columnas"]:
+        piezas += ['<td class="numero">', columna(nombre, "$0"), "</td>\n"]
+    piezas.append("</tr>")
+    filas = reduce(np.char.add, piezas)
+
+    return (
+        '<div class="tabla-container">\n<table class="tabla-personalizada">\n<thead>\n<tr>\n'
+        + "\n".join(encabezados)
+        + "\n</tr>\n</thead>\n<tbody>\n"
+        + "\n".join(filas)
+        + "\n</tbody>\n</table>\n</div>\n"
+    )
 
-def mostrar_tabla_RP_orientadores(resumen):
+def renderizar_tabla_html(id_vista, resumen):
+    """
+    HTML de una tabla resumen, memoizado por (vista, huella de la instantánea):
+    un rerun con los mismos datos reutiliza el HTML sin formatear ni armar nada.
+    Las tablas sin huella (no cacheadas) se arman cada vez.
+    """
+    vista = VISTAS_TABLAS[id_vista]
+    huella = resumen.attrs.get("huella")
+    if huella is None:
+        return armar_tabla_html(vista, resumen)
+    return memoizar_lru(cache_html(), (id_vista, huella), lambda: armar_tabla_html(vista, resumen), MAX_TABLAS_EN_CACHE)
+
+def mostrar_tabla_bolsillos(id_vista, resumen):
+    """Muestra el título y la tabla HTML de una vista de VISTAS_TABLAS"""
     if resumen is None or resumen.empty:
         st.warning("No hay datos para mostrar")
-        return
-
-    # Crear una copia para formatear
-    resumen_formateado = resumen.copy()
-    
-    # Formatear SOLO las columnas numéricas (no las de texto)
-    columnas_numericas = ['DISPONIBLE', 'RP EMITIDOS', 'GIROS ACUMULADOS', 
-                         'SALDO DE APROPIACION', 'RECURSOS SIN EJECUTAR']
-    
-    for col in columnas_numericas:
-        if col in resumen_formateado.columns:
-            resumen_formateado[col] = resumen_formateado[col].apply(
-                lambda x: f"${x:,.0f}".replace(",", ".")
-                if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
-            )
+        return False
 
     st.markdown(
-        "<div class='titulo-tabla'>📊 EJECUCIÓN PRESUPUESTAL DOCENTES ORIENTADORES RP</div>",
+        f"<div class='titulo-tabla'>{VISTAS_TABLAS[id_vista]['titulo']}</div>",
         unsafe_allow_html=True
     )
+    st.markdown(renderizar_tabla_html(id_vista, resumen), unsafe_allow_html=True)
+    return True
 
-    # HTML CON CLASES ESPECÍFICAS PARA COLUMNAS DE TEXTO
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th class="encabezado-fila">CÓDIGO</th>
-<th class="encabezado-texto">NOMBRE</th>
-<th class="encabezado-texto">CONCEPTO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS_ORIENTADORES": "fila-total", 
-        "PARAFISCALES_ORIENTADORES": "fila-total-final",
-        "FOMAG_ORIENTADORES": "fila-total-general", "TOTAL_DOC_ORIENTADORES": "fila-total"
-    }
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr>
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="texto-reducido">{row.get('NOMBRE', '-')}</td>
-<td class="texto-reducido">{row.get('CONCEPTO', '-')}</td>
-<td class="numero">{row.get('DISPONIBLE', '$0')}</td>
-<td class="numero">{row.get('RP EMITIDOS', '$0')}</td>
-<td class="numero">{row.get('GIROS ACUMULADOS', '$0')}</td>
-<td class="numero">{row.get('SALDO DE APROPIACION', '$0')}</td>
-<td class="numero">{row.get('RECURSOS SIN EJECUTAR', '$0')}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
-
-# =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN DOCENTES RP PRIMARIA BASICA MEDIA
-# =============================================================================
-
-def mostrar_tabla_RP_PBM(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
+def mostrar_tabla_sgp(resumen):
+    if not mostrar_tabla_bolsillos("sgp", resumen):
         return
-
-    # Crear una copia para formatear
-    resumen_formateado = resumen.copy()
     
-    # Formatear SOLO las columnas numéricas (no las de texto)
-    columnas_numericas = ['DISPONIBLE', 'RP EMITIDOS', 'GIROS ACUMULADOS', 
-                         'SALDO DE APROPIACION', 'RECURSOS SIN EJECUTAR']
+    # =========================================================================
+    # 🔹 MOSTRAR MENSAJES DIRECTAMENTE DEBAJO DE LA TABLA
+    # =========================================================================
+    mensajes = cargar_mensajes_tablero()
     
-    for col in columnas_numericas:
-        if col in resumen_formateado.columns:
-            resumen_formateado[col] = resumen_formateado[col].apply(
-                lambda x: f"${x:,.0f}".replace(",", ".")
-                if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
-            )
+    if mensajes:
+        # Crear un contenedor simple y compacto para los mensajes
+        st.markdown("""
+        <div style="
+            background: #FFFDE7;
+            border: 1px solid #FFD54F;
+            border-radius: 6px;
+            padding: 10px 15px;
+            margin-top: 15px;
+            margin-bottom: 10px;
+        ">
+        """, unsafe_allow_html=True)
+        
+        # Mostrar cada mensaje en una línea separada, sin numeración
+        for mensaje in mensajes:
+            st.markdown(f"""
+            <div style="
+                padding: 4px 0;
+                font-size: 13px;
+                color: #4E342E;
+                border-bottom: 1px solid #FFF8E1;
+            ">
+                {mensaje}
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("</div>", unsafe_allow_html=True)
 
-    st.markdown(
-        "<div class='titulo-tabla'>📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMARIA BASICA MEDIA RP</div>",
-        unsafe_allow_html=True
-    )
 
-    # HTML CON CLASES ESPECÍFICAS PARA COLUMNAS DE TEXTO
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th class="encabezado-fila">CÓDIGO</th>
-<th class="encabezado-texto">NOMBRE</th>
-<th class="encabezado-texto">CONCEPTO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS_PBM": "fila-total", 
-        "PARAFISCALES_PBM": "fila-total-final",
-        "FOMAG_PBM": "fila-total-general", "TOTAL_DOC_PBM": "fila-total"
-    }
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr>
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="texto-reducido">{row.get('NOMBRE', '-')}</td>
-<td class="texto-reducido">{row.get('CONCEPTO', '-')}</td>
-<td class="numero">{row.get('DISPONIBLE', '$0')}</td>
-<td class="numero">{row.get('RP EMITIDOS', '$0')}</td>
-<td class="numero">{row.get('GIROS ACUMULADOS', '$0')}</td>
-<td class="numero">{row.get('SALDO DE APROPIACION', '$0')}</td>
-<td class="numero">{row.get('RECURSOS SIN EJECUTAR', '$0')}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
+def mostrar_tabla_RP_principal(resumen):
+    mostrar_tabla_bolsillos("RP_principal", resumen)
 
-# =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN DOCENTES SGP PRINCIPAL 
-# =============================================================================
+def mostrar_tabla_RP_primera_infancia(resumen):
+    mostrar_tabla_bolsillos("RP_primera_infancia", resumen)
 
-def mostrar_tabla_SGPP_principal(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
-        return
+def mostrar_tabla_RP_orientadores(resumen):
+    mostrar_tabla_bolsillos("RP_orientadores", resumen)
 
-    resumen_formateado = resumen.copy()
-    for col in resumen_formateado.columns:
-        resumen_formateado[col] = resumen_formateado[col].apply(
-            lambda x: f"${x:,.0f}".replace(",", ".")
-            if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
-        )
+def mostrar_tabla_RP_PBM(resumen):
+    mostrar_tabla_bolsillos("RP_primaria_basica_media", resumen)
 
-    st.markdown(
-        "<div class='titulo-tabla'>📊 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL DOCENTES SGP</div>",
-        unsafe_allow_html=True
-    )
+def mostrar_tabla_SGPP_principal(resumen):
+    mostrar_tabla_bolsillos("SGP_principal", resumen)
 
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th>OBJETO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS": "fila-total", 
-        "PARAFISCALES": "fila-total-final",
-        "FOMAG_ssf": "fila-total-general","FOMAG_csf":"fila-total", "TOTAL_DOC_SGP":"fila-total"     
-    }
+def mostrar_tabla_SGP_primera_infancia_detallada(resumen):
+    mostrar_tabla_bolsillos("SGP_primera_infancia_detallada", resumen)
+
+def mostrar_tabla_SGP_primaria_basica_media_detallada(resumen):
+    mostrar_tabla_bolsillos("SGP_primaria_basica_media_detallada", resumen)
 
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="numero">{row['DISPONIBLE']}</td>
-<td class="numero">{row['RP EMITIDOS']}</td>
-<td class="numero">{row['GIROS ACUMULADOS']}</td>
-<td class="numero">{row['SALDO DE APROPIACION']}</td>
-<td class="numero">{row['RECURSOS SIN EJECUTAR']}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
 
 # =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN SGP PRIMERA INFANCIA - DETALLADA
+# SECCIONES DE PANTALLA COMO FRAGMENTOS (RERUN PARCIAL)
 # =============================================================================
+# Cada sección con botón propio; la clave es la de DEPENDENCIAS_SECCIONES
+SECCIONES_PANTALLA = {
+    "rp_total": {
+        "titulo": "🌐 TOTAL",
+        "boton": "🔄 Actualizar TOTAL", "clave": "actualizar_total",
+        "nombre": "TOTAL",
+        "procesar": procesar_datos_RP_principal, "mostrar": mostrar_tabla_RP_principal,
+    },
+    "rp_primera_infancia": {
+        "titulo": "👶🏻 Primera Infancia",
+        "boton": "🔄 Actualizar Primera Infancia", "clave": "actualizar_pi",
+        "nombre": "Primera Infancia",
+        "procesar": procesar_datos_RP_primera_infancia, "mostrar": mostrar_tabla_RP_primera_infancia,
+    },
+    "rp_orientadores": {
+        "titulo": "🤝🏻 Orientadores",
+        "boton": "🔄 Actualizar Orientadores", "clave": "actualizar_or",
+        "nombre": "Orientadores",
+        "procesar": procesar_datos_RP_orientadores, "mostrar": mostrar_tabla_RP_orientadores,
+    },
+    "rp_pbm": {
+        "titulo": "👩🏻‍🏫 👨🏻‍🏫 Primaria Básica Media",
+        "boton": "🔄 Actualizar PBM", "clave": "actualizar_pbm",
+        "nombre": "Primaria Básica Media", "nombre_error": "PBM",
+        "procesar": procesar_datos_RP_primaria_basica_media, "mostrar": mostrar_tabla_RP_PBM,
+    },
+    "sgp_total": {
+        "titulo": "🌐 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL DOCENTES SGP",
+        "boton": "🔄 Actualizar TOTAL", "clave": "actualizar_total_sgp",
+        "nombre": "TOTAL SGP",
+        "procesar": procesar_datos_SGP_principal, "mostrar": mostrar_tabla_SGPP_principal,
+    },
+    "sgp_primera_infancia": {
+        "titulo": "👶🏻 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMERA INFANCIA SGP",
+        "boton": "🔄 Actualizar Primera Infancia SGP", "clave": "actualizar_pi_sgp",
+        "nombre": "Primera Infancia SGP",
+        "procesar": procesar_datos_SGP_primera_infancia_detallada, "mostrar": mostrar_tabla_SGP_primera_infancia_detallada,
+    },
+    "sgp_pbm": {
+        "titulo": "👩🏻‍🏫 👨🏻‍🏫 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMARIA BÁSICA MEDIA SGP",
+        "boton": "🔄 Actualizar PBM SGP", "clave": "actualizar_pbm_sgp",
+        "nombre": "Primaria Básica y Media SGP", "nombre_error": "PBM SGP",
+        "procesar": procesar_datos_SGP_primaria_basica_media_detallada, "mostrar": mostrar_tabla_SGP_primaria_basica_media_detallada,
+    },
+}
+
+@st.fragment
+def mostrar_seccion(seccion):
+    """
+    Una sección de pantalla (título, botón "Actualizar" y tabla) como
+    fragmento: su botón refresca la sección y solo este fragmento se vuelve
+    a ejecutar, sin recalcular ni repintar el resto de la página. Si la
+    recarga trae datos nuevos se vuelve a ejecutar toda la app, para que los
+    bloques de exportación no sirvan una versión anterior a la de la sección.
 
-def mostrar_tabla_SGP_primera_infancia_detallada(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
-        return
+    Args:
+        seccion: Clave de SECCIONES_PANTALLA
+    """
+    config = SECCIONES_PANTALLA[seccion]
+    st.subheader(config["titulo"])
+    
+    # Botón específico para esta sección: el clic ya re-ejecuta solo este
+    # fragmento, así que basta con invalidar antes de pintar la tabla
+    col_boton, _ = st.columns([1, 3])
+    with col_boton:
+        if st.button(config["boton"], key=config["clave"], use_container_width=True):
+            huella_previa = huella_sesion()
+            if invalidar_seccion(seccion) and huella_sesion() != huella_previa:
+                st.rerun(scope="app")
+    
+    with st.spinner(f"📊 Procesando datos {config['nombre']}..."):
+        df, resumen = config["procesar"]()
+    
+    if df is not None:
+        if resumen is not None:
+            config["mostrar"](resumen)
+        else:
+            st.error(f"❌ No se pudieron procesar los datos {config.get('nombre_error', config['nombre'])}")
+    else:
+        st.error("❌ No se pudo cargar el archivo de datos")
 
-    # Crear una copia para formatear
-    resumen_formateado = resumen.copy()
+@st.fragment
+def exportar_excel_recursos_propios():
+    """Bloque de descargas Excel de Recursos Propios como fragmento independiente"""
+    st.subheader("📥 Exportar a Excel (con formatos)")
     
-    # Formatear SOLO las columnas numéricas
-    columnas_numericas = ['DISPONIBLE', 'RP EMITIDOS', 'GIROS ACUMULADOS', 
-                         'SALDO DE APROPIACION', 'RECURSOS SIN EJECUTAR']
+    # Crear columnas para botones de descarga
+    col_descarga1, col_descarga2, col_descarga3, col_descarga4 = st.columns(4)
+    
+    # Obtener los dataframes procesados
+    with st.spinner("Preparando datos con formatos..."):
+        # Recargar o usar datos en cache
+        df, resumen_total = procesar_datos_RP_principal()
+        _, resumen_pi = procesar_datos_RP_primera_infancia()
+        _, resumen_or = procesar_datos_RP_orientadores()
+        _, resumen_pbm = procesar_datos_RP_primaria_basica_media()
     
-    for col in columnas_numericas:
-        if col in resumen_formateado.columns:
-            resumen_formateado[col] = resumen_formateado[col].apply(
-                lambda x: f"${x:,.0f}".replace(",", ".")
-                if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
+    with col_descarga1:
+        if resumen_total is not None:
+            excel_total = libro_excel_bajo_demanda([resumen_total], ["TOTAL_DOCENTES"], ["RP"])
+            st.download_button(
+                label="📥 Descargar TOTAL",
+                data=excel_total,
+                file_name=f"RP_TOTAL_DOCENTES_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
             )
-
-    st.markdown(
-        "<div class='titulo-tabla'>📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMERA INFANCIA SGP</div>",
-        unsafe_allow_html=True
-    )
-
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th class="encabezado-fila">CÓDIGO</th>
-<th class="encabezado-texto">NOMBRE</th>
-<th class="encabezado-texto">CONCEPTO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS": "fila-total", 
-        "PARAFISCALES": "fila-total-final",
-        "FOMAG_CSF": "fila-total-general",
-        "FOMAG_SSF": "fila-total-general",
-        "TOTAL_DOC_SGP": "fila-total"
-    }
+        else:
+            st.button("📥 Descargar TOTAL", disabled=True, use_container_width=True)
+    
+    with col_descarga2:
+        if resumen_pi is not None:
+            excel_pi = libro_excel_bajo_demanda([resumen_pi], ["PRIMERA_INFANCIA"], ["RP"])
+            st.download_button(
+                label="📥 Descargar Primera Infancia",
+                data=excel_pi,
+                file_name=f"RP_PRIMERA_INFANCIA_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
+            )
+        else:
+            st.button("📥 Descargar Primera Infancia", disabled=True, use_container_width=True)
+    
+    with col_descarga3:
+        if resumen_or is not None:
+            excel_or = libro_excel_bajo_demanda([resumen_or], ["ORIENTADORES"], ["RP"])
+            st.download_button(
+                label="📥 Descargar Orientadores",
+                data=excel_or,
+                file_name=f"RP_ORIENTADORES_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
+            )
+        else:
+            st.button("📥 Descargar Orientadores", disabled=True, use_container_width=True)
+    
+    with col_descarga4:
+        if resumen_pbm is not None:
+            excel_pbm = libro_excel_bajo_demanda([resumen_pbm], ["PRIMARIA_BASICA_MEDIA"], ["RP"])
+            st.download_button(
+                label="📥 Descargar PBM",
+                data=excel_pbm,
+                file_name=f"RP_PRIMARIA_BASICA_MEDIA_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
+            )
+        else:
+            st.button("📥 Descargar PBM", disabled=True, use_container_width=True)
     
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="texto-reducido">{row.get('NOMBRE', '-')}</td>
-<td class="texto-reducido">{row.get('CONCEPTO', '-')}</td>
-<td class="numero">{row.get('DISPONIBLE', '$0')}</td>
-<td class="numero">{row.get('RP EMITIDOS', '$0')}</td>
-<td class="numero">{row.get('GIROS ACUMULADOS', '$0')}</td>
-<td class="numero">{row.get('SALDO DE APROPIACION', '$0')}</td>
-<td class="numero">{row.get('RECURSOS SIN EJECUTAR', '$0')}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
+    # Botón para descargar TODO en un solo archivo
+    st.markdown("---")
+    col_todo, _ = st.columns([1, 3])
+    with col_todo:
+        if all(r is not None for r in [resumen_total, resumen_pi, resumen_or, resumen_pbm]):
+            excel_completo = libro_excel_bajo_demanda(
+                [resumen_total, resumen_pi, resumen_or, resumen_pbm],
+                ["TOTAL", "PRIMERA_INFANCIA", "ORIENTADORES", "PRIMARIA_BASICA_MEDIA"],
+                ["RP", "RP", "RP", "RP"]
+            )
+            st.download_button(
+                label="📦 Descargar TODO (4 hojas)",
+                data=excel_completo,
+                file_name=f"RP_DOCENTES_COMPLETO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                type="primary",
+                help="Incluye todas las tablas con sus formatos originales"
+            )
+        else:
+            st.button("📦 Descargar TODO (4 hojas)", disabled=True, use_container_width=True)
 
+@st.fragment
+def exportar_excel_sgp():
+    """Bloque de descargas Excel SGP como fragmento independiente"""
+    st.subheader("📥 Exportar a Excel")
 
-# =============================================================================
-# FUNCIÓN DE VISUALIZACIÓN SGP PRIMARIA BÁSICA Y MEDIA - DETALLADA
-# =============================================================================
+    # Crear columnas para botones de descarga
+    col_descarga1, col_descarga2, col_descarga3, col_descarga4 = st.columns(4)
 
-def mostrar_tabla_SGP_primaria_basica_media_detallada(resumen):
-    if resumen is None or resumen.empty:
-        st.warning("No hay datos para mostrar")
-        return
+    # Obtener los dataframes procesados
+    with st.spinner("Preparando datos con formatos..."):
+        # Recargar o usar datos en cache
+        _, resumen_total = procesar_datos_SGP_principal()
+        _, resumen_pi = procesar_datos_SGP_primera_infancia_detallada()
+        _, resumen_pbm = procesar_datos_SGP_primaria_basica_media_detallada()
 
-    # Crear una copia para formatear
-    resumen_formateado = resumen.copy()
-    
-    # Formatear SOLO las columnas numéricas
-    columnas_numericas = ['DISPONIBLE', 'RP EMITIDOS', 'GIROS ACUMULADOS', 
-                         'SALDO DE APROPIACION', 'RECURSOS SIN EJECUTAR']
-    
-    for col in columnas_numericas:
-        if col in resumen_formateado.columns:
-            resumen_formateado[col] = resumen_formateado[col].apply(
-                lambda x: f"${x:,.0f}".replace(",", ".")
-                if pd.notnull(x) and isinstance(x, (int, float)) else "$0"
+    with col_descarga1:
+        if resumen_total is not None:
+            excel_total = libro_excel_bajo_demanda([resumen_total], ["TOTAL_SGP"], ["SGP"])
+            st.download_button(
+                label="📥 Descargar TOTAL",
+                data=excel_total,
+                file_name=f"SGP_TOTAL_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
             )
+        else:
+            st.button("📥 Descargar TOTAL", disabled=True, use_container_width=True)
 
-    st.markdown(
-        "<div class='titulo-tabla'>📊 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMARIA BÁSICA MEDIA SGP</div>",
-        unsafe_allow_html=True
-    )
-
-    html_tabla = """
-<div class="tabla-container">
-<table class="tabla-personalizada">
-<thead>
-<tr>
-<th class="encabezado-fila">CÓDIGO</th>
-<th class="encabezado-texto">NOMBRE</th>
-<th class="encabezado-texto">CONCEPTO</th>
-<th>DISPONIBLE</th>
-<th>RP EMITIDOS</th>
-<th>GIROS ACUMULADOS</th>
-<th>SALDO DE APROPIACION</th>
-<th>RECURSOS SIN EJECUTAR</th>
-</tr>
-</thead>
-<tbody>
-"""
-    filas_totales = {
-        "SUELDOS": "fila-total", 
-        "PARAFISCALES": "fila-total-final",
-        "FOMAG_CSF": "fila-total-general",
-        "FOMAG_SSF": "fila-total-general", 
-        "TOTAL_SGP_P8033": "fila-total"
-    }
-    
-    for idx, row in resumen_formateado.iterrows():
-        clase_fila = filas_totales.get(idx, "")
-        html_tabla += f"""
-<tr class="{clase_fila}">
-<td class="encabezado-fila">{idx}</td>
-<td class="texto-reducido">{row.get('NOMBRE', '-')}</td>
-<td class="texto-reducido">{row.get('CONCEPTO', '-')}</td>
-<td class="numero">{row.get('DISPONIBLE', '$0')}</td>
-<td class="numero">{row.get('RP EMITIDOS', '$0')}</td>
-<td class="numero">{row.get('GIROS ACUMULADOS', '$0')}</td>
-<td class="numero">{row.get('SALDO DE APROPIACION', '$0')}</td>
-<td class="numero">{row.get('RECURSOS SIN EJECUTAR', '$0')}</td>
-</tr>
-"""
-
-    html_tabla += """
-</tbody>
-</table>
-</div>
-"""
-
-    st.markdown(html_tabla, unsafe_allow_html=True)
+    with col_descarga2:
+        if resumen_pi is not None:
+            excel_pi = libro_excel_bajo_demanda([resumen_pi], ["PRIMERA_INFANCIA_SGP"], ["SGP"])
+            st.download_button(
+                label="📥 Descargar Primera Infancia",
+                data=excel_pi,
+                file_name=f"SGP_PRIMERA_INFANCIA_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
+            )
+        else:
+            st.button("📥 Descargar Primera Infancia", disabled=True, use_container_width=True)
 
+    with col_descarga3:
+        if resumen_pbm is not None:
+            excel_pbm = libro_excel_bajo_demanda([resumen_pbm], ["PRIMARIA_BASICA_MEDIA_SGP"], ["SGP"])
+            st.download_button(
+                label="📥 Descargar PBM",
+                data=excel_pbm,
+                file_name=f"SGP_PBM_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                help="Incluye colores y formatos como en pantalla"
+            )
+        else:
+            st.button("📥 Descargar PBM", disabled=True, use_container_width=True)
 
+    with col_descarga4:
+        # Descargar TODO en un solo archivo
+        if all(r is not None for r in [resumen_total, resumen_pi, resumen_pbm]):
+            excel_completo = libro_excel_bajo_demanda(
+                [resumen_total, resumen_pi, resumen_pbm],
+                ["TOTAL_SGP", "PRIMERA_INFANCIA_SGP", "PRIMARIA_BASICA_MEDIA_SGP"],
+                ["SGP", "SGP", "SGP"]
+            )
+            st.download_button(
+                label="📦 Descargar TODO (3 hojas)",
+                data=excel_completo,
+                file_name=f"SGP_COMPLETO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                type="primary",
+                help="Incluye todas las tablas SGP con sus formatos originales"
+            )
+        else:
+            st.button("📦 Descargar TODO (3 hojas)", disabled=True, use_container_width=True)
 
 # =============================================================================
 # PANTALLAS
@@ -4202,20 +3381,13 @@ def mostrar_pantalla_por_fuente():
                     type="primary",
                     use_container_width=True,
                     help="Forzar actualización inmediata desde Google Sheets"):
-            # Forzar recarga
-            st.cache_data.clear()  # Limpiar cache
-            st.session_state.force_update = True
+            # Forzar recarga solo de esta sección
+            invalidar_seccion("tablero")
             st.rerun()
     
-    # Cargar datos (con o sin fuerza)
-    fuerza = st.session_state.get('force_update', False)
-    
+    # Cargar datos (instantánea compartida)
     with st.spinner("📊 Procesando datos presupuestales..."):
-        df, resumen = procesar_datos_sgp(fuerza_actualizacion=fuerza)
-        
-        # Resetear flag
-        if 'force_update' in st.session_state:
-            st.session_state.force_update = False
+        df, resumen = procesar_datos_sgp()
     
     # Mostrar resultados
     if resumen is not None:
@@ -4228,7 +3400,7 @@ def mostrar_pantalla_por_fuente():
         st.subheader("📥 Exportar a Excel")
         
         # Descarga del Tablero Principal
-        excel_tablero = exportar_a_excel_formateado(
+        excel_tablero = libro_excel_bajo_demanda(
             [resumen], 
             ["TABLERO_PRINCIPAL"], 
             ["SGP"]
@@ -4248,7 +3420,7 @@ def mostrar_pantalla_por_fuente():
         st.divider()
         col_info1, col_info2 = st.columns(2)
         with col_info1:
-            fecha = st.session_state.get('fecha_actualizacion', datetime.now().strftime('%d/%m/%Y %H:%M'))
+            fecha = fecha_actualizacion_vigente(datetime.now().strftime('%d/%m/%Y %H:%M'))
             st.caption(f"📅 {fecha}")
         with col_info2:
             st.caption(f"📊 {len(df)} registros cargados" if df is not None else "📊 Datos no disponibles")
@@ -4285,229 +3457,29 @@ def mostrar_pantalla_recursos_propios():
     col_actualizar, _ = st.columns([1, 3])
     with col_actualizar:
         if st.button("🔄 Actualizar TODOS los Datos", key="actualizar_todos", use_container_width=True):
-            st.cache_data.clear()
+            invalidar_seccion("rp_todos")
             st.session_state.force_update_all = True
             st.rerun()
     
-    # Usar la misma bandera para todas las cargas
+    # Bandera de actualización global (solo para el aviso final)
     fuerza = st.session_state.get('force_update_all', False)
     
     # =========================================================================
-    # 1. TOTAL
+    # SECCIONES (cada una se actualiza y repinta por separado)
     # =========================================================================
-    st.subheader("🌐 TOTAL")
-    
-    # Botón específico para esta sección
-    col_total, _ = st.columns([1, 3])
-    with col_total:
-        if st.button("🔄 Actualizar TOTAL", key="actualizar_total", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_total = True
-            st.rerun()
-    
-    fuerza_total = st.session_state.get('force_update_total', fuerza)
-    
-    with st.spinner("📊 Procesando datos TOTAL..."):
-        df, resumen = procesar_datos_RP_principal(fuerza_actualizacion=fuerza_total)
-        
-        if 'force_update_total' in st.session_state:
-            st.session_state.force_update_total = False
-    
-    if df is not None:
-        if resumen is not None:
-            mostrar_tabla_RP_principal(resumen)
-        else:
-            st.error("❌ No se pudieron procesar los datos TOTAL")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
-    
+    mostrar_seccion("rp_total")
     st.divider()
-    
-    # =========================================================================
-    # 2. PRIMERA INFANCIA
-    # =========================================================================
-    st.subheader("👶🏻 Primera Infancia")
-    
-    # Botón específico para esta sección
-    col_pi, _ = st.columns([1, 3])
-    with col_pi:
-        if st.button("🔄 Actualizar Primera Infancia", key="actualizar_pi", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_pi = True
-            st.rerun()
-    
-    fuerza_pi = st.session_state.get('force_update_pi', fuerza)
-    
-    with st.spinner("📊 Procesando datos Primera Infancia..."):
-        df, resumen = procesar_datos_RP_primera_infancia(fuerza_actualizacion=fuerza_pi)
-        
-        if 'force_update_pi' in st.session_state:
-            st.session_state.force_update_pi = False
-    
-    if df is not None:
-        if resumen is not None:
-            mostrar_tabla_RP_primera_infancia(resumen)
-        else:
-            st.error("❌ No se pudieron procesar los datos Primera Infancia")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
-    
+    mostrar_seccion("rp_primera_infancia")
     st.divider()
-    
-    # =========================================================================
-    # 3. ORIENTADORES
-    # =========================================================================
-    st.subheader("🤝🏻 Orientadores")
-    
-    # Botón específico para esta sección
-    col_or, _ = st.columns([1, 3])
-    with col_or:
-        if st.button("🔄 Actualizar Orientadores", key="actualizar_or", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_or = True
-            st.rerun()
-    
-    fuerza_or = st.session_state.get('force_update_or', fuerza)
-    
-    with st.spinner("📊 Procesando datos Orientadores..."):
-        df, resumen = procesar_datos_RP_orientadores(fuerza_actualizacion=fuerza_or)
-        
-        if 'force_update_or' in st.session_state:
-            st.session_state.force_update_or = False
-    
-    if df is not None:
-        if resumen is not None:
-            mostrar_tabla_RP_orientadores(resumen)
-        else:
-            st.error("❌ No se pudieron procesar los datos Orientadores")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
-    
+    mostrar_seccion("rp_orientadores")
     st.divider()
+    mostrar_seccion("rp_pbm")
     
     # =========================================================================
-    # 4. PRIMARIA BÁSICA MEDIA
-    # =========================================================================
-    st.subheader("👩🏻‍🏫 👨🏻‍🏫 Primaria Básica Media")
-    
-    # Botón específico para esta sección
-    col_pbm, _ = st.columns([1, 3])
-    with col_pbm:
-        if st.button("🔄 Actualizar PBM", key="actualizar_pbm", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_pbm = True
-            st.rerun()
-    
-    fuerza_pbm = st.session_state.get('force_update_pbm', fuerza)
-    
-    with st.spinner("📊 Procesando datos Primaria Básica Media..."):
-        df, resumen = procesar_datos_RP_primaria_basica_media(fuerza_actualizacion=fuerza_pbm)
-        
-        if 'force_update_pbm' in st.session_state:
-            st.session_state.force_update_pbm = False
-    
-    if df is not None:
-        if resumen is not None:
-            mostrar_tabla_RP_PBM(resumen)
-        else:
-            st.error("❌ No se pudieron procesar los datos PBM")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
-    
-        # =========================================================================
     # BOTONES DE DESCARGA EXCEL CON FORMATOS
     # =========================================================================
     st.divider()
-    st.subheader("📥 Exportar a Excel (con formatos)")
-    
-    # Crear columnas para botones de descarga
-    col_descarga1, col_descarga2, col_descarga3, col_descarga4 = st.columns(4)
-    
-    # Obtener los dataframes procesados
-    with st.spinner("Preparando datos con formatos..."):
-        # Recargar o usar datos en cache
-        df, resumen_total = procesar_datos_RP_principal()
-        _, resumen_pi = procesar_datos_RP_primera_infancia()
-        _, resumen_or = procesar_datos_RP_orientadores()
-        _, resumen_pbm = procesar_datos_RP_primaria_basica_media()
-    
-    with col_descarga1:
-        if resumen_total is not None:
-            excel_total = exportar_a_excel_formateado([resumen_total], ["TOTAL_DOCENTES"], ["RP"])
-            st.download_button(
-                label="📥 Descargar TOTAL",
-                data=excel_total,
-                file_name=f"RP_TOTAL_DOCENTES_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar TOTAL", disabled=True, use_container_width=True)
-    
-    with col_descarga2:
-        if resumen_pi is not None:
-            excel_pi = exportar_a_excel_formateado([resumen_pi], ["PRIMERA_INFANCIA"], ["RP"])
-            st.download_button(
-                label="📥 Descargar Primera Infancia",
-                data=excel_pi,
-                file_name=f"RP_PRIMERA_INFANCIA_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar Primera Infancia", disabled=True, use_container_width=True)
-    
-    with col_descarga3:
-        if resumen_or is not None:
-            excel_or = exportar_a_excel_formateado([resumen_or], ["ORIENTADORES"], ["RP"])
-            st.download_button(
-                label="📥 Descargar Orientadores",
-                data=excel_or,
-                file_name=f"RP_ORIENTADORES_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar Orientadores", disabled=True, use_container_width=True)
-    
-    with col_descarga4:
-        if resumen_pbm is not None:
-            excel_pbm = exportar_a_excel_formateado([resumen_pbm], ["PRIMARIA_BASICA_MEDIA"], ["RP"])
-            st.download_button(
-                label="📥 Descargar PBM",
-                data=excel_pbm,
-                file_name=f"RP_PRIMARIA_BASICA_MEDIA_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar PBM", disabled=True, use_container_width=True)
-    
-    # Botón para descargar TODO en un solo archivo
-    st.markdown("---")
-    col_todo, _ = st.columns([1, 3])
-    with col_todo:
-        if all(r is not None for r in [resumen_total, resumen_pi, resumen_or, resumen_pbm]):
-            excel_completo = exportar_a_excel_formateado(
-                [resumen_total, resumen_pi, resumen_or, resumen_pbm],
-                ["TOTAL", "PRIMERA_INFANCIA", "ORIENTADORES", "PRIMARIA_BASICA_MEDIA"],
-                ["RP", "RP", "RP", "RP"]
-            )
-            st.download_button(
-                label="📦 Descargar TODO (4 hojas)",
-                data=excel_completo,
-                file_name=f"RP_DOCENTES_COMPLETO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                type="primary",
-                help="Incluye todas las tablas con sus formatos originales"
-            )
-        else:
-            st.button("📦 Descargar TODO (4 hojas)", disabled=True, use_container_width=True)
+    exportar_excel_recursos_propios()
     
     # =========================================================================
     # INFO DE ACTUALIZACIÓN FINAL
@@ -4557,178 +3529,27 @@ def mostrar_pantalla_sgp():
     col_actualizar, _ = st.columns([1, 3])
     with col_actualizar:
         if st.button("🔄 Actualizar TODOS los Datos SGP", key="actualizar_todos_sgp", use_container_width=True):
-            st.cache_data.clear()
+            invalidar_seccion("sgp_todos")
             st.session_state.force_update_sgp = True
             st.rerun()
 
-    # Usar la bandera para todas las cargas
+    # Bandera de actualización global (solo para el aviso final)
     fuerza = st.session_state.get('force_update_sgp', False)
 
     # =========================================================================
-    # 1. TABLA TOTAL (resumen general)
+    # SECCIONES (cada una se actualiza y repinta por separado)
     # =========================================================================
-    st.subheader("🌐 TABLA RESUMEN EJECUCIÓN PRESUPUESTAL DOCENTES SGP")
-
-    col_total, _ = st.columns([1, 3])
-    with col_total:
-        if st.button("🔄 Actualizar TOTAL", key="actualizar_total_sgp", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_total_sgp = True
-            st.rerun()
-
-    fuerza_total = st.session_state.get('force_update_total_sgp', fuerza)
-
-    with st.spinner("📊 Procesando datos TOTAL SGP..."):
-        df, resumen = procesar_datos_SGP_principal(fuerza_actualizacion=fuerza_total)
-        
-        if 'force_update_total_sgp' in st.session_state:
-            st.session_state.force_update_total_sgp = False
-
-    if df is not None:
-        if resumen is not None:
-            mostrar_tabla_SGPP_principal(resumen)
-        else:
-            st.error("❌ No se pudieron procesar los datos TOTAL SGP")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
-
+    mostrar_seccion("sgp_total")
     st.divider()
-
-    # =========================================================================
-    # 2. TABLA PRIMERA INFANCIA (detallada)
-    # =========================================================================
-    st.subheader("👶🏻 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMERA INFANCIA SGP")
-
-    col_pi, _ = st.columns([1, 3])
-    with col_pi:
-        if st.button("🔄 Actualizar Primera Infancia SGP", key="actualizar_pi_sgp", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_pi_sgp = True
-            st.rerun()
-
-    fuerza_pi = st.session_state.get('force_update_pi_sgp', fuerza)
-
-    with st.spinner("📊 Procesando datos Primera Infancia SGP..."):
-        df, resumen_pi = procesar_datos_SGP_primera_infancia_detallada(fuerza_actualizacion=fuerza_pi)
-        
-        if 'force_update_pi_sgp' in st.session_state:
-            st.session_state.force_update_pi_sgp = False
-
-    if df is not None:
-        if resumen_pi is not None:
-            mostrar_tabla_SGP_primera_infancia_detallada(resumen_pi)
-        else:
-            st.error("❌ No se pudieron procesar los datos Primera Infancia SGP")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
-
+    mostrar_seccion("sgp_primera_infancia")
     st.divider()
-
-    # =========================================================================
-    # 3. TABLA PRIMARIA BÁSICA Y MEDIA (detallada)
-    # =========================================================================
-    st.subheader("👩🏻‍🏫 👨🏻‍🏫 EJECUCIÓN PRESUPUESTAL DOCENTES PRIMARIA BÁSICA MEDIA SGP")
-
-    col_pbm, _ = st.columns([1, 3])
-    with col_pbm:
-        if st.button("🔄 Actualizar PBM SGP", key="actualizar_pbm_sgp", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state.force_update_pbm_sgp = True
-            st.rerun()
-
-    fuerza_pbm = st.session_state.get('force_update_pbm_sgp', fuerza)
-
-    with st.spinner("📊 Procesando datos Primaria Básica y Media SGP..."):
-        df, resumen_pbm = procesar_datos_SGP_primaria_basica_media_detallada(fuerza_actualizacion=fuerza_pbm)
-        
-        if 'force_update_pbm_sgp' in st.session_state:
-            st.session_state.force_update_pbm_sgp = False
-
-    if df is not None:
-        if resumen_pbm is not None:
-            mostrar_tabla_SGP_primaria_basica_media_detallada(resumen_pbm)
-        else:
-            st.error("❌ No se pudieron procesar los datos PBM SGP")
-    else:
-        st.error("❌ No se pudo cargar el archivo de datos")
+    mostrar_seccion("sgp_pbm")
 
     # =========================================================================
     # BOTONES DE DESCARGA EXCEL
     # =========================================================================
     st.divider()
-    st.subheader("📥 Exportar a Excel")
-
-    # Crear columnas para botones de descarga
-    col_descarga1, col_descarga2, col_descarga3, col_descarga4 = st.columns(4)
-
-    # Obtener los dataframes procesados
-    with st.spinner("Preparando datos con formatos..."):
-        # Recargar o usar datos en cache
-        _, resumen_total = procesar_datos_SGP_principal()
-        _, resumen_pi = procesar_datos_SGP_primera_infancia_detallada()
-        _, resumen_pbm = procesar_datos_SGP_primaria_basica_media_detallada()
-
-    with col_descarga1:
-        if resumen_total is not None:
-            excel_total = exportar_a_excel_formateado([resumen_total], ["TOTAL_SGP"], ["SGP"])
-            st.download_button(
-                label="📥 Descargar TOTAL",
-                data=excel_total,
-                file_name=f"SGP_TOTAL_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar TOTAL", disabled=True, use_container_width=True)
-
-    with col_descarga2:
-        if resumen_pi is not None:
-            excel_pi = exportar_a_excel_formateado([resumen_pi], ["PRIMERA_INFANCIA_SGP"], ["SGP"])
-            st.download_button(
-                label="📥 Descargar Primera Infancia",
-                data=excel_pi,
-                file_name=f"SGP_PRIMERA_INFANCIA_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar Primera Infancia", disabled=True, use_container_width=True)
-
-    with col_descarga3:
-        if resumen_pbm is not None:
-            excel_pbm = exportar_a_excel_formateado([resumen_pbm], ["PRIMARIA_BASICA_MEDIA_SGP"], ["SGP"])
-            st.download_button(
-                label="📥 Descargar PBM",
-                data=excel_pbm,
-                file_name=f"SGP_PBM_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                help="Incluye colores y formatos como en pantalla"
-            )
-        else:
-            st.button("📥 Descargar PBM", disabled=True, use_container_width=True)
-
-    with col_descarga4:
-        # Descargar TODO en un solo archivo
-        if all(r is not None for r in [resumen_total, resumen_pi, resumen_pbm]):
-            excel_completo = exportar_a_excel_formateado(
-                [resumen_total, resumen_pi, resumen_pbm],
-                ["TOTAL_SGP", "PRIMERA_INFANCIA_SGP", "PRIMARIA_BASICA_MEDIA_SGP"],
-                ["SGP", "SGP", "SGP"]
-            )
-            st.download_button(
-                label="📦 Descargar TODO (3 hojas)",
-                data=excel_completo,
-                file_name=f"SGP_COMPLETO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                type="primary",
-                help="Incluye todas las tablas SGP con sus formatos originales"
-            )
-        else:
-            st.button("📦 Descargar TODO (3 hojas)", disabled=True, use_container_width=True)
+    exportar_excel_sgp()
 
     # =========================================================================
     # INFO DE ACTUALIZACIÓN FINAL
@@ -4736,7 +3557,7 @@ def mostrar_pantalla_sgp():
     st.divider()
     col_info1, col_info2 = st.columns(2)
     with col_info1:
-        fecha = st.session_state.get('fecha_actualizacion', datetime.now().strftime('%d/%m/%Y %H:%M'))
+        fecha = fecha_actualizacion_vigente(datetime.now().strftime('%d/%m/%Y %H:%M'))
         st.caption(f"📅 {fecha}")
     with col_info2:
         if 'force_update_sgp' in st.session_state:
@@ -4751,12 +3572,22 @@ def main():
     if "pagina_actual" not in st.session_state:
         st.session_state.pagina_actual = "INICIO"
     
+    # 🔹 Hilo que mantiene los datos al día para todas las sesiones
+    # (publica antes la instantánea en disco, si existe)
+    iniciar_actualizador()
+    
+    # 🔹 Hoja principal (en frío) y mensajes se descargan a la vez desde el inicio del rerun
+    precargar_fuentes()
+    
     # 🔹 Cargar la fecha de actualización SIEMPRE al inicio
-    # Esta función es rápida porque solo lee 1 fila
+    # Sale de la instantánea ya publicada; solo sin ella se consulta la red
     if "fecha_actualizacion" not in st.session_state:
-        fecha = obtener_fecha_actualizacion()
+        fecha = fecha_de_datos_cargados() or obtener_fecha_actualizacion()
         st.session_state.fecha_actualizacion = fecha
     
+    # 🔹 Cada rerun usa la última versión publicada (una sola para todas las tablas)
+    fijar_version_sesion()
+    
     # Cargar estilos
     cargar_estilos()
     
@@ -4769,6 +3600,9 @@ def main():
         mostrar_pantalla_recursos_propios()
     elif st.session_state.pagina_actual == "SGP":
         mostrar_pantalla_sgp()
+    
+    # Estado de sincronización en la barra lateral
+    mostrar_estado_sincronizacion()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+"""
+Servidor HTTP local que hace de hoja de Google Sheets en las pruebas:
+responde con ETag/Last-Modified, honra las peticiones condicionales y
+permite programar fallos (códigos 5xx) y demoras por petición.
+"""
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+CSV_HOJA = (
+    "Codigo,Codigo_O,Concepto de gasto,FECHA,INICIAL,DISPONIBLE,RP EMITIDOS,"
+    "GIROS ACUMULADOS,SALDO DE APROPIACION,RECURSOS SIN EJECUTAR\n"
+    "1-100-F039,O2301172201202401690307101001,,4/07/2026,100,200,300,400,500,600\n"
+    "2-100-I001,O2301172201202401690307101002,,4/07/2026,10,20,30,40,50,60\n"
+).encode("utf-8")
+
+
+class ServidorHoja:
+    """Hoja CSV servida en 127.0.0.1 con respuestas programables"""
+
+    def __init__(self):
+        self.cuerpo = CSV_HOJA
+        self.etag = None
+        self.last_modified = None
+        self.fallos = []    # códigos a responder (en orden) antes de servir la hoja
+        self.demoras = []   # segundos a esperar antes de responder, uno por petición
+        self.peticiones = []
+        self.codigos = []
+        self.puertos_cliente = set()   # una entrada por conexión TCP usada
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def responder(self, codigo, cuerpo=b"", cabeceras=None):
+                servidor.codigos.append(codigo)
+                self.send_response(codigo)
+                for nombre, valor in (cabeceras or {}).items():
+                    self.send_header(nombre, valor)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                try:
+                    self.wfile.write(cuerpo)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # el cliente ya abandonó la petición por timeout
+
+            def do_GET(self):
+                servidor.peticiones.append(dict(self.headers))
+                servidor.puertos_cliente.add(self.client_address[1])
+                if servidor.demoras:
+                    time.sleep(servidor.demoras.pop(0))
+                if servidor.fallos:
+                    return self.responder(servidor.fallos.pop(0))
+
+                validadores = {}
+                if servidor.etag:
+                    validadores["ETag"] = servidor.etag
+                if servidor.last_modified:
+                    validadores["Last-Modified"] = servidor.last_modified
+                if (servidor.etag and self.headers.get("If-None-Match") == servidor.etag) or (
+                    servidor.last_modified and self.headers.get("If-Modified-Since") == servidor.last_modified
+                ):
+                    return self.responder(304, cabeceras=validadores)
+                self.responder(200, servidor.cuerpo, validadores)
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.http.server_address[1]}/export?format=csv&gid=0"
+
+    def cerrar(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorHoja()
+    yield servidor
+    servidor.cerrar()
+
+
+@pytest.fixture
+def hoja_local(servidor, monkeypatch, tmp_path):
+    """Apunta la hoja principal al servidor local y la instantánea a un temporal"""
+    monkeypatch.setattr(app, "URL_DATOS", servidor.url)
+    monkeypatch.setattr(app, "RUTA_INSTANTANEA_DISCO", tmp_path / "datos.feather")
+    monkeypatch.setattr(app, "ESPERA_BASE_REINTENTO_SEG", 0.01)
+    return servidor
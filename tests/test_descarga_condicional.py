@@ -0,0 +1,83 @@
+"""Descarga condicional de la hoja: 304 y bytes idénticos reutilizan la instantánea"""
+import pytest
+
+import app
+
+
+@pytest.fixture
+def parseos(monkeypatch):
+    """Cuenta las llamadas a parsear_datos_originales"""
+    llamadas = []
+    original = app.parsear_datos_originales
+
+    def contar(*args, **kwargs):
+        llamadas.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(app, "parsear_datos_originales", contar)
+    return llamadas
+
+
+def estado():
+    return app.obtener_estado_fuente(app.URL_DATOS)
+
+
+@pytest.mark.parametrize("validador", ["etag", "last_modified"])
+def test_304_conserva_la_version_sin_reparsear(hoja_local, parseos, validador):
+    if validador == "etag":
+        hoja_local.etag = '"v1"'
+    else:
+        hoja_local.last_modified = "Sat, 04 Jul 2026 12:00:00 GMT"
+
+    app.sincronizar_fuente()
+    primero = estado()
+    app.sincronizar_fuente()
+    segundo = estado()
+
+    assert hoja_local.codigos == [200, 304]
+    if validador == "etag":
+        assert hoja_local.peticiones[1]["If-None-Match"] == '"v1"'
+    else:
+        assert hoja_local.peticiones[1]["If-Modified-Since"] == hoja_local.last_modified
+    assert len(parseos) == 1
+    assert segundo["version"] == primero["version"]
+    assert segundo["datos"] is primero["datos"]
+    assert segundo["consultado_en"] > primero["consultado_en"]
+
+
+def test_200_con_la_misma_huella_conserva_la_version_sin_reparsear(hoja_local, parseos):
+    app.sincronizar_fuente()
+    primero = estado()
+    app.sincronizar_fuente()
+    segundo = estado()
+
+    assert hoja_local.codigos == [200, 200]
+    assert len(parseos) == 1
+    assert segundo["huella"] == primero["huella"]
+    assert segundo["version"] == primero["version"]
+    assert segundo["datos"] is primero["datos"]
+
+
+def test_contenido_nuevo_publica_otra_version(hoja_local, parseos):
+    app.sincronizar_fuente()
+    primero = estado()
+    hoja_local.cuerpo = hoja_local.cuerpo.replace(b",100,", b",101,")
+    app.sincronizar_fuente()
+    segundo = estado()
+
+    assert len(parseos) == 2
+    assert segundo["huella"] != primero["huella"]
+    assert segundo["version"] == primero["version"] + 1
+
+
+def test_recarga_forzada_ignora_los_validadores(hoja_local, parseos):
+    hoja_local.etag = '"v1"'
+    app.sincronizar_fuente()
+    primero = estado()
+    app.sincronizar_fuente(forzar=True)
+
+    assert hoja_local.codigos == [200, 200]
+    assert "If-None-Match" not in hoja_local.peticiones[1]
+    # Mismos bytes: no se reparsea, pero la recarga forzada publica versión nueva
+    assert len(parseos) == 1
+    assert estado()["version"] == primero["version"] + 1
@@ -0,0 +1,42 @@
+"""Lectura de valores en pesos: convención de separadores por columna y exactitud"""
+import pandas as pd
+
+import app
+
+
+def pesos(valores):
+    serie, rechazadas = app.limpiar_pesos(pd.Series(valores, dtype="string"))
+    return serie.tolist(), rechazadas
+
+
+def test_columna_sin_formato_colombiano_lee_el_punto_como_decimal():
+    assert pesos(["12.345", "0.125", "1234.567", "5"]) == ([12, 0, 1235, 5], 0)
+
+
+def test_columna_con_pesos_lee_el_punto_como_miles():
+    valores, rechazadas = pesos(["$1.234.567,50", "12.345", "-$ 2.500,50", "(1.000)"])
+    assert valores == [1234568, 12345, -2501, -1000]
+    assert rechazadas == 0
+
+
+def test_coma_decimal_sin_signo_de_pesos_decide_la_columna():
+    assert pesos(["2.500,50", "12.345"]) == ([2501, 12345], 0)
+
+
+def test_coma_de_miles_en_columna_sin_formato_colombiano():
+    assert pesos(["1,234,567.5", "1234567.0"]) == ([1234568, 1234567], 0)
+
+
+def test_valores_por_encima_de_2_a_la_53_son_exactos():
+    valores, _ = pesos(["9007199254740993", "-9007199254740993.5", "$9.007.199.254.740.993"])
+    assert valores == [9007199254740993, -9007199254740994, 9007199254740993]
+
+
+def test_mitad_se_redondea_lejos_de_cero():
+    assert pesos(["0.5", "-0.5", "2.49", "(2.5)"]) == ([1, -1, 2, -3], 0)
+
+
+def test_vacios_valen_cero_y_el_texto_se_rechaza():
+    valores, rechazadas = pesos([None, "", "abc", "abc", "99999999999999999999"])
+    assert valores == [0, 0, 0, 0, 0]
+    assert rechazadas == 3
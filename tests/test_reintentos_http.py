@@ -0,0 +1,93 @@
+"""Reintentos, espera y plazo de pedir_fuente contra el servidor local"""
+import time
+
+import pytest
+import requests
+
+import app
+
+
+@pytest.fixture
+def rapido(monkeypatch):
+    """Timeouts cortos para que las pruebas de demora no tarden"""
+    monkeypatch.setattr(app, "ESPERA_BASE_REINTENTO_SEG", 0.01)
+    monkeypatch.setattr(app, "TIMEOUT_CONEXION_SEG", 0.5)
+    monkeypatch.setattr(app, "TIMEOUT_DESCARGA_SEG", 0.3)
+
+
+def test_5xx_seguido_de_exito_se_reintenta(servidor, rapido):
+    servidor.fallos = [503, 500]
+    with app.pedir_fuente(servidor.url) as respuesta:
+        assert respuesta.status_code == 200
+        assert respuesta.content == servidor.cuerpo
+    assert servidor.codigos == [503, 500, 200]
+
+
+def test_error_no_reintentable_se_devuelve_sin_reintentar(servidor, rapido):
+    servidor.fallos = [404]
+    with app.pedir_fuente(servidor.url) as respuesta:
+        assert respuesta.status_code == 404
+    assert servidor.codigos == [404]
+
+
+def test_timeout_seguido_de_exito_se_reintenta(servidor, rapido):
+    servidor.demoras = [0.6]
+    with app.pedir_fuente(servidor.url, plazo_seg=5) as respuesta:
+        assert respuesta.status_code == 200
+    assert len(servidor.peticiones) == 2
+
+
+def test_reintentos_agotados_devuelven_el_ultimo_5xx(servidor, rapido):
+    servidor.fallos = [503] * (app.MAX_REINTENTOS_DESCARGA + 1)
+    with app.pedir_fuente(servidor.url, plazo_seg=5) as respuesta:
+        assert respuesta.status_code == 503
+    assert servidor.codigos == [503] * (app.MAX_REINTENTOS_DESCARGA + 1)
+
+
+def test_reintentos_agotados_por_timeout_propagan_el_error(servidor, rapido):
+    servidor.demoras = [0.6] * (app.MAX_REINTENTOS_DESCARGA + 1)
+    with pytest.raises(requests.Timeout):
+        app.pedir_fuente(servidor.url, plazo_seg=5)
+    assert len(servidor.peticiones) == app.MAX_REINTENTOS_DESCARGA + 1
+
+
+def test_los_reintentos_no_exceden_el_plazo_de_la_fuente(servidor, monkeypatch):
+    # Cada intento tardaría 0.3 s y las esperas crecen; con 0.5 s de plazo no caben todos
+    monkeypatch.setattr(app, "ESPERA_BASE_REINTENTO_SEG", 0.2)
+    monkeypatch.setattr(app, "TIMEOUT_DESCARGA_SEG", 10)
+    servidor.demoras = [0.3] * (app.MAX_REINTENTOS_DESCARGA + 1)
+    servidor.fallos = [503] * (app.MAX_REINTENTOS_DESCARGA + 1)
+
+    inicio = time.monotonic()
+    try:
+        with app.pedir_fuente(servidor.url, plazo_seg=0.5) as respuesta:
+            assert respuesta.status_code == 503
+    except requests.Timeout:
+        pass   # el último intento solo tuvo lo que quedaba del plazo
+    assert time.monotonic() - inicio < 1.0
+    assert len(servidor.peticiones) < app.MAX_REINTENTOS_DESCARGA + 1
+
+
+def test_el_plazo_acota_el_timeout_de_cada_intento(servidor, monkeypatch):
+    monkeypatch.setattr(app, "TIMEOUT_DESCARGA_SEG", 10)
+    servidor.demoras = [3]
+
+    inicio = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        app.pedir_fuente(servidor.url, plazo_seg=0.5)
+    assert time.monotonic() - inicio < 1.5
+
+
+def test_las_peticiones_comparten_conexion_keep_alive(servidor, rapido):
+    servidor.fallos = [503]
+    for _ in range(3):
+        with app.pedir_fuente(servidor.url) as respuesta:
+            respuesta.content
+    assert servidor.codigos == [503, 200, 200, 200]
+    assert len(servidor.puertos_cliente) == 1
+
+
+def test_el_pool_cubre_las_fuentes_del_coordinador():
+    adaptador = app.cliente_http().get_adapter("https://docs.google.com")
+    assert adaptador._pool_maxsize > len(app.TIMEOUTS_FUENTES)
+    assert adaptador.max_retries.total == 0